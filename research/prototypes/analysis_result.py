@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Compact Analysis Results for Noise Environment Monitor
+
+AnalysisResult holds the scalar features of one analyzed file in fixed
+slots (no per-instance dictionary) and keeps the large per-file arrays
+(per-window dB trace, spectrum, level histogram) optional:
+
+- included: process_audio_file(path) stores them, as before
+- lazy: process_audio_file(path, arrays=False) stores only a loader, which
+  re-analyzes the file the first time an array is accessed
+- dropped: release_arrays() frees them again (a loader, if any, is kept)
+
+The result is a read-only Mapping, so existing code indexing
+results['avg_decibels'] or results['db_values'] keeps working. Scalars are
+also attributes (results.avg_decibels). to_row() and results_to_frame()
+build DataFrame rows from the slots without touching any array.
+
+Usage:
+    results = processor.process_audio_file("sample.wav", verbose=False, arrays=False)
+    results.leq                 # scalar, no arrays held
+    results['db_values']        # loads the arrays on first access
+    table = results_to_frame(many_results)
+
+Author: Group 4 (GMU)
+Date: 2026-10-16
+"""
+
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterable, Optional
+
+# Scalar features, in DataFrame column order
+SCALAR_FIELDS = (
+    'file_path', 'duration',
+    'avg_decibels', 'max_decibels', 'min_decibels', 'std_decibels',
+    'leq', 'l10', 'l50', 'l90', 'lmax',
+    'classification',
+    'spectral_centroid', 'spectral_spread', 'spectral_rolloff', 'spectral_flatness',
+    'spectral_entropy', 'dominant_frequency',
+    'low_freq_ratio', 'mid_freq_ratio', 'high_freq_ratio',
+)
+
+# Arrays produced by process_audio_file(), and so available through a loader
+ARRAY_FIELDS = ('db_values', 'frequencies', 'magnitudes', 'level_histogram')
+
+
+class AnalysisResult(Mapping):
+    """
+    Scalar features of one file, with optional or lazily loaded arrays.
+    """
+
+    __slots__ = SCALAR_FIELDS + ('_arrays', '_loader')
+
+    def __init__(self, values: Dict, loader: Optional[Callable[[], Dict]] = None):
+        """
+        Initialize a result.
+
+        Args:
+            values: Every name in SCALAR_FIELDS; any other entries are kept
+                as arrays
+            loader: Callable returning the array dictionary, called on the
+                first array access when values holds no arrays
+        """
+        missing = [name for name in SCALAR_FIELDS if name not in values]
+        if missing:
+            raise ValueError(f"Missing scalar features: {missing}")
+        for name in SCALAR_FIELDS:
+            setattr(self, name, values[name])
+        arrays = {key: value for key, value in values.items() if key not in SCALAR_FIELDS}
+        self._arrays = arrays or None
+        self._loader = loader
+
+    def __getitem__(self, key: str):
+        if key in SCALAR_FIELDS:
+            return getattr(self, key)
+        arrays = self.arrays()
+        if key not in arrays:
+            raise KeyError(key)
+        return arrays[key]
+
+    def __contains__(self, key) -> bool:
+        # Without loading the arrays
+        return key in SCALAR_FIELDS or key in self._array_names()
+
+    def __iter__(self):
+        yield from SCALAR_FIELDS
+        yield from self._array_names()
+
+    def __len__(self) -> int:
+        return len(SCALAR_FIELDS) + len(self._array_names())
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self._arrays is not None else 'lazy' if self._loader else 'none'
+        return (f"AnalysisResult(file_path={self.file_path!r}, avg_decibels={self.avg_decibels:.1f}, "
+                f"classification={self.classification!r}, arrays={state})")
+
+    @property
+    def has_arrays(self) -> bool:
+        """True if the arrays are held in memory."""
+        return self._arrays is not None
+
+    def arrays(self) -> Dict:
+        """
+        Return the arrays, loading them first if needed.
+
+        Returns:
+            Dictionary of array name -> value (empty if there are none and
+            no loader)
+        """
+        if self._arrays is None:
+            if self._loader is None:
+                return {}
+            self._arrays = self._loader()
+        return self._arrays
+
+    def release_arrays(self):
+        """Drop the arrays; they are reloaded on access if there is a loader."""
+        self._arrays = None
+
+    def to_row(self) -> Dict:
+        """
+        Scalar features as a dictionary (one DataFrame row).
+
+        Returns:
+            Dictionary of SCALAR_FIELDS -> value
+        """
+        return {name: getattr(self, name) for name in SCALAR_FIELDS}
+
+    def to_dict(self, arrays: bool = True) -> Dict:
+        """
+        Plain dictionary, as process_audio_file() returned before.
+
+        Args:
+            arrays: Include the arrays (loading them if needed)
+
+        Returns:
+            Dictionary of scalar features, plus arrays if requested
+        """
+        row = self.to_row()
+        if arrays:
+            row.update(self.arrays())
+        return row
+
+    def _array_names(self):
+        if self._arrays is not None:
+            return tuple(self._arrays)
+        return ARRAY_FIELDS if self._loader is not None else ()
+
+
+def results_to_frame(results: Iterable[AnalysisResult]):
+    """
+    Build a DataFrame of scalar features, one row per result.
+
+    Args:
+        results: AnalysisResult objects
+
+    Returns:
+        pandas DataFrame with SCALAR_FIELDS columns
+    """
+    import pandas as pd
+
+    return pd.DataFrame.from_records(
+        [tuple(getattr(result, name) for name in SCALAR_FIELDS) for result in results],
+        columns=list(SCALAR_FIELDS))
@@ -11,53 +11,851 @@ Date: 2025-10-14
 """
 
 import numpy as np
-import librosa
 import soundfile as sf
-from scipy import signal
-from typing import Tuple, Dict, Optional
+from typing import Tuple, Dict, Optional, Generator, List
+import math
+import os
+import sys
 import warnings
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from analysis_result import ARRAY_FIELDS, AnalysisResult
+from filters import MovingAverageFilter
+from frequency_weighting import band_center_frequencies, band_overlap_weights, weighting_db
+from instrumentation import Instrumentation, timed_stage
+from noise_indices import LevelHistogram
+from wav_reader import open_wav_memmap
+
+# librosa is imported inside the code paths that need it (resampling and
+# non-libsndfile formats); importing it and its scipy/numba stack costs more
+# than analyzing a short WAV file. Check with:
+#   python -X importtime audio_processor.py <file.wav> 2> importtime.log
 
 warnings.filterwarnings('ignore')
 
+# Calibration offset added to raw dBFS values (see README troubleshooting)
+CALIBRATION_OFFSET_DB = 94
+
+# Default analysis sizes used by process_audio_file()
+DB_WINDOW_SIZE = 4096        # Samples per RMS window (50% overlap)
+SMOOTHING_WINDOW_SIZE = 10   # dB values per moving average window
+FFT_SIZE = 2048              # Samples per FFT frame
+
+# Rate the window sizes above are defined for. With
+# AudioProcessor(analysis_rate=...), audio is decimated with a polyphase
+# filter and the window sizes are scaled to keep their duration (the FFT
+# size to the nearest power of two).
+REFERENCE_SAMPLE_RATE = 44100
+
+# Version of the feature definitions. Bump it whenever a change alters the
+# values process_audio_file() returns, so cached features are recomputed.
+#   2: noise indices (leq, l10, l50, l90, lmax)
+FEATURE_VERSION = 2
+
+# classify_noise_simple() labels and the dB levels separating them
+NOISE_CLASSES = ('Quiet', 'Normal', 'Noisy')
+NOISE_THRESHOLDS_DB = (50, 70)
+
+# Spectrum modes for perform_fft():
+#   'single'   - one Hamming-windowed FFT of the first n_fft samples (Phase 0 baseline)
+#   'averaged' - mean power over 50%-overlapping n_fft frames of the whole signal
+SPECTRUM_MODES = ('single', 'averaged')
+
+# Frames transformed per rfft call when averaging, bounds temporary memory
+SPECTRUM_BATCH_FRAMES = 512
+
+# Default segment length of process_segments() (s), bounds worker memory
+PARALLEL_SEGMENT_SECONDS = 300
+
+# Low/mid and mid/high band split frequencies (Hz)
+DEFAULT_BAND_EDGES = (250.0, 4000.0)
+
+# Processing dtypes for AudioProcessor(dtype=...). float32 results stay within
+# FLOAT32_TOLERANCE of the float64 reference (checked by test_phase0.py):
+#   dB values and dB statistics: absolute, in dB
+#   spectral features: relative to the float64 value (bin-valued features
+#   such as rolloff and dominant frequency may move by one bin on near-ties)
+PROCESSING_DTYPES = ('float32', 'float64')
+FLOAT32_TOLERANCE = {'decibels': 1e-3, 'spectral': 1e-4}
+
+# Analysis windows available to SpectralPlan
+WINDOW_FUNCTIONS = {
+    'hamming': np.hamming,
+    'hann': np.hanning,
+    'rectangular': np.ones,
+}
+
+
+def frame_signal(audio: np.ndarray, frame_length: int, hop_length: int) -> np.ndarray:
+    """
+    Split a signal into overlapping frames without copying.
+
+    Only complete frames are returned; trailing samples that do not fill a
+    frame are dropped. Leading axes (stacked signals, channels) are kept.
+
+    Args:
+        audio: Audio samples, shape (..., n_samples)
+        frame_length: Samples per frame
+        hop_length: Samples between consecutive frame starts
+
+    Returns:
+        Read-only array of shape (..., n_frames, frame_length)
+    """
+    if audio.shape[-1] < frame_length:
+        return np.empty(audio.shape[:-1] + (0, frame_length), dtype=audio.dtype)
+    frames = np.lib.stride_tricks.sliding_window_view(audio, frame_length, axis=-1)
+    return frames[..., ::hop_length, :]
+
+
+def frames_to_decibels(frames: np.ndarray) -> np.ndarray:
+    """
+    Convert framed samples to calibrated dB.
+
+    Args:
+        frames: Framed audio samples, shape (..., n_frames, frame_length)
+
+    Returns:
+        One decibel value per frame, shape (..., n_frames)
+    """
+    mean_square = np.einsum('...j,...j->...', frames, frames) / frames.shape[-1]
+    rms = np.sqrt(mean_square)
+
+    # Convert to dB SPL
+    # dB = 20 * log10(RMS / reference)
+    # Add small epsilon to avoid log(0)
+    epsilon = 1e-10
+    db = 20 * np.log10(rms + epsilon)
+
+    # Normalize to typical environmental range (0-120 dB)
+    # This calibration factor may need adjustment based on actual recordings
+    return db + CALIBRATION_OFFSET_DB
+
+
+def hamming_head(total_length: int, head_length: int, dtype=np.float64) -> np.ndarray:
+    """
+    First head_length coefficients of np.hamming(total_length).
+
+    Lets callers window the start of a long signal without allocating a
+    window for the whole signal.
+
+    Args:
+        total_length: Length of the full Hamming window
+        head_length: Number of leading coefficients to return
+        dtype: Output dtype
+
+    Returns:
+        Window coefficients
+    """
+    if total_length <= 1:
+        return np.ones(head_length, dtype=dtype)
+    n = np.arange(head_length)
+    return (0.54 - 0.46 * np.cos(2 * np.pi * n / (total_length - 1))).astype(dtype, copy=False)
+
+
+def accumulate_power(frames: np.ndarray, window: np.ndarray, n_fft: int,
+                     batch_frames: int = SPECTRUM_BATCH_FRAMES) -> np.ndarray:
+    """
+    Sum the power spectra of a stack of frames.
+
+    Frames are windowed and transformed with one rfft call per batch of
+    batch_frames frames (per signal), so temporary memory stays bounded for
+    long signals.
+
+    Args:
+        frames: Framed audio samples, shape (..., n_frames, frame_length)
+        window: Analysis window (frame_length,)
+        n_fft: FFT size
+        batch_frames: Frames transformed per rfft call
+
+    Returns:
+        Sum of |rfft|^2 over the frames, shape (..., n_fft // 2 + 1)
+    """
+    power_sum = np.zeros(frames.shape[:-2] + (n_fft // 2 + 1,))
+    for start in range(0, frames.shape[-2], batch_frames):
+        spectra = np.fft.rfft(frames[..., start:start + batch_frames, :] * window, n=n_fft, axis=-1)
+        power_sum += np.sum(spectra.real ** 2 + spectra.imag ** 2, axis=-2)
+    return power_sum
+
+
+class SpectralPlan:
+    """
+    Precomputed FFT window, frequency bins and band boundaries.
+
+    Building a plan once per (sample_rate, n_fft, window, band_edges) keeps
+    window construction, rfftfreq and band masking out of the per-frame hot
+    path. Frequency weighting vectors and octave band matrices are built on
+    first use and kept on the plan. Plans are cached by
+    AudioProcessor.get_spectral_plan().
+    """
+
+    def __init__(self, sample_rate: int, n_fft: int, window: str = 'hamming',
+                 band_edges: Tuple[float, ...] = DEFAULT_BAND_EDGES, dtype: str = 'float64'):
+        """
+        Initialize the spectral plan.
+
+        Args:
+            sample_rate: Sample rate (Hz)
+            n_fft: FFT size
+            window: Window name (see WINDOW_FUNCTIONS)
+            band_edges: Increasing split frequencies between bands (Hz)
+            dtype: dtype of the window, so windowing does not promote frames
+        """
+        if window not in WINDOW_FUNCTIONS:
+            raise ValueError(f"window must be one of {tuple(WINDOW_FUNCTIONS)}, got '{window}'")
+        if np.any(np.diff(band_edges) <= 0):
+            raise ValueError(f"band_edges must be strictly increasing, got {band_edges}")
+
+        self.sample_rate = sample_rate
+        self.n_fft = n_fft
+        self.window_name = window
+        self.band_edges = tuple(band_edges)
+        self.dtype = np.dtype(dtype)
+
+        self.window = WINDOW_FUNCTIONS[window](n_fft).astype(self.dtype)
+        self.frequencies = np.fft.rfftfreq(n_fft, 1/sample_rate)
+        self.window.flags.writeable = False
+        self.frequencies.flags.writeable = False
+
+        # Band i covers bins [starts[i], starts[i + 1]). reduceat cannot
+        # express empty bands, so only non-empty ones are reduced.
+        n_bins = len(self.frequencies)
+        starts = np.searchsorted(self.frequencies, self.band_edges, side='left')
+        bounds = np.concatenate(([0], starts, [n_bins]))
+        self._nonempty = bounds[:-1] < bounds[1:]
+        self._reduce_starts = bounds[:-1][self._nonempty]
+
+        self._level_weights = {}   # weighting -> per-bin vector
+        self._band_matrices = {}   # (fraction, weighting) -> (centers, matrix)
+
+    @property
+    def key(self) -> Tuple:
+        """Cache key identifying this plan."""
+        return (self.sample_rate, self.n_fft, self.window_name, self.band_edges, self.dtype.name)
+
+    def band_energies(self, magnitudes: np.ndarray) -> np.ndarray:
+        """
+        Sum magnitudes per band.
+
+        Args:
+            magnitudes: Magnitudes over the plan's bins, shape (..., n_bins)
+
+        Returns:
+            Band sums, shape (..., len(band_edges) + 1)
+        """
+        energies = np.zeros(magnitudes.shape[:-1] + (len(self._nonempty),))
+        if len(self._reduce_starts):
+            energies[..., self._nonempty] = np.add.reduceat(magnitudes, self._reduce_starts, axis=-1)
+        return energies
+
+    def level_weights(self, weighting: str = 'Z') -> np.ndarray:
+        """
+        Per-bin factors turning the |rfft|^2 of a windowed frame into its
+        frequency-weighted mean square.
+
+        Args:
+            weighting: 'A', 'C' or 'Z'
+
+        Returns:
+            Read-only vector over the plan's bins
+        """
+        weights = self._level_weights.get(weighting)
+        if weights is None:
+            # Parseval for a one-sided spectrum (bins other than DC and
+            # Nyquist stand for two), normalized by the window power
+            scale = np.full(len(self.frequencies), 2.0)
+            scale[0] = 1.0
+            if self.n_fft % 2 == 0:
+                scale[-1] = 1.0
+            scale /= self.n_fft * np.sum(self.window.astype(np.float64) ** 2)
+
+            weights = scale * 10 ** (weighting_db(self.frequencies, weighting) / 10)
+            weights.flags.writeable = False
+            self._level_weights[weighting] = weights
+        return weights
+
+    def band_matrix(self, fraction: int = 3, weighting: str = 'Z') -> Tuple[np.ndarray, 'csr_matrix']:
+        """
+        Sparse matrix summing |rfft|^2 into weighted octave band mean squares.
+
+        Args:
+            fraction: 1 for octave bands, 3 for third-octave bands
+            weighting: 'A', 'C' or 'Z' (folded into the matrix)
+
+        Returns:
+            Tuple of (band center frequencies, scipy.sparse CSR matrix of
+            shape (n_bins, n_bands))
+        """
+        key = (fraction, weighting)
+        if key not in self._band_matrices:
+            from scipy.sparse import csr_matrix  # Deferred: scipy.sparse is slow to import
+
+            centers = band_center_frequencies(self.sample_rate, fraction)
+            (bins, bands), shares = band_overlap_weights(self.frequencies, centers, fraction)
+            matrix = csr_matrix((shares * self.level_weights(weighting)[bins], (bins, bands)),
+                                shape=(len(self.frequencies), len(centers)))
+            self._band_matrices[key] = (centers, matrix)
+        return self._band_matrices[key]
+
+
+class FrameBuffer:
+    """
+    Carry samples between blocks so framing continues across block edges.
+
+    Frames produced from a sequence of pushed blocks are identical to the
+    frames frame_signal() would produce on the concatenated signal.
+    """
+
+    def __init__(self, frame_length: int, hop_length: int):
+        self.frame_length = frame_length
+        self.hop_length = hop_length
+        self.frames_emitted = 0
+        self._buffer = np.empty(0, dtype=np.float32)
+        self._skip = 0  # Samples to drop before the next frame (hop > frame)
+
+    def push(self, block: np.ndarray) -> np.ndarray:
+        """
+        Append a block and return every frame it completes.
+
+        Args:
+            block: Next audio samples (1D array)
+
+        Returns:
+            Array of shape (n_frames, frame_length)
+        """
+        if self._skip:
+            dropped = min(self._skip, len(block))
+            block = block[dropped:]
+            self._skip -= dropped
+
+        buffer = np.concatenate((self._buffer, block)) if len(self._buffer) else block
+        frames = frame_signal(buffer, self.frame_length, self.hop_length)
+
+        next_start = len(frames) * self.hop_length
+        self._skip += max(next_start - len(buffer), 0)
+        self._buffer = buffer[next_start:].copy()
+        self.frames_emitted += len(frames)
+        return frames
+
+    def pad_remainder(self) -> np.ndarray:
+        """
+        Return the zero-padded remainder as a single frame if no complete
+        frame was ever produced (mirrors the batch padding of short signals).
+
+        Returns:
+            Array of shape (0 or 1, frame_length)
+        """
+        if self.frames_emitted:
+            return np.empty((0, self.frame_length), dtype=self._buffer.dtype)
+        padded = np.pad(self._buffer, (0, self.frame_length - len(self._buffer)), mode='constant')
+        self.frames_emitted = 1
+        return padded[np.newaxis, :]
+
+
+class StreamingDecimator:
+    """
+    Stateful counterpart of AudioProcessor.decimate() for audio in blocks.
+
+    Uses the same polyphase FIR filter as scipy.signal.resample_poly and
+    carries the last input samples between blocks. Concatenating the
+    outputs of process() and flush() therefore gives the same samples as
+    resample_poly on the whole signal (up to float rounding). Equal rates
+    pass the blocks through unchanged.
+    """
+
+    OUTPUTS_PER_BATCH = 8192  # Bounds the (outputs, taps) gather per step
+
+    def __init__(self, input_rate: int, output_rate: int):
+        """
+        Initialize the decimator.
+
+        Args:
+            input_rate: Sample rate of the blocks (Hz)
+            output_rate: Sample rate to produce (Hz)
+
+        Raises:
+            ValueError: If either rate is not a positive integer
+        """
+        from math import gcd
+        from scipy.signal import firwin
+
+        if int(input_rate) != input_rate or int(output_rate) != output_rate or min(input_rate, output_rate) <= 0:
+            raise ValueError(f"Sample rates must be positive integers, got {input_rate} and {output_rate}")
+        divisor = gcd(int(input_rate), int(output_rate))
+        self.up = int(output_rate) // divisor
+        self.down = int(input_rate) // divisor
+
+        if self.up == self.down:
+            # Equal rates: a single unit tap (firwin cannot design a cutoff at Nyquist)
+            self._half_len = 0
+            taps = np.ones(1)
+        else:
+            # resample_poly's default filter: Kaiser-windowed sinc, gain up
+            max_rate = max(self.up, self.down)
+            self._half_len = 10 * max_rate
+            taps = firwin(2 * self._half_len + 1, 1.0 / max_rate, window=('kaiser', 5.0)) * self.up
+        self._n_taps = -(-len(taps) // self.up)  # Input samples per output
+        padded = np.zeros(self._n_taps * self.up)
+        padded[:len(taps)] = taps
+        # phases[p, j] weights input n0 - (n_taps - 1) + j of an output with phase p
+        self._phases = padded.reshape(self._n_taps, self.up).T[:, ::-1].copy()
+        self.reset()
+
+    def reset(self):
+        """Forget all previous input."""
+        self._history = np.zeros(self._n_taps - 1)  # Inputs before the next block (zeros before the start)
+        self.inputs = 0
+        self.outputs = 0
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """
+        Resample the next block.
+
+        Args:
+            block: Next input samples (1D)
+
+        Returns:
+            Every output sample whose inputs are now available (float32)
+        """
+        inputs = self.inputs + len(block)
+        # Outputs whose newest input, (m * down + half_len) // up, has arrived
+        end = max((inputs * self.up - 1 - self._half_len) // self.down + 1, self.outputs)
+        outputs = self._emit(np.asarray(block, dtype=np.float64), end)
+        self.inputs = inputs
+        return outputs
+
+    def flush(self) -> np.ndarray:
+        """
+        Return the remaining outputs, treating inputs past the end as zeros.
+
+        Returns:
+            Output samples, so the total is ceil(inputs * up / down)
+        """
+        end = -(-self.inputs * self.up // self.down)
+        newest = ((end - 1) * self.down + self._half_len) // self.up if end > self.outputs else 0
+        return self._emit(np.zeros(max(newest - self.inputs + 1, 0)), end, keep_history=False)
+
+    def _emit(self, block: np.ndarray, end: int, keep_history: bool = True) -> np.ndarray:
+        # Outputs [self.outputs, end) from the history followed by block
+        buffer = np.concatenate((self._history, block))
+        buffer_start = self.inputs - len(self._history)
+        outputs = np.empty(end - self.outputs, dtype=np.float32)
+        if len(outputs):
+            windows = np.lib.stride_tricks.sliding_window_view(buffer, self._n_taps)
+        for first in range(self.outputs, end, self.OUTPUTS_PER_BATCH):
+            m = np.arange(first, min(first + self.OUTPUTS_PER_BATCH, end))
+            center = m * self.down + self._half_len
+            newest = center // self.up
+            rows = windows[newest - (self._n_taps - 1) - buffer_start]
+            outputs[first - self.outputs:m[-1] + 1 - self.outputs] = \
+                np.einsum('ij,ij->i', rows, self._phases[center % self.up])
+
+        self.outputs = end
+        if keep_history:
+            self._history = buffer[len(buffer) - (self._n_taps - 1):]
+        return outputs
+
+    def blocks(self, blocks) -> Generator[np.ndarray, None, None]:
+        """
+        Resample an iterable of blocks, ending with flush().
+
+        Args:
+            blocks: Iterable of input blocks
+
+        Yields:
+            Output blocks
+        """
+        for block in blocks:
+            yield self.process(block)
+        yield self.flush()
+
+
+class StreamingAnalyzer:
+    """
+    Incremental counterpart of AudioProcessor.process_audio_file().
+
+    Audio is fed in arbitrary-sized blocks. Only a few frames of samples and
+    smoothing history are retained, so memory use does not depend on the
+    length of the recording. finalize() returns the same summary as the
+    batch pipeline (without the per-window 'db_values' array).
+    """
+
+    def __init__(self, processor: 'AudioProcessor', window_size: Optional[int] = None,
+                 smoothing_window: int = SMOOTHING_WINDOW_SIZE, n_fft: Optional[int] = None):
+        """
+        Initialize the streaming analyzer.
+
+        Args:
+            processor: AudioProcessor providing sample rate and features
+            window_size: Size of window for RMS calculation (samples);
+                defaults to processor.db_window_size
+            smoothing_window: Moving average window (dB values)
+            n_fft: FFT size for the spectral features; defaults to
+                processor.n_fft
+        """
+        window_size = window_size or processor.db_window_size
+        n_fft = n_fft or processor.n_fft
+        self.processor = processor
+        self.window_size = window_size
+        self.smoothing_window = smoothing_window
+        self.n_fft = n_fft
+        self.total_samples = 0
+
+        self._db_frames = FrameBuffer(window_size, max(window_size // 2, 1))
+        self._spectrum_frames = FrameBuffer(n_fft, max(n_fft // 2, 1))
+
+        # Centered moving average continued across blocks (same output as
+        # the batch np.convolve(mode='same') filter)
+        self._smoother = MovingAverageFilter(smoothing_window, mode='centered')
+        self._raw_count = 0
+        self._raw_head = []  # First values, needed if the trace is too short to smooth
+
+        # Running statistics of the smoothed dB trace (Welford)
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._max = -np.inf
+        self._min = np.inf
+
+        # Distribution of the raw dB values, for the noise indices
+        self._histogram = LevelHistogram()
+
+        # Spectrum state
+        self._plan = processor.get_spectral_plan(n_fft)
+        self._head = np.empty(0, dtype=self._plan.dtype)  # First n_fft samples
+        self._power_sum = np.zeros(n_fft // 2 + 1)
+
+    def feed(self, block: np.ndarray) -> np.ndarray:
+        """
+        Process the next block of mono audio.
+
+        Args:
+            block: Audio samples (1D array)
+
+        Returns:
+            Raw dB values of every window completed by this block
+        """
+        block = self.processor.as_processing_dtype(block)
+        self.total_samples += len(block)
+        if len(self._head) < self.n_fft:
+            self._head = np.concatenate((self._head, block[:self.n_fft - len(self._head)]))
+
+        with self.processor._stage('fft') as stage:
+            frames = self._spectrum_frames.push(block)
+            self._accumulate_spectrum(frames)
+            stage.add(samples=len(block), frames=len(frames))
+
+        with self.processor._stage('db') as stage:
+            db_values = frames_to_decibels(self._db_frames.push(block))
+            self._accumulate_decibels(db_values)
+            stage.add(samples=len(block), frames=len(db_values))
+        return db_values
+
+    def finalize(self, file_path: Optional[str] = None) -> AnalysisResult:
+        """
+        Flush remaining state and build the analysis summary.
+
+        Args:
+            file_path: Source path recorded in the results
+
+        Returns:
+            AnalysisResult with the same scalar features as process_audio_file()
+        """
+        self._accumulate_spectrum(self._spectrum_frames.pad_remainder())
+        self._accumulate_decibels(frames_to_decibels(self._db_frames.pad_remainder()))
+
+        if self._raw_count < self.smoothing_window:
+            # Too short to smooth; the batch filter returns the trace unchanged
+            trace = np.array(self._raw_head)
+            avg_db, max_db, min_db, std_db = trace.mean(), trace.max(), trace.min(), trace.std()
+        else:
+            # Flush the trailing outputs, which see zero padding past the end
+            self._update_stats(self._smoother.flush())
+            avg_db, max_db, min_db = self._mean, self._max, self._min
+            std_db = np.sqrt(self._m2 / self._count)
+
+        frequencies, magnitudes = self._head_spectrum()
+        n_frames = self._spectrum_frames.frames_emitted
+        averaged_magnitudes = np.sqrt(self._power_sum / max(n_frames, 1))
+        averaged_magnitudes = self.processor.as_processing_dtype(averaged_magnitudes)
+        if self.processor.spectrum_mode == 'averaged':
+            magnitudes = averaged_magnitudes
+
+        spectral_features = self.processor.extract_spectral_features(frequencies, magnitudes)
+        low, mid, high = self.processor.calculate_band_energies(frequencies, averaged_magnitudes)
+
+        return AnalysisResult({
+            'file_path': file_path,
+            'duration': self.total_samples / self.processor.sample_rate,
+            'avg_decibels': avg_db,
+            'max_decibels': max_db,
+            'min_decibels': min_db,
+            'std_decibels': std_db,
+            **self._histogram.indices(),
+            'level_histogram': self._histogram,
+            'classification': self.processor.classify_noise_simple(avg_db),
+            'frequencies': frequencies,
+            'magnitudes': magnitudes,
+            'averaged_magnitudes': averaged_magnitudes,
+            'band_energies': {'low': low, 'mid': mid, 'high': high},
+            **spectral_features
+        })
+
+    def _accumulate_decibels(self, db_values: np.ndarray):
+        if len(self._raw_head) < self.smoothing_window:
+            self._raw_head.extend(db_values[:self.smoothing_window - len(self._raw_head)])
+        self._raw_count += len(db_values)
+        self._histogram.update(db_values)
+        self._update_stats(self._smoother.process(db_values))
+
+    def _update_stats(self, values: np.ndarray):
+        if len(values) == 0:
+            return
+        # Chan et al. parallel update of count/mean/M2
+        n = len(values)
+        mean = values.mean()
+        m2 = np.sum((values - mean) ** 2)
+        total = self._count + n
+        delta = mean - self._mean
+        self._mean += delta * n / total
+        self._m2 += m2 + delta ** 2 * self._count * n / total
+        self._count = total
+        self._max = max(self._max, values.max())
+        self._min = min(self._min, values.min())
+
+    def _accumulate_spectrum(self, frames: np.ndarray):
+        if len(frames):
+            self._power_sum += accumulate_power(frames, self._plan.window, self.n_fft)
+
+    def _head_spectrum(self) -> Tuple[np.ndarray, np.ndarray]:
+        # 'single' mode spectrum: the whole-signal Hamming window is only
+        # known once the stream ends
+        window = hamming_head(self.total_samples, len(self._head), self._plan.dtype)
+        magnitudes = np.abs(np.fft.rfft(self._head * window, n=self.n_fft))
+        return self._plan.frequencies, magnitudes
+
 
 class AudioProcessor:
     """
     Process audio files to extract noise features and classify environments.
     """
 
-    def __init__(self, sample_rate: int = 44100):
+    def __init__(self, sample_rate: int = 44100, spectrum_mode: str = 'single',
+                 band_edges: Tuple[float, float] = DEFAULT_BAND_EDGES,
+                 dtype: Optional[str] = None, instrumentation: Optional[Instrumentation] = None,
+                 analysis_rate: Optional[int] = None):
         """
         Initialize the audio processor.
 
         Args:
-            sample_rate: Target sample rate for audio processing (Hz)
+            sample_rate: Target sample rate for audio processing (Hz); with
+                an analysis_rate, the nominal rate of the incoming audio
+                (kept as input_rate, e.g. the device rate of live streams)
+            spectrum_mode: Default perform_fft() mode, 'single' or 'averaged'
+            band_edges: Low/mid and mid/high split frequencies (Hz)
+            dtype: 'float32' keeps every stage (samples, windows, filters,
+                spectra) in single precision; 'float64' is the reference.
+                None keeps the Phase 0 behaviour of mixing float32 samples
+                with float64 windows and filters.
+            instrumentation: Records per-stage timing and counters (load,
+                db, filter, fft, features, classify); None disables it.
+                Batch worker processes use their own copy, see
+                instrumentation.py.
+            analysis_rate: Reduced rate (Hz) to analyze at instead of
+                sample_rate, e.g. 16000. Loaded audio is decimated with
+                scipy.signal.resample_poly and the dB window and FFT sizes
+                are scaled from their REFERENCE_SAMPLE_RATE values to keep
+                their duration. Must be above twice the high band edge.
         """
-        self.sample_rate = sample_rate
+        if spectrum_mode not in SPECTRUM_MODES:
+            raise ValueError(f"spectrum_mode must be one of {SPECTRUM_MODES}, got '{spectrum_mode}'")
+        if len(band_edges) != 2:
+            raise ValueError(f"band_edges must contain two frequencies, got {band_edges}")
+        if dtype is not None and np.dtype(dtype).name not in PROCESSING_DTYPES:
+            raise ValueError(f"dtype must be one of {PROCESSING_DTYPES} or None, got '{dtype}'")
+        if analysis_rate is not None and analysis_rate <= 2 * max(band_edges):
+            raise ValueError(f"analysis_rate must exceed twice the highest band edge "
+                             f"({2 * max(band_edges):.0f} Hz), got {analysis_rate}")
+
+        self.analysis_rate = analysis_rate
+        self.input_rate = sample_rate
+        self.sample_rate = analysis_rate or sample_rate
+        if analysis_rate is None:
+            self.db_window_size, self.n_fft = DB_WINDOW_SIZE, FFT_SIZE
+        else:
+            scale = analysis_rate / REFERENCE_SAMPLE_RATE
+            self.db_window_size = 2 * max(int(round(DB_WINDOW_SIZE * scale / 2)), 1)
+            self.n_fft = 2 ** int(round(np.log2(FFT_SIZE * scale)))
+        self.spectrum_mode = spectrum_mode
+        self.band_edges = tuple(band_edges)
+        self.dtype = np.dtype(dtype) if dtype is not None else None
+        self._spectral_plans = {}  # SpectralPlan cache, see get_spectral_plan()
+        self.instrumentation = instrumentation
         self.reference_pressure = 20e-6  # Reference pressure in Pa (20 micropascals)
 
-    def load_audio(self, file_path: str) -> Tuple[np.ndarray, int]:
+    def feature_config(self, streaming: bool = False) -> Dict:
+        """
+        Parameters that determine the values process_audio_file() returns.
+
+        Used as part of the FeatureCache key, so cached features are
+        invalidated whenever any of these change.
+
+        Args:
+            streaming: Describe analyze_stream() instead of
+                process_audio_file(); the two paths differ slightly, so
+                their features are cached separately
+
+        Returns:
+            JSON-serializable dictionary
+        """
+        return {
+            'feature_version': FEATURE_VERSION,
+            'pipeline': 'streaming' if streaming else 'batch',
+            'sample_rate': self.sample_rate,
+            'analysis_rate': self.analysis_rate,
+            'spectrum_mode': self.spectrum_mode,
+            'band_edges': list(self.band_edges),
+            'dtype': self.dtype.name if self.dtype is not None else None,
+            'db_window_size': self.db_window_size,
+            'smoothing_window_size': SMOOTHING_WINDOW_SIZE,
+            'n_fft': self.n_fft,
+            'calibration_offset_db': CALIBRATION_OFFSET_DB,
+        }
+
+    def as_processing_dtype(self, data: np.ndarray) -> np.ndarray:
+        """
+        Convert data to the processor's dtype (no copy if it already matches).
+
+        Args:
+            data: Input array
+
+        Returns:
+            Array in self.dtype, or data unchanged if no dtype is set
+        """
+        if self.dtype is None:
+            return data
+        return np.asarray(data, dtype=self.dtype)
+
+    def _stage(self, name: str):
+        return timed_stage(self.instrumentation, name)
+
+    def _as_signal_matrix(self, signals: np.ndarray) -> np.ndarray:
+        signals = self.as_processing_dtype(np.asarray(signals))
+        if signals.ndim != 2:
+            raise ValueError(f"signals must have shape (n_signals, n_samples), got {signals.shape}")
+        return signals
+
+    def get_spectral_plan(self, n_fft: Optional[int] = None, window: str = 'hamming') -> SpectralPlan:
+        """
+        Return the cached SpectralPlan for this processor's configuration.
+
+        Args:
+            n_fft: FFT size (defaults to self.n_fft)
+            window: Window name (see WINDOW_FUNCTIONS)
+
+        Returns:
+            SpectralPlan shared by every call with the same parameters
+        """
+        n_fft = n_fft or self.n_fft
+        dtype = self.dtype or np.dtype(np.float64)
+        key = (self.sample_rate, n_fft, window, self.band_edges, dtype.name)
+        plan = self._spectral_plans.get(key)
+        if plan is None:
+            plan = SpectralPlan(self.sample_rate, n_fft, window, self.band_edges, dtype)
+            self._spectral_plans[key] = plan
+        return plan
+
+    def load_audio(self, file_path: str, verbose: bool = True,
+                   mmap: bool = False) -> Tuple[np.ndarray, int]:
         """
         Load audio file and resample if necessary.
 
+        Files libsndfile can decode (WAV, FLAC, OGG, ...) are read directly
+        with soundfile into float32; integer PCM is scaled by libsndfile
+        without an intermediate float64 copy. Channels are averaged to mono
+        and the signal is resampled only when the file's rate differs from
+        self.sample_rate (with librosa, or with decimate() when an
+        analysis_rate is set). Other formats fall back to librosa.load.
+
+        With mmap=True, uncompressed WAV files at self.sample_rate are read
+        through a memory map (see wav_reader.py). Mono float32 files are then
+        returned as a read-only view of the page cache without any copy.
+
         Args:
             file_path: Path to audio file (WAV, MP3, etc.)
+            verbose: Print a short summary of the loaded file
+            mmap: Memory-map uncompressed WAV files when possible
 
         Returns:
             Tuple of (audio_samples, sample_rate)
         """
-        try:
-            # Load audio file with librosa (handles multiple formats)
-            audio, sr = librosa.load(file_path, sr=self.sample_rate, mono=True)
+        with self._stage('load') as stage:
+            audio, sr = self._read_audio(file_path, mmap)
+            stage.add(bytes=audio.nbytes, samples=len(audio))
 
-            print(f"[OK] Loaded audio: {file_path}")
-            print(f"  Duration: {len(audio) / sr:.2f} seconds")
-            print(f"  Sample rate: {sr} Hz")
-            print(f"  Samples: {len(audio)}")
+        if verbose:
+            self._print_loaded(file_path, audio, sr)
+        return audio, sr
 
-            return audio, sr
+    def _read_audio(self, file_path: str, mmap: bool) -> Tuple[np.ndarray, int]:
+        wav = open_wav_memmap(file_path) if mmap else None
+        if wav is not None and wav.sample_rate == self.sample_rate:
+            return self.as_processing_dtype(wav.read()), wav.sample_rate
+
+        try:
+            try:
+                audio, sr = sf.read(file_path, dtype='float32', always_2d=True)
+            except RuntimeError:
+                # Format not supported by libsndfile (e.g. MP3 on older builds)
+                import librosa
+                target_rate = None if self.analysis_rate else self.sample_rate
+                audio, sr = librosa.load(file_path, sr=target_rate, mono=True)
+            else:
+                # Downmix to mono; single-channel audio is a view, not a copy
+                audio = audio[:, 0] if audio.shape[1] == 1 else audio.mean(axis=1, dtype=np.float32)
+            if sr != self.sample_rate:
+                if self.analysis_rate:
+                    audio = self.decimate(audio, sr)
+                else:
+                    import librosa
+                    audio = librosa.resample(audio, orig_sr=sr, target_sr=self.sample_rate)
+                sr = self.sample_rate
+
+            return self.as_processing_dtype(audio), sr
         except Exception as e:
             raise ValueError(f"Error loading audio file: {e}")
 
+    def decimate(self, audio: np.ndarray, input_rate: int) -> np.ndarray:
+        """
+        Resample audio to self.sample_rate with a polyphase filter.
+
+        scipy.signal.resample_poly upsamples by up, applies the anti-aliasing
+        FIR filter and keeps every down-th sample in one pass, computing only
+        the samples that are kept (44.1 kHz to 16 kHz: up=160, down=441).
+
+        Args:
+            audio: Samples at input_rate, shape (..., n_samples)
+            input_rate: Sample rate of audio (Hz)
+
+        Returns:
+            Samples at self.sample_rate, in the input's float dtype
+        """
+        from math import gcd
+        from scipy.signal import resample_poly
+
+        audio = np.asarray(audio)
+        if input_rate == self.sample_rate:
+            return audio
+        divisor = gcd(int(input_rate), int(self.sample_rate))
+        resampled = resample_poly(audio, self.sample_rate // divisor, int(input_rate) // divisor, axis=-1)
+        return resampled.astype(audio.dtype if audio.dtype.kind == 'f' else np.float32, copy=False)
+
+    def _print_loaded(self, file_path: str, audio: np.ndarray, sr: int):
+        print(f"[OK] Loaded audio: {file_path}")
+        print(f"  Duration: {len(audio) / sr:.2f} seconds")
+        print(f"  Sample rate: {sr} Hz")
+        print(f"  Samples: {len(audio)}")
+
     def calculate_rms(self, audio: np.ndarray) -> float:
         """
         Calculate Root Mean Square (RMS) of audio signal.
@@ -68,56 +866,75 @@ class AudioProcessor:
         Returns:
             RMS value
         """
+        audio = self.as_processing_dtype(audio)
         return np.sqrt(np.mean(audio**2))
 
-    def calculate_decibels(self, audio: np.ndarray, window_size: int = 4096) -> np.ndarray:
+    def calculate_decibels(self, audio: np.ndarray, window_size: Optional[int] = None,
+                           hop_size: Optional[int] = None) -> np.ndarray:
         """
         Calculate decibel levels (dB SPL) from audio samples.
 
-        Uses windowed RMS calculation for time-varying decibel levels.
+        Uses windowed RMS calculation for time-varying decibel levels. All
+        windows are evaluated at once on a strided frame view of the signal,
+        so no Python loop runs per window.
 
         Args:
             audio: Audio samples
-            window_size: Size of window for RMS calculation (samples)
+            window_size: Size of window for RMS calculation (samples);
+                defaults to self.db_window_size
+            hop_size: Step between window starts (samples). Defaults to
+                window_size // 2 (50% overlap).
 
         Returns:
             Array of decibel values over time
         """
-        # Pad audio if too short
-        if len(audio) < window_size:
-            audio = np.pad(audio, (0, window_size - len(audio)), mode='constant')
-
-        # Calculate RMS in sliding windows
-        num_windows = len(audio) // (window_size // 2) - 1
-        db_values = []
-
-        for i in range(num_windows):
-            start = i * (window_size // 2)
-            end = start + window_size
+        return self.calculate_decibels_batch(np.asarray(audio)[np.newaxis], window_size, hop_size)[0]
 
-            if end > len(audio):
-                break
-
-            window = audio[start:end]
-            rms = self.calculate_rms(window)
-
-            # Convert to dB SPL
-            # dB = 20 * log10(RMS / reference)
-            # Add small epsilon to avoid log(0)
-            epsilon = 1e-10
-            db = 20 * np.log10(rms + epsilon)
-
-            # Normalize to typical environmental range (0-120 dB)
-            # This calibration factor may need adjustment based on actual recordings
-            db_normalized = db + 94  # Calibration offset
-            db_values.append(db_normalized)
+    def calculate_decibels_batch(self, signals: np.ndarray, window_size: Optional[int] = None,
+                                 hop_size: Optional[int] = None) -> np.ndarray:
+        """
+        Calculate decibel levels for many equal-length signals at once.
 
-        return np.array(db_values)
+        Args:
+            signals: Stacked clips or channels, shape (n_signals, n_samples)
+                (multi-channel audio read with soundfile: pass audio.T)
+            window_size: Size of window for RMS calculation (samples);
+                defaults to self.db_window_size
+            hop_size: Step between window starts (samples). Defaults to
+                window_size // 2 (50% overlap).
 
-    def moving_average_filter(self, data: np.ndarray, window_size: int = 10) -> np.ndarray:
+        Returns:
+            Decibel values, shape (n_signals, n_windows)
+        """
+        window_size = window_size or self.db_window_size
+        if hop_size is None:
+            hop_size = max(window_size // 2, 1)
+        if hop_size < 1:
+            raise ValueError(f"hop_size must be positive, got {hop_size}")
+        signals = self._as_signal_matrix(signals)
+
+        # Pad signals if too short
+        if signals.shape[1] < window_size:
+            signals = np.pad(signals, ((0, 0), (0, window_size - signals.shape[1])), mode='constant')
+
+        with self._stage('db') as stage:
+            # (n_signals, n_windows, window_size) view of the signals, no copy
+            frames = frame_signal(signals, window_size, hop_size)
+            db_values = frames_to_decibels(frames)
+            stage.add(samples=signals.size, frames=db_values.size)
+        return db_values
+
+    def moving_average_filter(self, data: np.ndarray,
+                              window_size: int = SMOOTHING_WINDOW_SIZE) -> np.ndarray:
         """
         Apply moving average filter to smooth data.
 
+        Centered average with zero padding at the edges, equivalent to
+        np.convolve(data, ones(window_size) / window_size, mode='same').
+        Computed with running sums, so the cost does not grow with
+        window_size. Use filters.MovingAverageFilter directly for causal or
+        chunk-by-chunk smoothing.
+
         Args:
             data: Input data (1D array)
             window_size: Size of moving window
@@ -125,40 +942,146 @@ class AudioProcessor:
         Returns:
             Filtered data
         """
+        data = self.as_processing_dtype(data)
         if len(data) < window_size:
             return data
 
-        # Use convolution for efficient moving average
-        kernel = np.ones(window_size) / window_size
-        filtered = np.convolve(data, kernel, mode='same')
+        with self._stage('filter') as stage:
+            filtered = MovingAverageFilter(window_size, mode='centered').filter(data)
+            stage.add(samples=len(data))
 
-        return filtered
+        return self.as_processing_dtype(filtered)
 
-    def perform_fft(self, audio: np.ndarray, n_fft: int = 2048) -> Tuple[np.ndarray, np.ndarray]:
+    def perform_fft(self, audio: np.ndarray, n_fft: Optional[int] = None,
+                    mode: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
         """
         Perform Fast Fourier Transform on audio signal.
 
+        In 'single' mode the first n_fft samples are transformed once, using
+        the Hamming window of the full signal length (Phase 0 behaviour, which
+        the baseline classifier was trained on). In 'averaged' mode the whole
+        signal is split into 50%-overlapping Hamming-windowed frames, all
+        frames are transformed in batched rfft calls, and the power is
+        averaged (Welch's method), so the spectrum describes the entire
+        recording at O(N log n_fft) cost.
+
         Args:
             audio: Audio samples
-            n_fft: FFT size (number of frequency bins)
+            n_fft: FFT size (number of frequency bins); defaults to self.n_fft
+            mode: 'single' or 'averaged' (defaults to self.spectrum_mode)
 
         Returns:
-            Tuple of (frequencies, magnitudes)
+            Tuple of (frequencies, magnitudes). Averaged magnitudes are the
+            square root of the mean power per bin.
         """
-        # Apply Hamming window to reduce spectral leakage
-        window = np.hamming(len(audio))
-        windowed_audio = audio * window
+        frequencies, magnitudes = self.perform_fft_batch(np.asarray(audio)[np.newaxis], n_fft, mode)
+        return frequencies, magnitudes[0]
+
+    def perform_fft_batch(self, signals: np.ndarray, n_fft: Optional[int] = None,
+                          mode: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compute the spectra of many equal-length signals in one rfft call.
+
+        Same spectra as perform_fft() applied to each row.
+
+        Args:
+            signals: Stacked clips or channels, shape (n_signals, n_samples)
+            n_fft: FFT size (number of frequency bins); defaults to self.n_fft
+            mode: 'single' or 'averaged' (defaults to self.spectrum_mode)
+
+        Returns:
+            Tuple of (frequencies, magnitudes), magnitudes of shape
+            (n_signals, n_fft // 2 + 1)
+        """
+        mode = mode or self.spectrum_mode
+        if mode not in SPECTRUM_MODES:
+            raise ValueError(f"mode must be one of {SPECTRUM_MODES}, got '{mode}'")
+        signals = self._as_signal_matrix(signals)
+        n_fft = n_fft or self.n_fft
+
+        # Window and frequency bins are precomputed once per configuration
+        plan = self.get_spectral_plan(n_fft)
+        frequencies = plan.frequencies
+
+        with self._stage('fft') as stage:
+            if mode == 'averaged':
+                if signals.shape[1] < n_fft:
+                    signals = np.pad(signals, ((0, 0), (0, n_fft - signals.shape[1])), mode='constant')
+                frames = frame_signal(signals, n_fft, max(n_fft // 2, 1))
+                power_sum = accumulate_power(frames, plan.window, n_fft)
+                magnitudes = self.as_processing_dtype(np.sqrt(power_sum / frames.shape[1]))
+                stage.add(samples=signals.size, frames=frames.shape[0] * frames.shape[1])
+                return frequencies, magnitudes
+
+            heads = signals[:, :n_fft]
+            magnitudes = self._head_spectrum(heads, signals.shape[1], plan)
+            stage.add(samples=heads.size, frames=len(heads))
+
+        return frequencies, magnitudes
+
+    def _head_spectrum(self, heads: np.ndarray, total_length: int, plan: SpectralPlan) -> np.ndarray:
+        # 'single' mode magnitudes from the first n_fft samples of signals of total_length
+        # Apply Hamming window to reduce spectral leakage. Only the samples
+        # the FFT actually reads are windowed.
+        windowed_audio = heads * hamming_head(total_length, heads.shape[1], plan.dtype)
 
         # Perform FFT
-        fft_result = np.fft.rfft(windowed_audio, n=n_fft)
+        fft_result = np.fft.rfft(windowed_audio, n=plan.n_fft, axis=-1)
 
         # Calculate magnitude spectrum
-        magnitudes = np.abs(fft_result)
+        return self.as_processing_dtype(np.abs(fft_result))
 
-        # Calculate corresponding frequencies
-        frequencies = np.fft.rfftfreq(n_fft, 1/self.sample_rate)
+    def calculate_band_levels(self, audio: np.ndarray, fraction: int = 3, weighting: str = 'A',
+                              n_fft: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Calculate frequency-weighted octave band levels for every frame.
 
-        return frequencies, magnitudes
+        The signal is split into 50%-overlapping Hamming-windowed frames
+        (as in 'averaged' mode) and transformed in batched rfft calls; each
+        batch of power spectra is reduced to band levels with one sparse
+        matrix product and to the overall weighted level with one
+        matrix-vector product.
+
+        Args:
+            audio: Audio samples, shape (n_samples,) or (n_signals, n_samples)
+            fraction: 1 for octave bands, 3 for third-octave bands
+            weighting: 'A', 'C' or 'Z'
+            n_fft: FFT size (defaults to self.n_fft); low bands need long
+                frames (at 44.1 kHz, 2048 gives one or two bins per
+                third-octave band below 100 Hz)
+
+        Returns:
+            Tuple of (band center frequencies (Hz), band levels (dB) of
+            shape (..., n_frames, n_bands), overall weighted levels (dB) of
+            shape (..., n_frames), e.g. dBA per frame)
+        """
+        n_fft = n_fft or self.n_fft
+        plan = self.get_spectral_plan(n_fft)
+        centers, matrix = plan.band_matrix(fraction, weighting)
+        weights = plan.level_weights(weighting)
+
+        audio = self.as_processing_dtype(np.asarray(audio))
+        if audio.shape[-1] < n_fft:
+            padding = [(0, 0)] * (audio.ndim - 1) + [(0, n_fft - audio.shape[-1])]
+            audio = np.pad(audio, padding, mode='constant')
+        frames = frame_signal(audio, n_fft, max(n_fft // 2, 1))
+
+        band_power = np.empty(frames.shape[:-1] + (len(centers),))
+        total_power = np.empty(frames.shape[:-1])
+        for start in range(0, frames.shape[-2], SPECTRUM_BATCH_FRAMES):
+            spectra = np.fft.rfft(frames[..., start:start + SPECTRUM_BATCH_FRAMES, :] * plan.window,
+                                  axis=-1)
+            power = spectra.real ** 2 + spectra.imag ** 2
+            stop = start + power.shape[-2]
+
+            total_power[..., start:stop] = power @ weights
+            band_power[..., start:stop, :] = \
+                (power.reshape(-1, power.shape[-1]) @ matrix).reshape(power.shape[:-1] + (-1,))
+
+        # Mean squares to calibrated dB
+        band_levels = 10 * np.log10(band_power + 1e-20) + CALIBRATION_OFFSET_DB
+        levels = 10 * np.log10(total_power + 1e-20) + CALIBRATION_OFFSET_DB
+        return centers, self.as_processing_dtype(band_levels), self.as_processing_dtype(levels)
 
     def extract_spectral_features(self, frequencies: np.ndarray, magnitudes: np.ndarray) -> Dict[str, float]:
         """
@@ -171,37 +1094,59 @@ class AudioProcessor:
         Returns:
             Dictionary of features
         """
+        features = self.extract_spectral_features_batch(frequencies, np.asarray(magnitudes)[np.newaxis])
+        return {name: values[0] for name, values in features.items()}
+
+    def extract_spectral_features_batch(self, frequencies: np.ndarray,
+                                        magnitudes: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Extract frequency-domain features for many spectra at once.
+
+        Args:
+            frequencies: Frequency bins (Hz)
+            magnitudes: Magnitude values, shape (n_signals, n_bins)
+
+        Returns:
+            Dictionary of feature columns, each of shape (n_signals,)
+            (pass to pandas.DataFrame for a feature matrix)
+        """
+        with self._stage('features') as stage:
+            features = self._spectral_features(frequencies, magnitudes)
+            stage.add(frames=len(magnitudes))
+        return features
+
+    def _spectral_features(self, frequencies: np.ndarray, magnitudes: np.ndarray) -> Dict[str, np.ndarray]:
         # Normalize magnitudes
-        magnitudes_norm = magnitudes / (np.sum(magnitudes) + 1e-10)
+        magnitudes_norm = magnitudes / (np.sum(magnitudes, axis=-1, keepdims=True) + 1e-10)
 
         # Spectral Centroid (weighted mean of frequencies)
-        spectral_centroid = np.sum(frequencies * magnitudes_norm)
+        spectral_centroid = np.sum(frequencies * magnitudes_norm, axis=-1)
 
         # Spectral Spread (standard deviation of frequency)
-        spectral_spread = np.sqrt(np.sum(((frequencies - spectral_centroid) ** 2) * magnitudes_norm))
+        deviations = (frequencies - spectral_centroid[:, np.newaxis]) ** 2
+        spectral_spread = np.sqrt(np.sum(deviations * magnitudes_norm, axis=-1))
 
         # Spectral Rolloff (frequency below which 85% of energy is contained)
-        cumsum = np.cumsum(magnitudes_norm)
-        rolloff_idx = np.where(cumsum >= 0.85)[0]
-        spectral_rolloff = frequencies[rolloff_idx[0]] if len(rolloff_idx) > 0 else frequencies[-1]
+        above_rolloff = np.cumsum(magnitudes_norm, axis=-1) >= 0.85
+        rolloff_idx = np.where(above_rolloff.any(axis=-1), np.argmax(above_rolloff, axis=-1), -1)
+        spectral_rolloff = frequencies[rolloff_idx]
 
         # Spectral Flatness (measure of noisiness)
         # Ratio of geometric mean to arithmetic mean
-        geometric_mean = np.exp(np.mean(np.log(magnitudes + 1e-10)))
-        arithmetic_mean = np.mean(magnitudes)
+        geometric_mean = np.exp(np.mean(np.log(magnitudes + 1e-10), axis=-1))
+        arithmetic_mean = np.mean(magnitudes, axis=-1)
         spectral_flatness = geometric_mean / (arithmetic_mean + 1e-10)
 
         # Zero Crossing Rate (calculated from time domain - approximation here)
-        spectral_entropy = -np.sum(magnitudes_norm * np.log2(magnitudes_norm + 1e-10))
+        spectral_entropy = -np.sum(magnitudes_norm * np.log2(magnitudes_norm + 1e-10), axis=-1)
 
         # Dominant frequency
-        dominant_freq_idx = np.argmax(magnitudes)
+        dominant_freq_idx = np.argmax(magnitudes, axis=-1)
         dominant_frequency = frequencies[dominant_freq_idx]
 
         # Energy in different frequency bands
-        low_freq_energy = np.sum(magnitudes[frequencies < 250])  # < 250 Hz
-        mid_freq_energy = np.sum(magnitudes[(frequencies >= 250) & (frequencies < 4000)])  # 250-4000 Hz
-        high_freq_energy = np.sum(magnitudes[frequencies >= 4000])  # > 4000 Hz
+        low_freq_energy, mid_freq_energy, high_freq_energy = \
+            self.calculate_band_energies(frequencies, magnitudes)
 
         total_energy = low_freq_energy + mid_freq_energy + high_freq_energy
 
@@ -217,6 +1162,50 @@ class AudioProcessor:
             'high_freq_ratio': high_freq_energy / (total_energy + 1e-10),
         }
 
+    def calculate_band_energies(self, frequencies: np.ndarray,
+                                magnitudes: np.ndarray) -> Tuple[float, float, float]:
+        """
+        Sum magnitudes in the low, mid and high frequency bands.
+
+        Spectra whose bins are the rfft bins of this processor's sample rate
+        (perform_fft() output, also after pickling) are reduced with one
+        np.add.reduceat call on the cached SpectralPlan; other frequency
+        arrays fall back to boolean band masks.
+
+        Args:
+            frequencies: Frequency bins (Hz)
+            magnitudes: Magnitude values, shape (..., n_bins)
+
+        Returns:
+            Tuple of (low, mid, high) band energies, each of shape (...)
+        """
+        plan = self._plan_for_frequencies(frequencies)
+        if plan is not None:
+            low_freq_energy, mid_freq_energy, high_freq_energy = \
+                np.moveaxis(plan.band_energies(magnitudes), -1, 0)
+            return low_freq_energy, mid_freq_energy, high_freq_energy
+
+        low_edge, high_edge = self.band_edges
+        low_freq_energy = np.sum(magnitudes[..., frequencies < low_edge], axis=-1)
+        mid_freq_energy = np.sum(magnitudes[..., (frequencies >= low_edge) & (frequencies < high_edge)],
+                                 axis=-1)
+        high_freq_energy = np.sum(magnitudes[..., frequencies >= high_edge], axis=-1)
+        return low_freq_energy, mid_freq_energy, high_freq_energy
+
+    def _plan_for_frequencies(self, frequencies: np.ndarray) -> Optional[SpectralPlan]:
+        # The bins determine n_fft: an even n_fft ends at Nyquist, an odd one below it
+        frequencies = np.asarray(frequencies)
+        n_bins = len(frequencies) if frequencies.ndim == 1 else 0
+        if n_bins < 2:
+            return None
+        n_fft = 2 * (n_bins - 1) if frequencies[-1] == self.sample_rate / 2 else 2 * n_bins - 1
+        if not np.isclose(frequencies[1], self.sample_rate / n_fft):
+            return None
+        plan = self.get_spectral_plan(n_fft)
+        if plan.frequencies is frequencies or np.array_equal(plan.frequencies, frequencies):
+            return plan
+        return None
+
     def classify_noise_simple(self, avg_db: float) -> str:
         """
         Simple threshold-based noise classification.
@@ -227,32 +1216,101 @@ class AudioProcessor:
         Returns:
             Classification label ('Quiet', 'Normal', or 'Noisy')
         """
-        if avg_db < 50:
-            return 'Quiet'
-        elif avg_db < 70:
-            return 'Normal'
-        else:
-            return 'Noisy'
+        with self._stage('classify') as stage:
+            stage.add(frames=1)
+            if avg_db < NOISE_THRESHOLDS_DB[0]:
+                return 'Quiet'
+            elif avg_db < NOISE_THRESHOLDS_DB[1]:
+                return 'Normal'
+            else:
+                return 'Noisy'
+
+    def classify_noise_batch(self, avg_db: np.ndarray) -> np.ndarray:
+        """
+        Threshold-based classification of many average levels at once.
+
+        Args:
+            avg_db: Average decibel levels (any shape)
 
-    def process_audio_file(self, file_path: str, verbose: bool = True) -> Dict:
+        Returns:
+            Array of labels with the same shape, as classify_noise_simple()
+        """
+        with self._stage('classify') as stage:
+            levels = np.searchsorted(NOISE_THRESHOLDS_DB, np.asarray(avg_db), side='right')
+            stage.add(frames=levels.size)
+            return np.asarray(NOISE_CLASSES)[levels]
+
+    def process_audio_file(self, file_path: str, verbose: bool = True,
+                           arrays: bool = True, n_workers: int = 1,
+                           segment_seconds: float = PARALLEL_SEGMENT_SECONDS) -> AnalysisResult:
         """
         Complete processing pipeline for an audio file.
 
         Args:
             file_path: Path to audio file
             verbose: Print detailed output
+            arrays: Keep 'db_values', 'frequencies', 'magnitudes' and
+                'level_histogram' in the result; if False they are
+                recomputed from the file when first accessed
+            n_workers: Worker processes analyzing segments of the file in
+                parallel (see process_segments()); 1 analyzes it in this
+                process. Files process_segments() cannot split (shorter than
+                one segment, not at self.sample_rate, or not decodable by
+                libsndfile) are still analyzed sequentially.
+            segment_seconds: Segment length when n_workers != 1
 
         Returns:
-            Dictionary with all extracted features and classification
+            AnalysisResult (a read-only mapping) with all extracted features
+            and classification. 'level_histogram'
+            (noise_indices.LevelHistogram) holds the distribution behind the
+            noise indices, for merging with other files or chunks.
         """
+        if n_workers != 1:
+            results = self.process_segments(file_path, n_workers, segment_seconds, arrays)
+            if results is not None:
+                if verbose:
+                    self.print_results(results)
+                return results
+
         # Load audio
-        audio, sr = self.load_audio(file_path)
+        audio, sr = self.load_audio(file_path, verbose=verbose)
+
+        results = self.analyze_audio(audio, sr, file_path, arrays=arrays)
+        if verbose:
+            self.print_results(results)
+
+        return results
+
+    def analyze_audio(self, audio: np.ndarray, sample_rate: Optional[int] = None,
+                      file_path: Optional[str] = None, arrays: bool = True) -> AnalysisResult:
+        """
+        Analyze samples already in memory (process_audio_file() without loading).
 
+        Args:
+            audio: Mono samples at self.sample_rate, e.g. from load_audio()
+            sample_rate: Sample rate of audio (defaults to self.sample_rate)
+            file_path: Source recorded in the results; with arrays=False it
+                is also re-read to load the arrays on access
+            arrays: As in process_audio_file()
+
+        Returns:
+            AnalysisResult
+        """
         # Calculate decibels
         db_values = self.calculate_decibels(audio)
 
+        # Perform FFT (spectrum mode set on the processor)
+        frequencies, magnitudes = self.perform_fft(audio)
+
+        return self._compile_results(file_path, len(audio) / (sample_rate or self.sample_rate),
+                                     db_values, frequencies, magnitudes, arrays)
+
+    def _compile_results(self, file_path: str, duration: float, db_values: np.ndarray,
+                         frequencies: np.ndarray, magnitudes: np.ndarray,
+                         arrays: bool) -> AnalysisResult:
+        # Everything process_audio_file() derives from the raw dB trace and the spectrum
         # Apply moving average filter
-        db_filtered = self.moving_average_filter(db_values, window_size=10)
+        db_filtered = self.moving_average_filter(db_values, window_size=SMOOTHING_WINDOW_SIZE)
 
         # Calculate statistics
         avg_db = np.mean(db_filtered)
@@ -260,8 +1318,9 @@ class AudioProcessor:
         min_db = np.min(db_filtered)
         std_db = np.std(db_filtered)
 
-        # Perform FFT on full audio
-        frequencies, magnitudes = self.perform_fft(audio)
+        # Noise indices (Leq, L10/L50/L90, Lmax) of the unsmoothed levels
+        histogram = LevelHistogram()
+        histogram.update(db_values)
 
         # Extract spectral features
         spectral_features = self.extract_spectral_features(frequencies, magnitudes)
@@ -270,45 +1329,345 @@ class AudioProcessor:
         classification = self.classify_noise_simple(avg_db)
 
         # Compile results
-        results = {
+        values = {
             'file_path': file_path,
-            'duration': len(audio) / sr,
+            'duration': duration,
             'avg_decibels': avg_db,
             'max_decibels': max_db,
             'min_decibels': min_db,
             'std_decibels': std_db,
+            **histogram.indices(),
+            'level_histogram': histogram,
             'classification': classification,
             'db_values': db_filtered,
             'frequencies': frequencies,
             'magnitudes': magnitudes,
             **spectral_features
         }
+        if arrays:
+            results = AnalysisResult(values)
+        else:
+            scalars = {key: value for key, value in values.items() if key not in ARRAY_FIELDS}
+            loader = partial(self._load_result_arrays, file_path) if file_path is not None else None
+            results = AnalysisResult(scalars, loader=loader)
+        return results
+
+    def process_segments(self, file_path: str, n_workers: Optional[int] = None,
+                         segment_seconds: float = PARALLEL_SEGMENT_SECONDS,
+                         arrays: bool = True) -> Optional[AnalysisResult]:
+        """
+        Analyze one long file by splitting it into segments processed in parallel.
+
+        Segment boundaries fall on multiples of the dB hop and of
+        SPECTRUM_BATCH_FRAMES spectral frames. Each worker reads its segment
+        plus the overlap needed by the windows and frames that start in it,
+        and returns their raw dB values (and, in 'averaged' mode, the power
+        sum of each batch of frames). The parent concatenates them in order
+        and then smooths, computes statistics and features exactly as
+        process_audio_file() does. The result is identical to the
+        sequential one.
+
+        Args:
+            file_path: Path to audio file (uncompressed or libsndfile-decodable)
+            n_workers: Worker processes (defaults to os.cpu_count())
+            segment_seconds: Approximate segment length; bounds the memory
+                of each worker
+            arrays: As in process_audio_file()
+
+        Returns:
+            AnalysisResult, or None if the file cannot be split exactly
+            (not decodable by libsndfile, not at self.sample_rate, or
+            shorter than one segment); process_audio_file() then analyzes it
+            sequentially
+        """
+        try:
+            info = sf.info(file_path)
+        except RuntimeError:
+            return None
+        window_size, n_fft = self.db_window_size, self.n_fft
+        db_hop, frame_hop = max(window_size // 2, 1), max(n_fft // 2, 1)
+        n_samples = info.frames
+        if info.samplerate != self.sample_rate or n_samples < max(window_size, n_fft):
+            return None
+
+        # Windows and frames starting in [start, stop) belong to a segment
+        alignment = math.lcm(db_hop, frame_hop * SPECTRUM_BATCH_FRAMES)
+        segment_length = max(int(segment_seconds * self.sample_rate) // alignment, 1) * alignment
+        if segment_length >= n_samples:
+            return None
+        n_windows = (n_samples - window_size) // db_hop + 1
+        n_frames = (n_samples - n_fft) // frame_hop + 1
+        averaged = self.spectrum_mode == 'averaged'
+
+        tasks = []
+        for start in range(0, n_samples, segment_length):
+            first_window, first_frame = start // db_hop, start // frame_hop
+            window_count = min(n_windows, (start + segment_length) // db_hop) - first_window
+            frame_count = min(n_frames, (start + segment_length) // frame_hop) - first_frame if averaged else 0
+            if window_count <= 0 and frame_count <= 0:
+                break
+            stop = max(start + (window_count - 1) * db_hop + window_size,
+                       start + (frame_count - 1) * frame_hop + n_fft)
+            tasks.append((file_path, start, min(stop, n_samples), max(window_count, 0), max(frame_count, 0)))
+
+        n_workers = min(n_workers or os.cpu_count() or 1, len(tasks))
+        if n_workers == 1:
+            segments = [_analyze_segment(task, self) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_batch_worker,
+                                     initargs=(self, False)) as pool:
+                segments = list(pool.map(_analyze_segment, tasks))
+
+        db_values = np.concatenate([db for db, _ in segments])
+        plan = self.get_spectral_plan(n_fft)
+        if averaged:
+            # Batch sums added in the same order as accumulate_power()
+            power_sum = np.zeros((1, n_fft // 2 + 1))
+            for _, batch_sums in segments:
+                for batch_sum in batch_sums:
+                    power_sum += batch_sum
+            magnitudes = self.as_processing_dtype(np.sqrt(power_sum / n_frames))[0]
+        else:
+            head = self._read_segment(file_path, 0, n_fft)
+            magnitudes = self._head_spectrum(head[np.newaxis], n_samples, plan)[0]
+
+        return self._compile_results(file_path, n_samples / self.sample_rate, db_values,
+                                     plan.frequencies, magnitudes, arrays)
+
+    def _read_segment(self, file_path: str, start: int, stop: int) -> np.ndarray:
+        # Samples [start, stop) as load_audio() would return them
+        with self._stage('load') as stage:
+            audio, _ = sf.read(file_path, start=start, stop=stop, dtype='float32', always_2d=True)
+            audio = audio[:, 0] if audio.shape[1] == 1 else audio.mean(axis=1, dtype=np.float32)
+            stage.add(bytes=audio.nbytes, samples=len(audio))
+        return self.as_processing_dtype(audio)
+
+    def _load_result_arrays(self, file_path: str) -> Dict:
+        # Loader of results created with arrays=False
+        return self.process_audio_file(file_path, verbose=False).arrays()
+
+    def process_stream(self, file_path: str,
+                       block_size: int = 65536) -> Generator[np.ndarray, None, AnalysisResult]:
+        """
+        Stream an audio file block by block with bounded memory.
+
+        Yields the raw per-window dB values as each block is read. The
+        generator's return value (StopIteration.value, or the result of
+        ``yield from``) is the same summary as process_audio_file(), minus
+        the per-window 'db_values' array. Use analyze_stream() to drain the
+        generator and get the summary directly.
+
+        With an analysis_rate, files at another rate are decimated block by
+        block with a StreamingDecimator (same filter as decimate()).
+
+        Args:
+            file_path: Path to audio file (at self.sample_rate, or any rate
+                when an analysis_rate is set)
+            block_size: Samples read from disk per block
+
+        Returns:
+            Generator of dB arrays, returning the AnalysisResult
+        """
+        # Uncompressed WAV is sliced straight from a memory map; other
+        # formats are decoded block by block
+        wav = open_wav_memmap(file_path)
+        sample_rate = wav.sample_rate if wav is not None else sf.info(file_path).samplerate
+        if sample_rate != self.sample_rate and not self.analysis_rate:
+            raise ValueError(
+                f"Streaming requires a {self.sample_rate} Hz file, "
+                f"got {sample_rate} Hz: {file_path}"
+            )
+
+        if wav is not None:
+            blocks = wav.blocks(block_size)
+        else:
+            blocks = (block.mean(axis=1, dtype=np.float32) for block in
+                      sf.blocks(file_path, blocksize=block_size, dtype='float32', always_2d=True))
+        if sample_rate != self.sample_rate:
+            blocks = StreamingDecimator(sample_rate, self.sample_rate).blocks(blocks)
+
+        analyzer = StreamingAnalyzer(self)
+        for block in self._timed_blocks(blocks):
+            yield analyzer.feed(block)
+
+        return analyzer.finalize(file_path)
+
+    def _timed_blocks(self, blocks) -> Generator[np.ndarray, None, None]:
+        # Record the reading/decoding of each block as a 'load' stage
+        while True:
+            with self._stage('load') as stage:
+                block = next(blocks, None)
+                if block is not None:
+                    stage.add(bytes=block.nbytes, samples=len(block))
+            if block is None:
+                return
+            yield block
+
+    def analyze_stream(self, file_path: str, block_size: int = 65536,
+                       verbose: bool = False) -> AnalysisResult:
+        """
+        Bounded-memory alternative to process_audio_file().
+
+        Args:
+            file_path: Path to audio file (see process_stream())
+            block_size: Samples read from disk per block
+            verbose: Print detailed output
+
+        Returns:
+            AnalysisResult with all extracted features and classification
+        """
+        stream = self.process_stream(file_path, block_size)
+        while True:
+            try:
+                next(stream)
+            except StopIteration as stop:
+                results = stop.value
+                break
 
         if verbose:
-            print(f"\n{'='*60}")
-            print(f"AUDIO ANALYSIS RESULTS")
-            print(f"{'='*60}")
-            print(f"File: {file_path}")
-            print(f"Duration: {results['duration']:.2f} seconds")
-            print(f"\nDecibel Statistics:")
-            print(f"  Average: {avg_db:.1f} dB")
-            print(f"  Maximum: {max_db:.1f} dB")
-            print(f"  Minimum: {min_db:.1f} dB")
-            print(f"  Std Dev: {std_db:.1f} dB")
-            print(f"\nClassification: {classification}")
-            print(f"\nSpectral Features:")
-            print(f"  Spectral Centroid: {spectral_features['spectral_centroid']:.1f} Hz")
-            print(f"  Spectral Spread: {spectral_features['spectral_spread']:.1f} Hz")
-            print(f"  Dominant Frequency: {spectral_features['dominant_frequency']:.1f} Hz")
-            print(f"  Spectral Flatness: {spectral_features['spectral_flatness']:.4f}")
-            print(f"\nFrequency Distribution:")
-            print(f"  Low (<250 Hz): {spectral_features['low_freq_ratio']*100:.1f}%")
-            print(f"  Mid (250-4000 Hz): {spectral_features['mid_freq_ratio']*100:.1f}%")
-            print(f"  High (>4000 Hz): {spectral_features['high_freq_ratio']*100:.1f}%")
-            print(f"{'='*60}\n")
+            self.print_results(results)
 
         return results
 
+    def process_batch(self, file_paths: List[str], n_workers: Optional[int] = None,
+                      chunksize: Optional[int] = None, streaming: bool = False,
+                      cache: Optional['FeatureCache'] = None):
+        """
+        Analyze many files in parallel with a process pool.
+
+        Files are submitted to the pool in chunks, so per-task overhead is
+        paid once per chunk rather than once per file. Each worker receives a
+        copy of this processor once, when it starts. Failures are recorded
+        in the 'error' column instead of being printed or raised.
+
+        Args:
+            file_paths: Audio files to analyze
+            n_workers: Worker processes (defaults to os.cpu_count(); 1 runs
+                in this process without a pool)
+            chunksize: Files per submitted task (defaults to spreading the
+                batch over about 4 chunks per worker)
+            streaming: Use analyze_stream() instead of process_audio_file()
+            cache: FeatureCache to skip files whose content and processor
+                configuration were already analyzed; new results are stored
+
+        Returns:
+            pandas DataFrame with one row per input file, in input order:
+            'file_path', the scalar features, and 'error' (None on success)
+        """
+        import pandas as pd
+
+        file_paths = [str(path) for path in file_paths]
+        rows = [cache.get(path, self, streaming) if cache is not None else None for path in file_paths]
+        pending = [path for path, row in zip(file_paths, rows) if row is None]
+
+        n_workers = n_workers or os.cpu_count() or 1
+        n_workers = min(n_workers, max(len(pending), 1))
+
+        if n_workers == 1:
+            _init_batch_worker(self, streaming)
+            computed = [_analyze_batch_file(path) for path in pending]
+        else:
+            if chunksize is None:
+                chunksize = max(1, len(pending) // (n_workers * 4))
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_batch_worker,
+                                     initargs=(self, streaming)) as pool:
+                computed = list(pool.map(_analyze_batch_file, pending, chunksize=chunksize))
+
+        computed = iter(computed)
+        for i, row in enumerate(rows):
+            if row is None:
+                rows[i] = row = next(computed)
+                if cache is not None and row['error'] is None:
+                    cache.put(row['file_path'], self, row, streaming)
+        if cache is not None:
+            cache.commit()
+
+        table = pd.DataFrame(rows)
+        if 'error' not in table.columns:
+            table['error'] = None
+        # Missing entries become NaN in a DataFrame; keep None for successes
+        table['error'] = table['error'].astype(object).where(table['error'].notna(), None)
+        return table
+
+    def print_results(self, results: Dict):
+        """
+        Print a human-readable analysis report.
+
+        Args:
+            results: Output of process_audio_file() or analyze_stream()
+        """
+        print(f"\n{'='*60}")
+        print(f"AUDIO ANALYSIS RESULTS")
+        print(f"{'='*60}")
+        print(f"File: {results['file_path']}")
+        print(f"Duration: {results['duration']:.2f} seconds")
+        print(f"\nDecibel Statistics:")
+        print(f"  Average: {results['avg_decibels']:.1f} dB")
+        print(f"  Maximum: {results['max_decibels']:.1f} dB")
+        print(f"  Minimum: {results['min_decibels']:.1f} dB")
+        print(f"  Std Dev: {results['std_decibels']:.1f} dB")
+        print(f"\nNoise Indices:")
+        print(f"  Leq: {results['leq']:.1f} dB, Lmax: {results['lmax']:.1f} dB")
+        print(f"  L10: {results['l10']:.1f} dB, L50: {results['l50']:.1f} dB, L90: {results['l90']:.1f} dB")
+        print(f"\nClassification: {results['classification']}")
+        print(f"\nSpectral Features:")
+        print(f"  Spectral Centroid: {results['spectral_centroid']:.1f} Hz")
+        print(f"  Spectral Spread: {results['spectral_spread']:.1f} Hz")
+        print(f"  Dominant Frequency: {results['dominant_frequency']:.1f} Hz")
+        print(f"  Spectral Flatness: {results['spectral_flatness']:.4f}")
+        print(f"\nFrequency Distribution:")
+        low_edge, high_edge = self.band_edges
+        print(f"  Low (<{low_edge:.0f} Hz): {results['low_freq_ratio']*100:.1f}%")
+        print(f"  Mid ({low_edge:.0f}-{high_edge:.0f} Hz): {results['mid_freq_ratio']*100:.1f}%")
+        print(f"  High (>{high_edge:.0f} Hz): {results['high_freq_ratio']*100:.1f}%")
+        print(f"{'='*60}\n")
+
+
+# Per-process state for process_batch() workers
+_batch_processor = None
+_batch_streaming = False
+
+
+def _init_batch_worker(processor: AudioProcessor, streaming: bool):
+    global _batch_processor, _batch_streaming
+    _batch_processor = processor
+    _batch_streaming = streaming
+
+
+def _analyze_segment(task: Tuple, processor: Optional[AudioProcessor] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Raw dB values and per-batch power sums of one segment (process_segments())."""
+    file_path, start, stop, window_count, frame_count = task
+    # Pool workers use the processor from _init_batch_worker(); the parent passes its own
+    processor = processor or _batch_processor
+    segment = processor._read_segment(file_path, start, stop)[np.newaxis]
+
+    db_values = processor.calculate_decibels_batch(segment)[0, :window_count]
+
+    n_fft = processor.n_fft
+    plan = processor.get_spectral_plan(n_fft)
+    frames = frame_signal(segment, n_fft, max(n_fft // 2, 1))[:, :frame_count]
+    with processor._stage('fft') as stage:
+        batch_sums = np.array([accumulate_power(frames[:, first:first + SPECTRUM_BATCH_FRAMES], plan.window, n_fft)
+                               for first in range(0, frame_count, SPECTRUM_BATCH_FRAMES)])
+        stage.add(samples=frame_count * n_fft, frames=frame_count)
+    return db_values, batch_sums
+
+
+def _analyze_batch_file(file_path: str) -> Dict:
+    """Analyze one file in a batch worker and keep only scalar results."""
+    try:
+        if _batch_streaming:
+            results = _batch_processor.analyze_stream(file_path)
+        else:
+            results = _batch_processor.process_audio_file(file_path, verbose=False, arrays=False)
+    except Exception as e:
+        return {'file_path': file_path, 'error': f"{type(e).__name__}: {e}"}
+
+    row = results.to_row()
+    row['file_path'] = file_path
+    row['error'] = None
+    return row
+
 
 def test_audio_processor():
     """
@@ -348,6 +1707,13 @@ def test_audio_processor():
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Analyze the given files
+        processor = AudioProcessor()
+        for file_path in sys.argv[1:]:
+            processor.process_audio_file(file_path)
+        sys.exit(0)
+
     # Run tests
     processor, quiet_results, noisy_results = test_audio_processor()
 
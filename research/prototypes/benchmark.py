@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Micro-Benchmark Suite for Noise Environment Monitor
+
+Times the AudioProcessor hot paths (calculate_rms, calculate_decibels,
+moving_average_filter, perform_fft, extract_spectral_features,
+process_audio_file) across signal durations, sample rates and processing
+dtypes, and appends the results to a JSON lines history file together with
+the git commit they were measured on. The compare command lines up two runs
+and flags every benchmark that got slower by more than a threshold.
+
+Each benchmark is called in loops long enough to time reliably (like
+timeit's autorange) and repeated; the fastest repeat is the figure of
+merit, as it is least disturbed by other load on the machine.
+
+Usage:
+    python benchmark.py run                      # full matrix, 1 s - 1 h
+    python benchmark.py run --quick              # 1 s and 10 s only
+    python benchmark.py compare <base> [<head>]  # commits (prefix), 'latest' or 'previous'
+    python benchmark.py rates [files...]         # reduced analysis rate vs full rate
+
+Author: Group 4 (GMU)
+Date: 2026-10-16
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, str(Path(__file__).parent))
+from audio_processor import AudioProcessor
+
+BENCHMARK_HISTORY = Path(__file__).parent / "benchmark_history.jsonl"
+
+BENCHMARKS = ('calculate_rms', 'calculate_decibels', 'moving_average_filter',
+              'perform_fft', 'extract_spectral_features', 'process_audio_file')
+DURATIONS = (1, 10, 60, 600, 3600)      # Signal durations (s)
+QUICK_DURATIONS = (1, 10)
+SAMPLE_RATES = (16000, 44100, 48000)
+DTYPES = (None, 'float32', 'float64')   # None: the default (mixed) precision
+
+# Benchmarks whose input does not depend on the signal duration; run once
+# per sample rate and dtype, at the shortest duration
+DURATION_INDEPENDENT = ('extract_spectral_features',)
+
+MIN_MEASURE_TIME = 0.2   # Seconds per timed loop
+REPEATS = 5
+REGRESSION_THRESHOLD = 0.10   # Relative slowdown flagged by compare
+
+# Features compared by the rates command (absolute differences)
+TRADEOFF_FEATURES = ('avg_decibels', 'std_decibels', 'leq', 'l90', 'spectral_centroid',
+                     'spectral_rolloff', 'dominant_frequency', 'spectral_flatness',
+                     'low_freq_ratio', 'mid_freq_ratio', 'high_freq_ratio')
+
+
+def time_call(function: Callable, repeats: int = REPEATS,
+              min_time: float = MIN_MEASURE_TIME) -> Tuple[float, float, int]:
+    """
+    Time a callable.
+
+    Args:
+        function: Callable taking no arguments
+        repeats: Timed loops
+        min_time: Minimum duration of a loop (s); sets calls per loop
+
+    Returns:
+        Tuple of (fastest, median) seconds per call and calls per loop
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+
+    per_call = [elapsed / number]
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        per_call.append((time.perf_counter() - start) / number)
+    return min(per_call), float(np.median(per_call)), number
+
+
+def make_signal(duration: float, sample_rate: int, seed: int = 0) -> np.ndarray:
+    """
+    Noise with a slowly varying level, as float32 samples in [-1, 1].
+
+    Args:
+        duration: Seconds
+        sample_rate: Sample rate (Hz)
+        seed: Random seed
+
+    Returns:
+        1D float32 array
+    """
+    rng = np.random.default_rng(seed)
+    n_samples = int(duration * sample_rate)
+    audio = rng.standard_normal(n_samples, dtype=np.float32)
+    audio *= np.float32(0.1)
+    # Quieter first half, so the dB trace is not flat
+    audio[:n_samples // 2] *= np.float32(0.1)
+    return audio
+
+
+def benchmark_cases(processor: AudioProcessor, audio: np.ndarray,
+                    wav_path: str) -> Dict[str, Callable]:
+    """
+    Build the benchmarked calls for one signal.
+
+    Args:
+        processor: AudioProcessor at the signal's sample rate
+        audio: Signal in the processor's dtype
+        wav_path: The same signal written to disk, for process_audio_file
+
+    Returns:
+        Dictionary of benchmark name -> callable
+    """
+    db_values = processor.calculate_decibels(audio)
+    frequencies, magnitudes = processor.perform_fft(audio)
+    return {
+        'calculate_rms': lambda: processor.calculate_rms(audio),
+        'calculate_decibels': lambda: processor.calculate_decibels(audio),
+        'moving_average_filter': lambda: processor.moving_average_filter(db_values),
+        'perform_fft': lambda: processor.perform_fft(audio),
+        'extract_spectral_features': lambda: processor.extract_spectral_features(frequencies, magnitudes),
+        'process_audio_file': lambda: processor.process_audio_file(wav_path, verbose=False),
+    }
+
+
+def run_benchmarks(durations=DURATIONS, sample_rates=SAMPLE_RATES, dtypes=DTYPES,
+                   benchmarks=BENCHMARKS, repeats: int = REPEATS,
+                   min_time: float = MIN_MEASURE_TIME, verbose: bool = True) -> List[Dict]:
+    """
+    Run the benchmark matrix.
+
+    Args:
+        durations: Signal durations (s)
+        sample_rates: Sample rates (Hz)
+        dtypes: Processor dtypes (None, 'float32', 'float64')
+        benchmarks: Names from BENCHMARKS
+        repeats: Timed loops per benchmark
+        min_time: Minimum duration of a loop (s)
+        verbose: Print each result
+
+    Returns:
+        One result dictionary per benchmark and configuration
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for sample_rate in sample_rates:
+            for duration in sorted(durations):
+                audio = make_signal(duration, sample_rate)
+                wav_path = os.path.join(tmp_dir, "signal.wav")
+                if 'process_audio_file' in benchmarks:
+                    sf.write(wav_path, audio, sample_rate, subtype='PCM_16')
+
+                for dtype in dtypes:
+                    processor = AudioProcessor(sample_rate=sample_rate, dtype=dtype)
+                    cases = benchmark_cases(processor, processor.as_processing_dtype(audio), wav_path)
+                    for name in benchmarks:
+                        if name in DURATION_INDEPENDENT and duration != min(durations):
+                            continue
+                        fastest, median, number = time_call(cases[name], repeats, min_time)
+                        result = {
+                            'benchmark': name,
+                            'duration': None if name in DURATION_INDEPENDENT else duration,
+                            'sample_rate': sample_rate,
+                            'dtype': dtype or 'default',
+                            'seconds': fastest,
+                            'median_seconds': median,
+                            'calls_per_loop': number,
+                            'realtime_factor': duration / fastest if name not in DURATION_INDEPENDENT else None,
+                        }
+                        results.append(result)
+                        if verbose:
+                            print(f"  {format_key(result_key(result)):<55s} {fastest * 1000:>11.4f} ms")
+                del audio
+    return results
+
+
+def result_key(result: Dict) -> Tuple:
+    """Identity of a benchmark configuration, used to match runs."""
+    return result['benchmark'], result['duration'], result['sample_rate'], result['dtype']
+
+
+def format_key(key: Tuple) -> str:
+    name, duration, sample_rate, dtype = key
+    duration = f"{duration:g}s" if duration is not None else "-"
+    return f"{name} [{duration}, {sample_rate} Hz, {dtype}]"
+
+
+def git_commit() -> Tuple[Optional[str], bool]:
+    """
+    Current git commit of this file's repository.
+
+    Returns:
+        Tuple of (commit hash or None outside git, True if the tree has
+        uncommitted changes)
+    """
+    cwd = Path(__file__).parent
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=cwd, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=cwd,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return commit, bool(status.strip())
+
+
+def machine_info() -> Dict:
+    """Describe the machine and library versions the run used."""
+    return {
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+    }
+
+
+def append_run(results: List[Dict], history_path=BENCHMARK_HISTORY, label: Optional[str] = None) -> Dict:
+    """
+    Append a run to the history file.
+
+    Args:
+        results: Output of run_benchmarks()
+        history_path: JSON lines history file
+        label: Optional free-form description
+
+    Returns:
+        The stored run record
+    """
+    commit, dirty = git_commit()
+    run = {
+        'commit': commit,
+        'dirty': dirty,
+        'label': label,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'machine': machine_info(),
+        'results': results,
+    }
+    with open(history_path, 'a') as f:
+        f.write(json.dumps(run) + '\n')
+    return run
+
+
+def load_history(history_path=BENCHMARK_HISTORY) -> List[Dict]:
+    """Read all runs from the history file, oldest first."""
+    if not Path(history_path).exists():
+        return []
+    with open(history_path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def find_run(history: List[Dict], ref: str) -> Dict:
+    """
+    Select a run from the history.
+
+    Args:
+        history: Output of load_history()
+        ref: 'latest', 'previous', or a commit hash prefix (latest run of
+            that commit)
+
+    Returns:
+        Run record
+    """
+    if ref in ('latest', 'previous'):
+        index = -1 if ref == 'latest' else -2
+        if len(history) < -index:
+            raise ValueError(f"History has {len(history)} run(s), cannot select '{ref}'")
+        return history[index]
+    for run in reversed(history):
+        if run['commit'] and run['commit'].startswith(ref):
+            return run
+    raise ValueError(f"No benchmark run recorded for commit '{ref}'")
+
+
+def compare_runs(base: Dict, head: Dict, threshold: float = REGRESSION_THRESHOLD) -> List[Dict]:
+    """
+    Compare the benchmarks two runs have in common.
+
+    Args:
+        base: Reference run
+        head: Run to check
+        threshold: Relative slowdown counted as a regression
+
+    Returns:
+        One dictionary per common benchmark with 'key', 'base', 'head'
+        (seconds), 'ratio' (head / base) and 'regression'
+    """
+    base_results = {result_key(result): result for result in base['results']}
+    comparison = []
+    for result in head['results']:
+        key = result_key(result)
+        if key not in base_results:
+            continue
+        ratio = result['seconds'] / base_results[key]['seconds']
+        comparison.append({
+            'key': key,
+            'base': base_results[key]['seconds'],
+            'head': result['seconds'],
+            'ratio': ratio,
+            'regression': ratio > 1 + threshold,
+        })
+    return comparison
+
+
+def print_comparison(base: Dict, head: Dict, comparison: List[Dict], threshold: float):
+    """Print a comparison table and summary."""
+    def describe(run):
+        commit = (run['commit'] or 'no-git')[:10] + (' (dirty)' if run['dirty'] else '')
+        return f"{commit} {run['timestamp']}" + (f" [{run['label']}]" if run['label'] else '')
+
+    print(f"Base: {describe(base)}")
+    print(f"Head: {describe(head)}")
+    if base['machine'] != head['machine']:
+        print("[WARNING] Runs were recorded on different machines or library versions")
+
+    print(f"\n{'Benchmark':<55s} {'Base (ms)':>11s} {'Head (ms)':>11s} {'Change':>8s}")
+    for row in comparison:
+        flag = '  REGRESSION' if row['regression'] else ''
+        print(f"{format_key(row['key']):<55s} {row['base'] * 1000:>11.4f} {row['head'] * 1000:>11.4f} "
+              f"{row['ratio'] - 1:>+8.1%}{flag}")
+
+    regressions = sum(row['regression'] for row in comparison)
+    print(f"\n{len(comparison)} benchmarks compared, {regressions} slower by more than {threshold:.0%}")
+
+
+def make_tradeoff_signals(sample_rate: int, duration: float = 10.0) -> Dict[str, np.ndarray]:
+    """
+    Synthetic recordings for the rates command when no files are given.
+
+    Args:
+        sample_rate: Sample rate (Hz)
+        duration: Seconds per signal
+
+    Returns:
+        Dictionary of name -> float32 samples
+    """
+    rng = np.random.default_rng(1)
+    n_samples = int(duration * sample_rate)
+    t = np.arange(n_samples) / sample_rate
+    white = rng.standard_normal(n_samples)
+    brown = np.cumsum(white)
+    brown -= np.convolve(brown, np.ones(4096) / 4096, mode='same')  # Remove the drift
+    signals = {
+        'white_noise': 0.05 * white,
+        'brown_noise': 0.2 * brown / np.abs(brown).max(),
+        'hum_and_voice': 0.05 * np.sin(2 * np.pi * 120 * t) + 0.02 * np.sin(2 * np.pi * 850 * t)
+                         * (1 + np.sin(2 * np.pi * 3 * t)) + 0.005 * white,
+    }
+    return {name: signal.astype(np.float32) for name, signal in signals.items()}
+
+
+def analysis_rate_tradeoff(file_paths: List[str], analysis_rate: int = 16000,
+                           sample_rate: int = 44100, spectrum_mode: str = 'single',
+                           repeats: int = 3) -> Dict:
+    """
+    Compare reduced-rate analysis with full-rate analysis.
+
+    Args:
+        file_paths: Audio files to analyze
+        analysis_rate: Reduced rate (AudioProcessor(analysis_rate=...))
+        sample_rate: Full rate
+        spectrum_mode: Spectrum mode of both processors
+        repeats: Timed loops per file and rate
+
+    Returns:
+        Dictionary with 'speedup' (full-rate / reduced-rate time over all
+        files) and 'differences' (feature -> (mean, max) absolute
+        difference over the files)
+    """
+    full = AudioProcessor(sample_rate=sample_rate, spectrum_mode=spectrum_mode)
+    reduced = AudioProcessor(sample_rate=sample_rate, spectrum_mode=spectrum_mode,
+                             analysis_rate=analysis_rate)
+
+    full_time = reduced_time = 0.0
+    differences = {feature: [] for feature in TRADEOFF_FEATURES}
+    for path in file_paths:
+        for processor in (full, reduced):
+            fastest, _, _ = time_call(lambda: processor.process_audio_file(path, verbose=False, arrays=False),
+                                      repeats, min_time=0.05)
+            if processor is full:
+                full_time += fastest
+            else:
+                reduced_time += fastest
+        full_results = full.process_audio_file(path, verbose=False, arrays=False)
+        reduced_results = reduced.process_audio_file(path, verbose=False, arrays=False)
+        for feature in TRADEOFF_FEATURES:
+            differences[feature].append(abs(reduced_results[feature] - full_results[feature]))
+
+    return {
+        'speedup': full_time / reduced_time,
+        'differences': {feature: (float(np.mean(values)), float(np.max(values)))
+                        for feature, values in differences.items()},
+    }
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='AudioProcessor micro-benchmarks')
+    parser.add_argument('--history', default=str(BENCHMARK_HISTORY), help='JSON lines history file')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Run the benchmarks and append them to the history')
+    run_parser.add_argument('--quick', action='store_true', help='Only 1 s and 10 s signals')
+    run_parser.add_argument('--durations', type=float, nargs='+', help='Signal durations (s)')
+    run_parser.add_argument('--rates', type=int, nargs='+', help='Sample rates (Hz)')
+    run_parser.add_argument('--dtypes', nargs='+', choices=['default', 'float32', 'float64'])
+    run_parser.add_argument('--benchmarks', nargs='+', choices=BENCHMARKS)
+    run_parser.add_argument('--repeats', type=int, default=REPEATS)
+    run_parser.add_argument('--label', help='Description stored with the run')
+
+    compare_parser = commands.add_parser('compare', help='Compare two recorded runs')
+    compare_parser.add_argument('base', help="Commit (prefix), 'latest' or 'previous'")
+    compare_parser.add_argument('head', nargs='?', default='latest')
+    compare_parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                                help='Relative slowdown reported as a regression (default 0.10)')
+
+    rates_parser = commands.add_parser('rates', help='Speed and accuracy of a reduced analysis rate')
+    rates_parser.add_argument('files', nargs='*', help='Audio files (default: synthetic signals)')
+    rates_parser.add_argument('--analysis-rate', type=int, default=16000)
+    rates_parser.add_argument('--sample-rate', type=int, default=44100)
+    rates_parser.add_argument('--spectrum-mode', choices=['single', 'averaged'], default='single')
+
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        durations = args.durations or (QUICK_DURATIONS if args.quick else DURATIONS)
+        dtypes = [None if dtype == 'default' else dtype for dtype in (args.dtypes or ['default', 'float32', 'float64'])]
+        print(f"Running benchmarks (durations {list(durations)} s)...")
+        results = run_benchmarks(durations, args.rates or SAMPLE_RATES, dtypes,
+                                 args.benchmarks or BENCHMARKS, args.repeats)
+        run = append_run(results, args.history, args.label)
+        print(f"\n[OK] {len(results)} results for commit {(run['commit'] or 'no-git')[:10]} "
+              f"appended to {args.history}")
+        return 0
+
+    if args.command == 'rates':
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_paths = args.files
+            if not file_paths:
+                for name, signal in make_tradeoff_signals(args.sample_rate).items():
+                    file_paths.append(os.path.join(tmp_dir, f"{name}.wav"))
+                    sf.write(file_paths[-1], signal, args.sample_rate, subtype='PCM_16')
+            report = analysis_rate_tradeoff(file_paths, args.analysis_rate, args.sample_rate,
+                                            args.spectrum_mode)
+
+        print(f"{args.analysis_rate} Hz vs {args.sample_rate} Hz analysis ({args.spectrum_mode} spectrum), "
+              f"{len(file_paths)} file(s)")
+        print(f"  Speedup: {report['speedup']:.2f}x")
+        print(f"\n{'Feature':<22s} {'Mean |diff|':>12s} {'Max |diff|':>12s}")
+        for feature, (mean, largest) in report['differences'].items():
+            print(f"{feature:<22s} {mean:>12.4f} {largest:>12.4f}")
+        return 0
+
+    history = load_history(args.history)
+    base, head = find_run(history, args.base), find_run(history, args.head)
+    comparison = compare_runs(base, head, args.threshold)
+    print_comparison(base, head, comparison, args.threshold)
+    return 1 if any(row['regression'] for row in comparison) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
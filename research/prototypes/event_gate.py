@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Silence/Event Gating for Noise Environment Monitor
+
+Long recordings are mostly stationary background. EventGate uses the cheap
+per-window dB trace (calculate_decibels()) to find events and runs the
+expensive spectral analysis only where it matters:
+
+- Background level: L90 of the trace (level exceeded 90% of the time).
+- Events, with hysteresis: a window starts an event when it is
+  on_margin_db above the background. The event lasts until the level drops
+  below background + off_margin_db. Events are padded by padding_windows on
+  both sides, so onsets and decays are kept.
+- Spectra: every frame inside an event is transformed. Outside events, only
+  every background_stride-th frame is transformed, and it stands in for
+  the frames it represents (weight = number of frames). The weighted
+  average spectrum is therefore an unbiased estimate of the full
+  'averaged' spectrum when the background is stationary, and exactly that
+  spectrum when background_stride is 1.
+
+analyze() reports the fraction of frames skipped. gating_bias() measures
+the feature differences against the ungated analysis.
+
+Usage:
+    gate = EventGate(AudioProcessor())
+    results = gate.analyze(audio)
+    results['skipped_fraction'], results['events'], results['spectral_centroid']
+
+Author: Group 4 (GMU)
+Date: 2026-10-16
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from audio_processor import AudioProcessor, SPECTRUM_BATCH_FRAMES, frame_signal
+
+GATE_ON_MARGIN_DB = 6.0      # Event starts this far above the background (dB)
+GATE_OFF_MARGIN_DB = 3.0     # ... and ends below background + this margin (dB)
+GATE_PADDING_WINDOWS = 2     # dB windows kept before and after each event
+BACKGROUND_STRIDE = 10       # Background spectra: one frame in this many
+BACKGROUND_PERCENTILE = 10   # Percentile of the dB trace taken as background (L90)
+
+
+def hysteresis_mask(levels: np.ndarray, on_threshold: float, off_threshold: float) -> np.ndarray:
+    """
+    Schmitt-trigger gate over a level trace, without a Python loop.
+
+    A value is active if some earlier (or the same) value reached
+    on_threshold and no value since has fallen below off_threshold.
+
+    Args:
+        levels: Level trace
+        on_threshold: Level that opens the gate
+        off_threshold: Level below which the gate closes (<= on_threshold)
+
+    Returns:
+        Boolean mask, same length as levels
+    """
+    if off_threshold > on_threshold:
+        raise ValueError(f"off_threshold ({off_threshold}) must not exceed on_threshold ({on_threshold})")
+    indices = np.arange(len(levels))
+    last_on = np.maximum.accumulate(np.where(levels >= on_threshold, indices, -1))
+    last_off = np.maximum.accumulate(np.where(levels < off_threshold, indices, -1))
+    return last_on > last_off
+
+
+def dilate_mask(mask: np.ndarray, padding: int) -> np.ndarray:
+    """
+    Extend every active run of a mask by padding entries on both sides.
+
+    Args:
+        mask: Boolean mask
+        padding: Entries added before and after each run
+
+    Returns:
+        Boolean mask
+    """
+    if padding <= 0 or not mask.any():
+        return mask
+    counts = np.concatenate(([0], np.cumsum(mask)))
+    starts = np.clip(np.arange(len(mask)) - padding, 0, len(mask))
+    stops = np.clip(np.arange(len(mask)) + padding + 1, 0, len(mask))
+    return counts[stops] - counts[starts] > 0
+
+
+class EventGate:
+    """
+    Energy gate that limits spectral analysis to events and a background sample.
+    """
+
+    def __init__(self, processor: Optional[AudioProcessor] = None,
+                 on_margin_db: float = GATE_ON_MARGIN_DB, off_margin_db: float = GATE_OFF_MARGIN_DB,
+                 padding_windows: int = GATE_PADDING_WINDOWS, background_stride: int = BACKGROUND_STRIDE):
+        """
+        Initialize the gate.
+
+        Args:
+            processor: AudioProcessor providing window sizes, spectra and features
+            on_margin_db: Level above the background that starts an event
+            off_margin_db: Level above the background below which an event
+                ends (hysteresis; must not exceed on_margin_db)
+            padding_windows: dB windows kept around each event
+            background_stride: Background frames per transformed background
+                frame; 1 transforms every frame
+        """
+        if off_margin_db > on_margin_db:
+            raise ValueError(f"off_margin_db ({off_margin_db}) must not exceed on_margin_db ({on_margin_db})")
+        if background_stride < 1:
+            raise ValueError(f"background_stride must be at least 1, got {background_stride}")
+        self.processor = processor or AudioProcessor()
+        self.on_margin_db = on_margin_db
+        self.off_margin_db = off_margin_db
+        self.padding_windows = padding_windows
+        self.background_stride = background_stride
+
+    def event_mask(self, db_values: np.ndarray) -> Tuple[np.ndarray, float]:
+        """
+        Mark the dB windows that belong to events.
+
+        Args:
+            db_values: Per-window levels from calculate_decibels()
+
+        Returns:
+            Tuple of (boolean mask per window, background level in dB)
+        """
+        db_values = np.asarray(db_values, dtype=np.float64)
+        if len(db_values) == 0:
+            return np.zeros(0, dtype=bool), np.nan
+        background_db = float(np.percentile(db_values, BACKGROUND_PERCENTILE))
+        mask = hysteresis_mask(db_values, background_db + self.on_margin_db,
+                               background_db + self.off_margin_db)
+        return dilate_mask(mask, self.padding_windows), background_db
+
+    def events(self, mask: np.ndarray) -> List[Tuple[float, float]]:
+        """
+        Convert an event mask to time intervals.
+
+        Args:
+            mask: Output of event_mask()
+
+        Returns:
+            List of (start, end) times in seconds, covering whole dB windows
+        """
+        hop = max(self.processor.db_window_size // 2, 1)
+        edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+        starts, stops = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+        sample_rate = self.processor.sample_rate
+        return [(float(start * hop / sample_rate),
+                 float(((stop - 1) * hop + self.processor.db_window_size) / sample_rate))
+                for start, stop in zip(starts, stops)]
+
+    def frame_events(self, mask: np.ndarray, n_frames: int, frame_hop: int, n_fft: int) -> np.ndarray:
+        """
+        Map an event mask over dB windows to spectral frames.
+
+        Args:
+            mask: Event mask over dB windows
+            n_frames: Number of spectral frames
+            frame_hop: Samples between spectral frames
+            n_fft: Spectral frame length
+
+        Returns:
+            Boolean mask over spectral frames (event of the dB window whose
+            center is nearest to the frame's center)
+        """
+        if len(mask) == 0:
+            return np.zeros(n_frames, dtype=bool)
+        db_hop = max(self.processor.db_window_size // 2, 1)
+        centers = np.arange(n_frames) * frame_hop + (n_fft - self.processor.db_window_size) / 2
+        return mask[np.clip(np.rint(centers / db_hop).astype(np.int64), 0, len(mask) - 1)]
+
+    def frame_weights(self, in_event: np.ndarray) -> np.ndarray:
+        """
+        Weight of each spectral frame in the gated average spectrum.
+
+        Args:
+            in_event: Output of frame_events()
+
+        Returns:
+            Per-frame weights: 1 in events, the number of represented frames
+            for sampled background frames, 0 for skipped frames
+        """
+        weights = in_event.astype(np.float64)
+        background = np.flatnonzero(~in_event)
+        sampled = background[::self.background_stride]
+        # The last sampled frame may stand for fewer than stride frames
+        weights[sampled] = np.minimum(self.background_stride,
+                                      len(background) - np.arange(len(sampled)) * self.background_stride)
+        return weights
+
+    def gated_spectrum(self, audio: np.ndarray, weights: np.ndarray,
+                       n_fft: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Weighted average power spectrum over the frames with non-zero weight.
+
+        Args:
+            audio: Audio samples
+            weights: Output of frame_weights()
+            n_fft: FFT size
+
+        Returns:
+            Tuple of (frequencies, magnitudes), magnitudes being the square
+            root of the weighted mean power
+        """
+        plan = self.processor.get_spectral_plan(n_fft)
+        frames = frame_signal(audio, n_fft, max(n_fft // 2, 1))
+        selected = np.flatnonzero(weights)
+
+        power_sum = np.zeros(n_fft // 2 + 1)
+        with self.processor._stage('fft') as stage:
+            for start in range(0, len(selected), SPECTRUM_BATCH_FRAMES):
+                batch = selected[start:start + SPECTRUM_BATCH_FRAMES]
+                spectra = np.fft.rfft(frames[batch] * plan.window, n=n_fft, axis=-1)
+                power_sum += weights[batch] @ (spectra.real ** 2 + spectra.imag ** 2)
+            stage.add(samples=len(selected) * n_fft, frames=len(selected))
+
+        magnitudes = np.sqrt(power_sum / max(weights.sum(), 1.0))
+        return plan.frequencies, self.processor.as_processing_dtype(magnitudes)
+
+    def analyze(self, audio: np.ndarray, db_values: Optional[np.ndarray] = None) -> Dict:
+        """
+        Gated spectral analysis of a signal.
+
+        Args:
+            audio: Mono audio samples at processor.sample_rate
+            db_values: Per-window levels, if already computed
+
+        Returns:
+            Dictionary with the spectral features of the gated average
+            spectrum, 'frequencies', 'magnitudes', 'events' (list of
+            (start, end) s), 'n_events', 'background_db', 'event_fraction'
+            (share of frames in events) and 'skipped_fraction' (share of
+            frames not transformed)
+        """
+        processor = self.processor
+        audio = processor.as_processing_dtype(np.asarray(audio))
+        n_fft = processor.n_fft
+        if len(audio) < n_fft:
+            audio = np.pad(audio, (0, n_fft - len(audio)), mode='constant')
+        if db_values is None:
+            db_values = processor.calculate_decibels(audio)
+
+        mask, background_db = self.event_mask(db_values)
+        n_frames = (len(audio) - n_fft) // max(n_fft // 2, 1) + 1
+        in_event = self.frame_events(mask, n_frames, max(n_fft // 2, 1), n_fft)
+        weights = self.frame_weights(in_event)
+        frequencies, magnitudes = self.gated_spectrum(audio, weights, n_fft)
+        events = self.events(mask)
+
+        return {
+            **processor.extract_spectral_features(frequencies, magnitudes),
+            'frequencies': frequencies,
+            'magnitudes': magnitudes,
+            'events': events,
+            'n_events': len(events),
+            'background_db': background_db,
+            'event_fraction': float(in_event.mean()),
+            'skipped_fraction': float(np.mean(weights == 0)),
+        }
+
+    def analyze_file(self, file_path: str) -> Dict:
+        """
+        Load an audio file and run analyze() on it.
+
+        Args:
+            file_path: Path to audio file
+
+        Returns:
+            analyze() results plus 'file_path' and 'duration'
+        """
+        audio, sr = self.processor.load_audio(file_path, verbose=False)
+        return {'file_path': file_path, 'duration': len(audio) / sr, **self.analyze(audio)}
+
+    def gating_bias(self, audio: np.ndarray) -> Dict[str, float]:
+        """
+        Measure how much gating changes the spectral features.
+
+        Compares analyze() with the ungated 'averaged' spectrum of the same
+        signal.
+
+        Args:
+            audio: Mono audio samples
+
+        Returns:
+            Dictionary of feature -> relative difference (gated - full) / |full|,
+            plus 'skipped_fraction'
+        """
+        gated = self.analyze(audio)
+        frequencies, magnitudes = self.processor.perform_fft(audio, mode='averaged')
+        full = self.processor.extract_spectral_features(frequencies, magnitudes)
+        bias = {name: float((gated[name] - value) / (abs(value) + 1e-12)) for name, value in full.items()}
+        bias['skipped_fraction'] = gated['skipped_fraction']
+        return bias
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Persistent Feature Cache for Noise Environment Monitor
+
+Stores the scalar features of analyzed audio files in a SQLite database,
+keyed by a SHA-256 hash of the file content and a hash of the processor
+configuration (AudioProcessor.feature_config(): sample rate, window sizes,
+n_fft, band edges, dtype, feature version, batch or streaming pipeline).
+Re-running feature extraction
+only analyzes files whose content is new or whose configuration changed.
+
+Hashing a file is much cheaper than decoding and analyzing it, and the
+content hash itself is memoized by (path, size, mtime) so unchanged files
+are not even re-read.
+
+Usage:
+    cache = FeatureCache("features.sqlite")
+    table = processor.process_batch(paths, cache=cache)
+
+Author: Group 4 (GMU)
+Date: 2026-10-16
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Dict, Optional
+
+HASH_BLOCK_SIZE = 1 << 20  # Bytes read per hash update
+
+
+def hash_file(file_path: str) -> str:
+    """
+    Compute the SHA-256 hex digest of a file's content.
+
+    Args:
+        file_path: Path to file
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_config(config: Dict) -> str:
+    """
+    Hash a processor configuration dictionary.
+
+    Args:
+        config: JSON-serializable configuration
+
+    Returns:
+        Hex digest of the canonical JSON encoding
+    """
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+
+class FeatureCache:
+    """
+    SQLite-backed cache of per-file scalar features.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            db_path: Path to SQLite file
+        """
+        self.db_path = str(db_path)
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS features (
+                content_hash TEXT NOT NULL,
+                config_hash TEXT NOT NULL,
+                features TEXT NOT NULL,
+                PRIMARY KEY (content_hash, config_hash)
+            );
+            CREATE TABLE IF NOT EXISTS file_hashes (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                content_hash TEXT NOT NULL
+            );
+        """)
+
+    def content_hash(self, file_path: str) -> str:
+        """
+        Return the content hash of a file, re-reading it only if its size or
+        modification time changed since it was last hashed.
+
+        Args:
+            file_path: Path to audio file
+
+        Returns:
+            SHA-256 hex digest
+        """
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        row = self._conn.execute(
+            "SELECT size, mtime_ns, content_hash FROM file_hashes WHERE path = ?", (path,)
+        ).fetchone()
+        if row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return row[2]
+
+        content_hash = hash_file(path)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?, ?)",
+            (path, stat.st_size, stat.st_mtime_ns, content_hash)
+        )
+        return content_hash
+
+    def get(self, file_path: str, processor, streaming: bool = False) -> Optional[Dict]:
+        """
+        Look up cached features.
+
+        Args:
+            file_path: Path to audio file
+            processor: AudioProcessor whose configuration the features must match
+            streaming: Features from analyze_stream() rather than process_audio_file()
+
+        Returns:
+            Feature dictionary with 'file_path' set to file_path, or None
+        """
+        try:
+            content_hash = self.content_hash(file_path)
+        except OSError:
+            # Missing or unreadable; let the analysis report the error
+            self.misses += 1
+            return None
+
+        row = self._conn.execute(
+            "SELECT features FROM features WHERE content_hash = ? AND config_hash = ?",
+            (content_hash, hash_config(processor.feature_config(streaming)))
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        features = json.loads(row[0])
+        features['file_path'] = str(file_path)
+        return features
+
+    def put(self, file_path: str, processor, features: Dict, streaming: bool = False):
+        """
+        Store features for a file. Call commit() to persist a batch of puts.
+
+        Args:
+            file_path: Path to the analyzed audio file
+            processor: AudioProcessor that produced the features
+            features: Scalar feature dictionary
+            streaming: Features from analyze_stream() rather than process_audio_file()
+        """
+        self._conn.execute(
+            "INSERT OR REPLACE INTO features VALUES (?, ?, ?)",
+            (self.content_hash(file_path), hash_config(processor.feature_config(streaming)),
+             json.dumps(features, default=float))
+        )
+
+    def commit(self):
+        """Write pending entries to disk."""
+        self._conn.commit()
+
+    def close(self):
+        """Commit and close the database."""
+        self._conn.commit()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
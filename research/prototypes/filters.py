@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Stateful Smoothing Filters for Noise Environment Monitor
+
+Filters that carry their state between calls, so a long dB trace can be
+smoothed chunk by chunk with the same result as smoothing it in one go.
+
+- MovingAverageFilter: running-sum (cumsum) moving average whose cost per
+  value does not depend on the window size. 'causal' mode averages the last
+  window_size values (the mean of the available values during warm-up, like
+  the mobile MovingAverageFilter.ts). 'centered' mode reproduces
+  np.convolve(values, ones(w) / w, mode='same'), including its zero padding
+  at both edges; its outputs lag the input by (window_size - 1) // 2 values
+  and the last ones are released by flush(). update() filters a single
+  value with a running-sum update, for per-value callers such as the
+  real-time processor.
+- ExponentialFilter: first-order exponential smoothing,
+  y[n] = y[n-1] + alpha * (x[n] - y[n-1]).
+
+Author: Group 4 (GMU)
+Date: 2026-10-16
+"""
+
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+MOVING_AVERAGE_MODES = ('causal', 'centered')
+
+
+class MovingAverageFilter:
+    """
+    Moving average over a stream of values with O(1) work per value.
+    """
+
+    def __init__(self, window_size: int = 10, mode: str = 'causal'):
+        """
+        Initialize the filter.
+
+        Args:
+            window_size: Number of values per average
+            mode: 'causal' or 'centered'
+        """
+        if not isinstance(window_size, (int, np.integer)) or window_size <= 0:
+            raise ValueError(f"window_size must be a positive integer, got {window_size}")
+        if mode not in MOVING_AVERAGE_MODES:
+            raise ValueError(f"mode must be one of {MOVING_AVERAGE_MODES}, got '{mode}'")
+
+        self.window_size = int(window_size)
+        self.mode = mode
+        # Values np.convolve(mode='same') looks ahead of each output
+        self.lead = (self.window_size - 1) // 2 if mode == 'centered' else 0
+        self.reset()
+
+    def reset(self):
+        """Forget all previous values."""
+        # The last window_size - 1 inputs and their sum
+        self._history = deque(maxlen=self.window_size - 1)
+        if self.mode == 'centered':
+            # Zero padding before the first value
+            self._history.extend([0.0] * (self.window_size - 1 - self.lead))
+        self._history_sum = 0.0
+        self._updates = 0
+
+    def process(self, values: np.ndarray) -> np.ndarray:
+        """
+        Filter the next values of the stream.
+
+        Args:
+            values: Next input values (1D)
+
+        Returns:
+            Causal mode: one output per input. Centered mode: every output
+            whose look-ahead is now available (delayed by self.lead values).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        history = np.fromiter(self._history, dtype=np.float64, count=len(self._history))
+        buffer = np.concatenate((history, values))
+        cumsum = np.concatenate(([0.0], np.cumsum(buffer)))
+
+        w = self.window_size
+        if self.mode == 'causal':
+            # Window ending at each new value; shorter during warm-up
+            ends = np.arange(len(history), len(buffer)) + 1
+            starts = np.maximum(ends - w, 0)
+            outputs = (cumsum[ends] - cumsum[starts]) / (ends - starts)
+        else:
+            outputs = (cumsum[w:] - cumsum[:-w]) / w if len(buffer) >= w else np.empty(0)
+
+        if w > 1:
+            self._history.extend(values[max(len(values) - (w - 1), 0):].tolist())
+            self._history_sum = float(np.sum(self._history))
+        return outputs
+
+    def update(self, value: float) -> Optional[float]:
+        """
+        Filter one value with O(1) work; same result as process([value]).
+
+        Args:
+            value: Next input value
+
+        Returns:
+            Causal mode: the output for value. Centered mode: the output
+            released by value, or None while the first look-ahead fills.
+        """
+        value = float(value)
+        history = self._history
+        total = self._history_sum + value
+        n_values = len(history) + 1
+        output = total / n_values if self.mode == 'causal' or n_values == self.window_size else None
+
+        if history.maxlen:
+            if len(history) == history.maxlen:
+                total -= history[0]
+            history.append(value)
+            self._history_sum = total
+            self._updates += 1
+            if self._updates % history.maxlen == 0:
+                # Resynchronize once per window so rounding errors cannot accumulate
+                self._history_sum = float(np.sum(history))
+        return output
+
+    def flush(self) -> np.ndarray:
+        """
+        Release the outputs still waiting for look-ahead (centered mode),
+        treating values past the end as zeros like np.convolve.
+
+        Returns:
+            Remaining outputs (empty in causal mode)
+        """
+        if self.mode == 'causal' or self.lead == 0:
+            return np.empty(0)
+        return self.process(np.zeros(self.lead))
+
+    def filter(self, values: np.ndarray) -> np.ndarray:
+        """
+        Filter a complete sequence in one call (resets the state first).
+
+        Args:
+            values: Input values (1D)
+
+        Returns:
+            One output per input
+        """
+        self.reset()
+        outputs = np.concatenate((self.process(values), self.flush()))
+        self.reset()
+        return outputs
+
+
+class ExponentialFilter:
+    """
+    First-order exponential smoothing with carried state.
+    """
+
+    def __init__(self, alpha: Optional[float] = None, time_constant: Optional[float] = None,
+                 sample_interval: Optional[float] = None, initial_state: Optional[float] = None):
+        """
+        Initialize the filter from a smoothing factor or a time constant.
+
+        Args:
+            alpha: Smoothing factor in (0, 1]; higher follows the input faster
+            time_constant: Time constant (s), used with sample_interval
+            sample_interval: Time between values (s)
+            initial_state: Output before the first value (defaults to the
+                first value itself)
+        """
+        if alpha is None:
+            if time_constant is None or sample_interval is None:
+                raise ValueError("Provide alpha, or time_constant and sample_interval")
+            alpha = 1 - np.exp(-sample_interval / time_constant)
+        if not 0 < alpha <= 1:
+            raise ValueError(f"alpha must be in (0, 1], got {alpha}")
+
+        self.alpha = float(alpha)
+        self.initial_state = initial_state
+        self.reset()
+
+    def reset(self):
+        """Forget the filter state."""
+        self.state = self.initial_state
+
+    def process(self, values: np.ndarray) -> np.ndarray:
+        """
+        Filter the next values; without an initial_state, the first value
+        ever seen initializes the state.
+
+        Args:
+            values: Next input values (1D)
+
+        Returns:
+            One output per input
+        """
+        from scipy.signal import lfilter  # Deferred: scipy.signal is slow to import
+
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return values
+        if self.state is None:
+            self.state = values[0]
+
+        # y[n] = (1 - alpha) * y[n-1] + alpha * x[n], with y[-1] = state
+        outputs, _ = lfilter([self.alpha], [1.0, self.alpha - 1.0], values,
+                             zi=[(1.0 - self.alpha) * self.state])
+        self.state = outputs[-1]
+        return outputs
+
+    def filter(self, values: np.ndarray) -> np.ndarray:
+        """
+        Filter a complete sequence in one call (resets the state first).
+
+        Args:
+            values: Input values (1D)
+
+        Returns:
+            One output per input
+        """
+        self.reset()
+        outputs = self.process(values)
+        self.reset()
+        return outputs
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Frame-Level Feature Engine for Noise Environment Monitor
+
+Computes one short-time Fourier transform (STFT) per signal, derives every
+feature for every frame from the shared magnitude matrix with vectorized
+column operations, and summarizes the per-frame columns (mean, standard
+deviation, percentiles) into one feature vector per file.
+
+Features are organized in groups (FRAME_FEATURE_GROUPS), each a function
+of the extractor and a Spectrogram batch returning named columns:
+
+- 'spectral': the extract_spectral_features() set (centroid, spread,
+  rolloff, flatness, entropy, dominant frequency, band ratios)
+- 'level': per-frame Z- and A-weighted levels (dB, dBA)
+- 'flux': spectral flux between consecutive frames
+- 'mfcc': 13 mel-frequency cepstral coefficients (not computed by default)
+
+Adding a feature means adding a group function; it receives the
+magnitudes (and derived power / normalized spectra, computed once and
+shared) of the frames already transformed, so it never adds a pass over
+the audio. Frames are transformed in batches of SPECTRUM_BATCH_FRAMES, so
+memory does not grow with the recording length.
+
+Usage:
+    extractor = FrameFeatureExtractor(AudioProcessor(), features=('spectral', 'level', 'mfcc'))
+    columns = extractor.frame_features(audio)     # name -> (n_frames,)
+    summary = extractor.extract(audio)            # name_mean, name_std, name_p10, ...
+
+Author: Group 4 (GMU)
+Date: 2026-10-16
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from audio_processor import (
+    AudioProcessor, CALIBRATION_OFFSET_DB, SPECTRUM_BATCH_FRAMES, SpectralPlan, frame_signal
+)
+
+DEFAULT_FRAME_FEATURES = ('spectral', 'level', 'flux')
+FRAME_STATISTICS = ('mean', 'std', 'p10', 'p50', 'p90')
+
+N_MELS = 40    # Mel bands behind the MFCCs
+N_MFCC = 13    # Cepstral coefficients kept
+
+
+class Spectrogram:
+    """
+    A batch of consecutive STFT frames, with derived spectra computed on first use.
+    """
+
+    __slots__ = ('plan', 'magnitudes', 'previous_normalized', '_power', '_normalized')
+
+    def __init__(self, plan: SpectralPlan, magnitudes: np.ndarray,
+                 previous_normalized: Optional[np.ndarray] = None):
+        """
+        Initialize a batch.
+
+        Args:
+            plan: SpectralPlan the frames were transformed with
+            magnitudes: |rfft| of the windowed frames, shape (n_frames, n_bins)
+            previous_normalized: Normalized spectrum of the frame before the
+                batch (None for the first batch)
+        """
+        self.plan = plan
+        self.magnitudes = magnitudes
+        self.previous_normalized = previous_normalized
+        self._power = None
+        self._normalized = None
+
+    @property
+    def frequencies(self) -> np.ndarray:
+        return self.plan.frequencies
+
+    @property
+    def power(self) -> np.ndarray:
+        """Squared magnitudes."""
+        if self._power is None:
+            self._power = self.magnitudes ** 2
+        return self._power
+
+    @property
+    def normalized(self) -> np.ndarray:
+        """Magnitudes scaled to sum to one per frame."""
+        if self._normalized is None:
+            self._normalized = self.magnitudes / (np.sum(self.magnitudes, axis=-1, keepdims=True) + 1e-10)
+        return self._normalized
+
+
+def _spectral_group(extractor: 'FrameFeatureExtractor', spectrogram: Spectrogram) -> Dict[str, np.ndarray]:
+    # Same definitions as AudioProcessor.extract_spectral_features(), per frame
+    return extractor.processor._spectral_features(spectrogram.frequencies, spectrogram.magnitudes)
+
+
+def _level_group(extractor: 'FrameFeatureExtractor', spectrogram: Spectrogram) -> Dict[str, np.ndarray]:
+    columns = {}
+    for name, weighting in (('frame_db', 'Z'), ('frame_dba', 'A')):
+        mean_square = spectrogram.power @ spectrogram.plan.level_weights(weighting)
+        columns[name] = 10 * np.log10(mean_square + 1e-20) + CALIBRATION_OFFSET_DB
+    return columns
+
+
+def _flux_group(extractor: 'FrameFeatureExtractor', spectrogram: Spectrogram) -> Dict[str, np.ndarray]:
+    # Euclidean distance between consecutive normalized spectra; 0 for the first frame
+    normalized = spectrogram.normalized
+    previous = spectrogram.previous_normalized
+    if previous is None:
+        previous = normalized[0]
+    differences = np.diff(normalized, axis=0, prepend=previous[np.newaxis])
+    return {'spectral_flux': np.sqrt(np.einsum('ij,ij->i', differences, differences))}
+
+
+def _mfcc_group(extractor: 'FrameFeatureExtractor', spectrogram: Spectrogram) -> Dict[str, np.ndarray]:
+    from scipy.fft import dct
+
+    mel_basis = extractor.constant('mel_basis', lambda: _mel_basis(spectrogram.plan))
+    mel_power = spectrogram.power @ mel_basis.T
+    coefficients = dct(10 * np.log10(mel_power + 1e-10), type=2, norm='ortho', axis=-1)[:, :N_MFCC]
+    return {f'mfcc_{i}': coefficients[:, i] for i in range(N_MFCC)}
+
+
+def _mel_basis(plan: SpectralPlan) -> np.ndarray:
+    import librosa  # Deferred: slow to import, only needed for MFCCs
+
+    return librosa.filters.mel(sr=plan.sample_rate, n_fft=plan.n_fft, n_mels=N_MELS)
+
+
+# Feature group name -> function(extractor, spectrogram) -> {column: (n_frames,)}
+FRAME_FEATURE_GROUPS = {
+    'spectral': _spectral_group,
+    'level': _level_group,
+    'flux': _flux_group,
+    'mfcc': _mfcc_group,
+}
+
+
+class FrameFeatureExtractor:
+    """
+    Per-frame features from a single STFT, and their summary statistics.
+    """
+
+    def __init__(self, processor: Optional[AudioProcessor] = None,
+                 features: Sequence[str] = DEFAULT_FRAME_FEATURES,
+                 n_fft: Optional[int] = None, hop_length: Optional[int] = None,
+                 statistics: Sequence[str] = FRAME_STATISTICS):
+        """
+        Initialize the extractor.
+
+        Args:
+            processor: AudioProcessor providing sample rate, dtype, band
+                edges and spectral plans
+            features: Names from FRAME_FEATURE_GROUPS
+            n_fft: Frame length and FFT size (defaults to processor.n_fft)
+            hop_length: Samples between frames (defaults to n_fft // 2)
+            statistics: Summaries per column: 'mean', 'std', 'min', 'max'
+                or 'pNN' (NN-th percentile)
+        """
+        unknown = [name for name in features if name not in FRAME_FEATURE_GROUPS]
+        if unknown:
+            raise ValueError(f"Unknown frame features {unknown}; choose from {tuple(FRAME_FEATURE_GROUPS)}")
+        for statistic in statistics:
+            if statistic not in ('mean', 'std', 'min', 'max') and not (
+                    statistic.startswith('p') and statistic[1:].isdigit() and int(statistic[1:]) <= 100):
+                raise ValueError(f"Unknown statistic '{statistic}'")
+
+        self.processor = processor or AudioProcessor()
+        self.features = tuple(features)
+        self.n_fft = n_fft or self.processor.n_fft
+        self.hop_length = hop_length or max(self.n_fft // 2, 1)
+        self.statistics = tuple(statistics)
+        self._constants = {}
+
+    def constant(self, name: str, build):
+        """
+        Return a per-extractor constant (e.g. a filter bank), building it once.
+
+        Args:
+            name: Cache key
+            build: Callable producing the value
+
+        Returns:
+            Cached value
+        """
+        if name not in self._constants:
+            self._constants[name] = build()
+        return self._constants[name]
+
+    def frame_features(self, audio: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Compute every configured feature for every frame.
+
+        Args:
+            audio: Mono audio samples at processor.sample_rate
+
+        Returns:
+            Dictionary of column name -> values, each of shape (n_frames,)
+        """
+        audio = self.processor.as_processing_dtype(np.asarray(audio))
+        if len(audio) < self.n_fft:
+            audio = np.pad(audio, (0, self.n_fft - len(audio)), mode='constant')
+        plan = self.processor.get_spectral_plan(self.n_fft)
+        frames = frame_signal(audio, self.n_fft, self.hop_length)
+
+        batches = []
+        previous_normalized = None
+        for start in range(0, len(frames), SPECTRUM_BATCH_FRAMES):
+            batch = frames[start:start + SPECTRUM_BATCH_FRAMES]
+            with self.processor._stage('fft') as stage:
+                magnitudes = np.abs(np.fft.rfft(batch * plan.window, axis=-1))
+                stage.add(samples=batch.size, frames=len(batch))
+
+            with self.processor._stage('features') as stage:
+                spectrogram = Spectrogram(plan, magnitudes, previous_normalized)
+                columns = {}
+                for name in self.features:
+                    columns.update(FRAME_FEATURE_GROUPS[name](self, spectrogram))
+                stage.add(frames=len(batch))
+            batches.append(columns)
+            previous_normalized = spectrogram.normalized[-1]
+
+        return {name: np.concatenate([columns[name] for columns in batches]) for name in batches[0]}
+
+    def summarize(self, columns: Dict[str, np.ndarray]) -> Dict[str, float]:
+        """
+        Reduce per-frame columns to summary statistics.
+
+        Args:
+            columns: Output of frame_features()
+
+        Returns:
+            Dictionary of '<column>_<statistic>' -> value
+        """
+        names = list(columns)
+        matrix = np.column_stack([columns[name] for name in names]).astype(np.float64)
+
+        reduced = {}
+        percentiles = [statistic for statistic in self.statistics if statistic.startswith('p')]
+        if percentiles:
+            values = np.percentile(matrix, [int(p[1:]) for p in percentiles], axis=0)
+            reduced.update(zip(percentiles, values))
+        for statistic in ('mean', 'std', 'min', 'max'):
+            if statistic in self.statistics:
+                reduced[statistic] = getattr(matrix, statistic)(axis=0)
+
+        return {f'{name}_{statistic}': float(reduced[statistic][i])
+                for i, name in enumerate(names) for statistic in self.statistics}
+
+    def extract(self, audio: np.ndarray) -> Dict[str, float]:
+        """
+        Summarized frame features of a signal.
+
+        Args:
+            audio: Mono audio samples at processor.sample_rate
+
+        Returns:
+            Dictionary of '<column>_<statistic>' -> value
+        """
+        return self.summarize(self.frame_features(audio))
+
+    def extract_file(self, file_path: str) -> Dict[str, float]:
+        """
+        Load an audio file and summarize its frame features.
+
+        Args:
+            file_path: Path to audio file
+
+        Returns:
+            Dictionary with 'file_path', 'duration' and the summaries
+        """
+        audio, sr = self.processor.load_audio(file_path, verbose=False)
+        return {'file_path': file_path, 'duration': len(audio) / sr, **self.extract(audio)}
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Frequency Weighting and Octave Bands for Noise Environment Monitor
+
+Standard frequency weightings (IEC 61672-1) and fractional-octave band
+definitions (IEC 61260 / ANSI S1.11, base-10), expressed as per-bin vectors
+and matrices over rfft bins so levels for many frames come from one matrix
+product with their power spectra.
+
+- Weightings: 'A' (dBA, approximates hearing at moderate levels),
+  'C' (flat down to ~30 Hz, used for low-frequency and peak levels) and
+  'Z' (zero, unweighted).
+- Bands: octave (fraction=1, 31.5 Hz - 16 kHz) and third-octave
+  (fraction=3, 25 Hz - 20 kHz), limited to bands centered below the
+  Nyquist frequency (the top band may be cut off there). Each rfft bin is
+  split between the bands it overlaps in proportion to the overlap, so band
+  powers add up to the total.
+
+AudioProcessor.calculate_band_levels() builds these through SpectralPlan,
+which caches them per (sample_rate, n_fft).
+
+Author: Group 4 (GMU)
+Date: 2026-10-16
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+WEIGHTINGS = ('A', 'C', 'Z')
+
+# Band fractions (1/fraction octave) and the band indices k of the default
+# range; band k is centered on 1000 * OCTAVE_RATIO ** (k / fraction) Hz
+OCTAVE_RATIO = 10 ** (3 / 10)
+BAND_RANGES = {
+    1: (-5, 4),     # 31.5 Hz - 16 kHz
+    3: (-16, 13),   # 25 Hz - 20 kHz
+}
+
+# Pole frequencies (Hz) of the IEC 61672-1 weighting curves
+_F1, _F2, _F3, _F4 = 20.598997, 107.65265, 737.86223, 12194.217
+
+
+def weighting_db(frequencies: np.ndarray, weighting: str = 'A') -> np.ndarray:
+    """
+    Frequency weighting gain in dB.
+
+    Args:
+        frequencies: Frequencies (Hz)
+        weighting: 'A', 'C' or 'Z'
+
+    Returns:
+        Gain (dB) per frequency; -inf at 0 Hz for A and C
+    """
+    if weighting not in WEIGHTINGS:
+        raise ValueError(f"weighting must be one of {WEIGHTINGS}, got '{weighting}'")
+    f2 = np.asarray(frequencies, dtype=np.float64) ** 2
+    if weighting == 'Z':
+        return np.zeros_like(f2)
+
+    with np.errstate(divide='ignore'):
+        if weighting == 'A':
+            gain = (_F4 ** 2 * f2 ** 2) / ((f2 + _F1 ** 2) * np.sqrt((f2 + _F2 ** 2) * (f2 + _F3 ** 2))
+                                          * (f2 + _F4 ** 2))
+            return 20 * np.log10(gain) + 2.0
+        gain = (_F4 ** 2 * f2) / ((f2 + _F1 ** 2) * (f2 + _F4 ** 2))
+        return 20 * np.log10(gain) + 0.062
+
+
+def band_center_frequencies(sample_rate: int, fraction: int = 3) -> np.ndarray:
+    """
+    Exact center frequencies of the default bands centered below the Nyquist frequency.
+
+    Args:
+        sample_rate: Sample rate (Hz)
+        fraction: 1 for octave bands, 3 for third-octave bands
+
+    Returns:
+        Center frequencies (Hz), e.g. 31.62 for the nominal 31.5 Hz band
+    """
+    if fraction not in BAND_RANGES:
+        raise ValueError(f"fraction must be one of {tuple(BAND_RANGES)}, got {fraction}")
+    first, last = BAND_RANGES[fraction]
+    centers = 1000 * OCTAVE_RATIO ** (np.arange(first, last + 1) / fraction)
+    return centers[centers < sample_rate / 2]
+
+
+def band_overlap_weights(frequencies: np.ndarray, centers: np.ndarray,
+                         fraction: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Share of each rfft bin that falls in each band, as sparse coordinates.
+
+    Bin k is taken to cover [f_k - df/2, f_k + df/2).
+
+    Args:
+        frequencies: Evenly spaced bin frequencies (Hz), as from np.fft.rfftfreq
+        centers: Band center frequencies (Hz)
+        fraction: Bands per octave
+
+    Returns:
+        Tuple of ((bin_indices, band_indices), shares) for the non-zero entries
+    """
+    bin_width = frequencies[1] - frequencies[0]
+    half_band = OCTAVE_RATIO ** (1 / (2 * fraction))
+    lower, upper = centers / half_band, centers * half_band
+
+    # (n_bins, n_bands) overlap is small; only the non-zero entries are kept
+    overlap = (np.minimum(frequencies[:, np.newaxis] + bin_width / 2, upper)
+               - np.maximum(frequencies[:, np.newaxis] - bin_width / 2, lower))
+    bins, bands = np.nonzero(overlap > 0)
+    return (bins, bands), overlap[bins, bands] / bin_width
@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+Local Inference Server for Noise Environment Monitor
+
+Serves the trained baseline classifier (baseline_classifier.pkl, written by
+train_classifier.py) over HTTP. The model package is loaded once at start,
+and requests are classified with dynamic micro-batching:
+
+- Each request is turned into one feature vector: either directly (JSON
+  features) or by analyzing the posted audio with AudioProcessor.
+- Handler threads put the vectors on a shared queue and wait.
+- A single batcher thread takes the first waiting vector, collects any
+  others that arrive within window_ms (up to max_batch_size), and calls
+  model.predict_proba once for the whole batch.
+
+A lone request therefore waits at most window_ms longer. Under concurrent
+load, many requests share one predict_proba call, whose fixed per-call
+overhead dominates the cost for a random forest on 13 features.
+
+Endpoints:
+    POST /predict   JSON {"features": {"avg_db": ..., ...}} (or a list in
+                    feature_columns order), or raw audio bytes (WAV, FLAC,
+                    ...; any Content-Type other than application/json)
+                    -> {"label", "probabilities", "batch_size"}
+    GET  /health    -> {"status": "ok", "classes", "feature_columns"}
+    GET  /stats     -> request, batch and latency counters
+
+Usage:
+    python inference_server.py serve --port 8000
+    curl -s localhost:8000/predict --data-binary @quiet_01.wav -H 'Content-Type: audio/wav'
+    python inference_server.py bench --clients 32 --requests 4000   # p50/p99, requests/s
+
+Author: Group 4 (GMU)
+Date: 2026-10-16
+"""
+
+import argparse
+import http.client
+import io
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from audio_processor import AudioProcessor
+
+MODEL_PATH = Path(__file__).parent / "../../ml-models/models/baseline_classifier.pkl"
+MODEL_PACKAGE_KEYS = ('model', 'label_encoder', 'feature_columns')
+MAX_BATCH_SIZE = 64    # Vectors per predict_proba call
+BATCH_WINDOW_MS = 5.0  # Longest a request waits for others to join its batch
+PREDICT_TIMEOUT = 30.0  # Seconds a request waits for its batch before the server answers 503
+MAX_BODY_BYTES = 64 * 1024 * 1024  # ~6 min of 16-bit stereo 44.1 kHz WAV; larger bodies get 413
+DEFAULT_PORT = 8000
+STATS_HISTORY = 10000  # Recent requests and batches kept for /stats
+
+# Model feature column -> AnalysisResult field, where the names differ
+RESULT_FIELDS = {
+    'avg_db': 'avg_decibels',
+    'max_db': 'max_decibels',
+    'min_db': 'min_decibels',
+    'std_db': 'std_decibels',
+}
+
+
+def load_model_package(model_path: Union[str, Path] = MODEL_PATH) -> Dict:
+    """
+    Load and check a model package written by train_classifier.save_model().
+
+    Args:
+        model_path: Path to the joblib file
+
+    Returns:
+        Package dictionary ('model', 'label_encoder', 'feature_columns', ...)
+    """
+    import joblib
+
+    package = joblib.load(model_path)
+    missing = [key for key in MODEL_PACKAGE_KEYS if key not in package]
+    if missing:
+        raise ValueError(f"Model package {model_path} is missing {missing}")
+    return package
+
+
+def feature_vector(values: Union[Mapping, Sequence[float]], feature_columns: Sequence[str]) -> np.ndarray:
+    """
+    Build the model input for one sample.
+
+    Args:
+        values: Features by model column name (e.g. 'avg_db') or by
+            AnalysisResult field (e.g. 'avg_decibels', so a
+            process_audio_file() result works as is), or a sequence in
+            feature_columns order
+        feature_columns: Column order of the model
+
+    Returns:
+        Array of shape (len(feature_columns),)
+    """
+    if isinstance(values, Mapping):
+        try:
+            values = [values[name] if name in values else values[RESULT_FIELDS.get(name, name)]
+                      for name in feature_columns]
+        except KeyError as e:
+            raise ValueError(f"Missing feature {e}")
+    vector = np.asarray(values, dtype=np.float64)
+    if vector.shape != (len(feature_columns),):
+        raise ValueError(f"Expected {len(feature_columns)} features, got shape {vector.shape}")
+    if not np.all(np.isfinite(vector)):
+        raise ValueError("Features must be finite")
+    return vector
+
+
+class MicroBatcher:
+    """
+    Groups concurrent single-sample predictions into predict_proba batches.
+    """
+
+    def __init__(self, model, max_batch_size: int = MAX_BATCH_SIZE,
+                 window_ms: float = BATCH_WINDOW_MS):
+        """
+        Initialize the batcher (submit() raises until start() is called).
+
+        Args:
+            model: Fitted classifier with predict_proba
+            max_batch_size: Vectors per predict_proba call
+            window_ms: How long the first request of a batch waits for
+                others (0 batches only requests that are already waiting)
+        """
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be at least 1, got {max_batch_size}")
+        if window_ms < 0:
+            raise ValueError(f"window_ms must not be negative, got {window_ms}")
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.window_ms = window_ms
+        self.requests = 0
+        self.batches = 0
+        self.batch_sizes = deque(maxlen=STATS_HISTORY)
+        self.latencies = deque(maxlen=STATS_HISTORY)  # Seconds from submit() to result, per request
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()  # Orders submit() against stop()'s end-of-queue marker
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Finish the waiting requests, then stop the batcher thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is not None:
+                self._queue.put(None)
+        if thread is not None:
+            thread.join()
+
+    def submit(self, vector: np.ndarray) -> Future:
+        """
+        Queue one feature vector.
+
+        Args:
+            vector: Output of feature_vector()
+
+        Returns:
+            Future resolving to (probabilities, batch size)
+
+        Raises:
+            RuntimeError: If the batcher is not running (nothing would
+                resolve the future)
+        """
+        future = Future()
+        with self._lock:
+            if self._thread is None:
+                raise RuntimeError("MicroBatcher is not running")
+            self._queue.put((vector, future, time.perf_counter()))
+        return future
+
+    def predict_proba(self, vector: np.ndarray) -> np.ndarray:
+        """Class probabilities of one vector (blocks until its batch has run)."""
+        return self.submit(vector).result(PREDICT_TIMEOUT)[0]
+
+    def stats(self) -> Dict:
+        """
+        Batching and latency counters.
+
+        Returns:
+            Dictionary with 'requests' and 'batches' since start, and over
+            the last STATS_HISTORY entries 'mean_batch_size',
+            'max_batch_size' and server-side 'p50_ms' / 'p99_ms' (queueing
+            plus prediction)
+        """
+        latencies_ms = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        return {
+            'requests': self.requests,
+            'batches': self.batches,
+            'mean_batch_size': float(np.mean(self.batch_sizes)) if self.batch_sizes else 0.0,
+            'max_batch_size': max(self.batch_sizes, default=0),
+            'p50_ms': float(np.percentile(latencies_ms, 50)),
+            'p99_ms': float(np.percentile(latencies_ms, 99)),
+        }
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.perf_counter() + self.window_ms / 1000
+            while len(batch) < self.max_batch_size:
+                try:
+                    remaining = deadline - time.perf_counter()
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._predict(batch)
+
+    def _predict(self, batch: List):
+        try:
+            probabilities = self.model.predict_proba(np.stack([vector for vector, _, _ in batch]))
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        done = time.perf_counter()
+        self.requests += len(batch)
+        self.batches += 1
+        self.batch_sizes.append(len(batch))
+        for (_, future, submitted), row in zip(batch, probabilities):
+            self.latencies.append(done - submitted)
+            future.set_result((row, len(batch)))
+
+
+class InferenceServer(ThreadingHTTPServer):
+    """
+    HTTP server classifying feature vectors or audio with one loaded model.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', DEFAULT_PORT), model_package: Optional[Dict] = None,
+                 processor: Optional[AudioProcessor] = None, max_batch_size: int = MAX_BATCH_SIZE,
+                 window_ms: float = BATCH_WINDOW_MS):
+        """
+        Load the model and bind the server (serve_forever() starts it).
+
+        Args:
+            address: (host, port); port 0 picks a free port
+            model_package: Output of load_model_package() (defaults to
+                loading MODEL_PATH)
+            processor: AudioProcessor for audio requests
+            max_batch_size: See MicroBatcher
+            window_ms: See MicroBatcher
+        """
+        super().__init__(address, _InferenceHandler)
+        self.model_package = model_package or load_model_package()
+        self.feature_columns = list(self.model_package['feature_columns'])
+        self.classes = [str(label) for label in self.model_package['label_encoder'].classes_]
+        self.processor = processor or AudioProcessor()
+        self.batcher = MicroBatcher(self.model_package['model'], max_batch_size, window_ms)
+        self.batcher.start()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def classify(self, vector: np.ndarray, timeout: float = PREDICT_TIMEOUT) -> Dict:
+        """
+        Classify one feature vector through the micro-batcher.
+
+        Args:
+            vector: Output of feature_vector()
+            timeout: Seconds to wait for the batch
+
+        Returns:
+            Dictionary with 'label', 'probabilities' (class -> p) and
+            'batch_size' (requests that shared the predict_proba call)
+
+        Raises:
+            RuntimeError: If the batcher has stopped (server shutting down)
+            concurrent.futures.TimeoutError: If the batch did not run in time
+        """
+        probabilities, batch_size = self.batcher.submit(vector).result(timeout)
+        return {
+            'label': self.classes[int(np.argmax(probabilities))],
+            'probabilities': dict(zip(self.classes, map(float, probabilities))),
+            'batch_size': batch_size,
+        }
+
+    def audio_features(self, data: bytes) -> np.ndarray:
+        """Analyze posted audio bytes and return the model's feature vector."""
+        audio, sr = self.processor.load_audio(io.BytesIO(data), verbose=False)
+        results = self.processor.analyze_audio(audio, sr, arrays=False)
+        return feature_vector(results, self.feature_columns)
+
+    def server_close(self):
+        super().server_close()
+        self.batcher.stop()
+
+
+class _InferenceHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive: clients reuse connections
+    # Headers and body are separate writes; with Nagle's algorithm the body
+    # waits for the client's delayed ACK (~40 ms per response)
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        if self.path == '/health':
+            self._reply(200, {'status': 'ok', 'classes': server.classes,
+                              'feature_columns': server.feature_columns})
+        elif self.path == '/stats':
+            self._reply(200, server.batcher.stats())
+        else:
+            self._reply(404, {'error': f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != '/predict':
+            self._reply(404, {'error': f"Unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            # The body cannot be found in the stream, so the connection cannot be reused
+            self.close_connection = True
+            self._reply(400, {'error': f"Invalid Content-Length {self.headers.get('Content-Length')!r}"})
+            return
+        if length > MAX_BODY_BYTES:
+            # Not read, so the connection cannot be reused either
+            self.close_connection = True
+            self._reply(413, {'error': f"Body of {length} bytes exceeds {MAX_BODY_BYTES}"})
+            return
+        body = self.rfile.read(length)
+        try:
+            if self.headers.get('Content-Type', '').startswith('application/json'):
+                vector = feature_vector(json.loads(body)['features'], self.server.feature_columns)
+            else:
+                vector = self.server.audio_features(body)
+        except (ValueError, KeyError, TypeError) as e:
+            self._reply(400, {'error': f"{type(e).__name__}: {e}"})
+            return
+        try:
+            prediction = self.server.classify(vector)
+        except Exception as e:
+            # Stopped or overloaded batcher: try again later (503); otherwise the model failed (500)
+            unavailable = isinstance(e, FutureTimeoutError) or not self.server.batcher.running
+            self._reply(503 if unavailable else 500, {'error': f"{type(e).__name__}: {e}"})
+            return
+        self._reply(200, prediction)
+
+    def _reply(self, status: int, payload: Dict):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # One line per request would dominate the load test
+
+
+def generate_load(url: str, body: bytes, content_type: str = 'application/json',
+                  n_clients: int = 16, n_requests: int = 2000) -> Dict:
+    """
+    Send concurrent /predict requests and measure client-side latency.
+
+    Each client is a thread with one keep-alive connection, sending its
+    next request as soon as the previous response arrives.
+
+    Args:
+        url: Server URL, e.g. InferenceServer.url
+        body: Request body sent by every request
+        content_type: Content-Type of body
+        n_clients: Concurrent clients
+        n_requests: Total requests, shared between the clients
+
+    Returns:
+        Dictionary with 'requests', 'errors', 'p50_ms', 'p99_ms',
+        'max_ms' and 'requests_per_second'
+    """
+    host, port = url.split('//', 1)[1].rsplit(':', 1)
+    latencies = [[] for _ in range(n_clients)]
+    errors = [0] * n_clients
+
+    def client(index: int):
+        connection = http.client.HTTPConnection(host, int(port))
+        for _ in range(n_requests // n_clients + (index < n_requests % n_clients)):
+            start = time.perf_counter()
+            connection.request('POST', '/predict', body, {'Content-Type': content_type})
+            response = connection.getresponse()
+            response.read()
+            latencies[index].append(time.perf_counter() - start)
+            errors[index] += response.status != 200
+        connection.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(n_clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.concatenate([np.array(values) for values in latencies]) * 1000
+    return {
+        'requests': len(latencies_ms),
+        'errors': sum(errors),
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p99_ms': float(np.percentile(latencies_ms, 99)),
+        'max_ms': float(latencies_ms.max()),
+        'requests_per_second': len(latencies_ms) / elapsed,
+    }
+
+
+def benchmark(model_package: Optional[Dict] = None, n_clients: int = 16, n_requests: int = 2000,
+              audio_seconds: Optional[float] = None, max_batch_size: int = MAX_BATCH_SIZE,
+              window_ms: float = BATCH_WINDOW_MS) -> Dict:
+    """
+    Start a server on a free local port, load it with generate_load(), stop it.
+
+    Args:
+        model_package: Output of load_model_package() (defaults to MODEL_PATH)
+        n_clients: Concurrent clients
+        n_requests: Total requests
+        audio_seconds: Post a synthetic WAV of this length instead of a
+            feature vector (None sends JSON features)
+        max_batch_size: See MicroBatcher (1 disables batching)
+        window_ms: See MicroBatcher
+
+    Returns:
+        generate_load() report plus the server's 'batches' and
+        'mean_batch_size'
+    """
+    server = InferenceServer(('127.0.0.1', 0), model_package,
+                             max_batch_size=max_batch_size, window_ms=window_ms)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        rng = np.random.default_rng(0)
+        if audio_seconds is None:
+            features = dict(zip(server.feature_columns, rng.uniform(0.1, 1.0, len(server.feature_columns))))
+            features.update(avg_db=55.0, max_db=70.0, min_db=40.0, std_db=6.0)
+            body, content_type = json.dumps({'features': features}).encode(), 'application/json'
+        else:
+            import soundfile as sf
+
+            sample_rate = server.processor.sample_rate
+            buffer = io.BytesIO()
+            sf.write(buffer, (0.1 * rng.standard_normal(int(audio_seconds * sample_rate))).astype(np.float32),
+                     sample_rate, format='WAV', subtype='PCM_16')
+            body, content_type = buffer.getvalue(), 'audio/wav'
+
+        report = generate_load(server.url, body, content_type, n_clients, n_requests)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    batching = server.batcher.stats()
+    report.update(batches=batching['batches'], mean_batch_size=batching['mean_batch_size'])
+    return report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Serve the baseline noise classifier over HTTP")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve', help="Run the server until interrupted")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT)
+
+    bench = commands.add_parser('bench', help="Load test a local server: p50/p99 latency, requests/s")
+    bench.add_argument('--clients', type=int, default=16)
+    bench.add_argument('--requests', type=int, default=2000)
+    bench.add_argument('--audio-seconds', type=float, default=None,
+                       help="Post synthetic audio of this length instead of feature vectors")
+
+    for command in (serve, bench):
+        command.add_argument('--model', default=str(MODEL_PATH), help="Model package (.pkl)")
+        command.add_argument('--max-batch', type=int, default=MAX_BATCH_SIZE)
+        command.add_argument('--window-ms', type=float, default=BATCH_WINDOW_MS)
+    args = parser.parse_args(argv)
+
+    model_package = load_model_package(args.model)
+    if args.command == 'serve':
+        server = InferenceServer((args.host, args.port), model_package,
+                                 max_batch_size=args.max_batch, window_ms=args.window_ms)
+        print(f"Serving {Path(args.model).name} on {server.url} (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return
+
+    payload = f"{args.audio_seconds:.0f} s audio" if args.audio_seconds else "feature vectors"
+    print(f"Load test: {args.requests} requests ({payload}) from {args.clients} clients...")
+    report = benchmark(model_package, args.clients, args.requests, args.audio_seconds,
+                       args.max_batch, args.window_ms)
+    print(f"  Latency p50: {report['p50_ms']:.2f} ms, p99: {report['p99_ms']:.2f} ms "
+          f"(max {report['max_ms']:.2f} ms)")
+    print(f"  Throughput: {report['requests_per_second']:.0f} requests/s, errors: {report['errors']}")
+    print(f"  Batches: {report['batches']} (mean size {report['mean_batch_size']:.1f})")
+
+
+if __name__ == "__main__":
+    main()
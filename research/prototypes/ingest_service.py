@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+"""
+Drop-Folder Ingestion Service for Noise Environment Monitor
+
+Watches the directory the mobile app uploads recordings to and analyzes
+every new file without anyone running AudioProcessor by hand. The service
+is an asyncio pipeline of four stages connected by bounded queues:
+
+    discover --> decode queue --> decoders --> analyze queue --> analyzers --> result queue --> writer
+    (polling)                    (threads)                      (processes)                    (sink)
+
+- Discovery polls the upload directory. A file is taken once its size and
+  modification time are unchanged between two polls, so files still being
+  uploaded are never read half-written.
+- Decoders run AudioProcessor.load_audio() in a thread pool (libsndfile
+  releases the GIL while decoding).
+- Analyzers run AudioProcessor.analyze_audio() in a process pool; only the
+  scalar features travel back.
+- The writer appends one row per file to a results sink.
+
+Every queue is bounded, so a slow stage blocks the one before it
+(backpressure) and memory stays bounded: at most decode_queue_size paths
+and analyze_queue_size decoded signals wait at any time. When the decode
+queue is full, discovery either waits (overflow='block') or sheds the file:
+it is recorded in the sink with status 'shed' (once per file) and left in
+place, and a later poll takes it again once the queue has room. Every
+counter except 'requeued' counts distinct files; 'requeued' counts the
+attempts to take a shed file again.
+
+Delivery is at-least-once. Files leave upload_dir only when archive_dir is
+set; otherwise a restarted service would analyze every file still there
+again. A ledger (ledger_path, kept next to the results file by the command
+line) records each file written to the sink by (path, size, mtime_ns) and
+is loaded at start, so a restart skips those files and retakes only new or
+changed ones. A crash between writing a row and recording it can still
+repeat that one file.
+
+A row that cannot be archived keeps status 'analyzed' with the archive
+error in 'error'. A row the sink fails to write is logged and counted as
+'unwritten'. Neither stops the pipeline.
+
+stop() (or SIGINT / SIGTERM under the command line) drains gracefully:
+discovery stops taking files, and everything already queued is decoded,
+analyzed and written before run() returns.
+
+Usage:
+    service = IngestService('uploads/', JsonLinesResultSink('results.jsonl'))
+    asyncio.run(service.run())
+
+    python ingest_service.py watch uploads/ --results results.jsonl
+    python ingest_service.py flood 200       # synthetic flood test, files/sec
+
+Author: Group 4 (GMU)
+Date: 2026-10-16
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shutil
+import signal
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from audio_processor import AudioProcessor
+
+INGEST_EXTENSIONS = ('.wav', '.flac', '.ogg', '.mp3', '.m4a')
+POLL_INTERVAL = 0.5          # Seconds between directory scans
+DECODE_QUEUE_SIZE = 32       # Paths waiting to be decoded
+ANALYZE_QUEUE_SIZE = 8       # Decoded signals waiting to be analyzed
+RESULT_QUEUE_SIZE = 64       # Rows waiting to be written
+OVERFLOW_POLICIES = ('block', 'shed')
+
+logger = logging.getLogger(__name__)
+
+
+class JsonLinesResultSink:
+    """
+    Appends one JSON object per analyzed file to a file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open the sink.
+
+        Args:
+            path: JSON Lines file; appended to if it exists
+        """
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def write(self, row: Dict):
+        # Flushed per row, so an interrupted run loses nothing already written
+        self._file.write(json.dumps(row, default=_json_value) + '\n')
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class MemoryResultSink:
+    """
+    Keeps the rows in a list (tests, notebooks).
+    """
+
+    def __init__(self):
+        self.rows: List[Dict] = []
+
+    def write(self, row: Dict):
+        self.rows.append(row)
+
+    def close(self):
+        pass
+
+
+def _json_value(value):
+    # NumPy scalars (e.g. float32 features) are not JSON serializable
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+
+class IngestService:
+    """
+    Asyncio pipeline from an upload directory to a results sink.
+
+    Files are delivered at least once: without archive_dir or ledger_path,
+    a restarted service re-analyzes (and re-writes rows for) every file
+    still in upload_dir.
+    """
+
+    def __init__(self, upload_dir: str, sink, processor: Optional[AudioProcessor] = None,
+                 decode_workers: int = 2, analyze_workers: Optional[int] = None,
+                 decode_queue_size: int = DECODE_QUEUE_SIZE, analyze_queue_size: int = ANALYZE_QUEUE_SIZE,
+                 overflow: str = 'block', poll_interval: float = POLL_INTERVAL,
+                 archive_dir: Optional[str] = None, ledger_path: Optional[str] = None):
+        """
+        Initialize the service.
+
+        Args:
+            upload_dir: Directory to watch
+            sink: Object with write(row) and close(), e.g. JsonLinesResultSink
+            processor: AudioProcessor copied to every analyzer process
+            decode_workers: Decoder threads
+            analyze_workers: Analyzer processes (defaults to os.cpu_count())
+            decode_queue_size: Paths waiting to be decoded
+            analyze_queue_size: Decoded signals waiting to be analyzed
+            overflow: 'block' to wait for room in the decode queue
+                (backpressure on discovery), 'shed' to skip the file
+            poll_interval: Seconds between directory scans
+            archive_dir: Move successfully analyzed files here, renamed if
+                the name is taken (None leaves them in upload_dir)
+            ledger_path: JSON Lines record of the files written to the sink,
+                loaded by run() so files already ingested are skipped
+                (None keeps the record in memory for this run only)
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}'; choose from {OVERFLOW_POLICIES}")
+        if decode_workers < 1 or (analyze_workers is not None and analyze_workers < 1):
+            raise ValueError("decode_workers and analyze_workers must be at least 1")
+        if decode_queue_size < 1 or analyze_queue_size < 1:
+            raise ValueError("Queue sizes must be at least 1")
+
+        self.upload_dir = upload_dir
+        self.sink = sink
+        self.processor = processor or AudioProcessor()
+        self.decode_workers = decode_workers
+        self.analyze_workers = analyze_workers or os.cpu_count() or 1
+        self.decode_queue_size = decode_queue_size
+        self.analyze_queue_size = analyze_queue_size
+        self.overflow = overflow
+        self.poll_interval = poll_interval
+        self.archive_dir = archive_dir
+        self.ledger_path = ledger_path
+
+        self.counts = dict.fromkeys(('discovered', 'shed', 'requeued', 'decoded', 'analyzed', 'failed',
+                                     'written', 'unwritten'), 0)
+        self._seen = {}             # Path -> (size, mtime) for the paths queued in this run
+        self._ingested = {}         # Path -> (size, mtime) for the paths in the ledger
+        self._ledger = None
+        self._last_scan = {}
+        self._shed = set()          # Paths shed and not yet queued
+        self._candidates = {}       # Path -> (size, mtime) at the previous poll
+        self._first_taken = None
+        self._last_written = None
+        self._stopping = None
+
+    def stop(self):
+        """Stop discovering files; run() returns once the queued files are written."""
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def run(self, once: bool = False) -> Dict:
+        """
+        Run the pipeline until stop() is called.
+
+        Args:
+            once: Stop by itself once the files present at start (and any
+                that arrive meanwhile, or were shed) are taken and no upload
+                is pending
+
+        Returns:
+            stats() after the drain
+        """
+        self._stopping = asyncio.Event()
+        decode_queue = asyncio.Queue(self.decode_queue_size)
+        analyze_queue = asyncio.Queue(self.analyze_queue_size)
+        result_queue = asyncio.Queue(RESULT_QUEUE_SIZE)
+        if self.archive_dir:
+            os.makedirs(self.archive_dir, exist_ok=True)
+        if self.ledger_path:
+            self._ingested = load_ledger(self.ledger_path)
+            self._ledger = open(self.ledger_path, 'a', encoding='utf-8')
+
+        with ThreadPoolExecutor(self.decode_workers) as decode_pool, \
+                ProcessPoolExecutor(self.analyze_workers, initializer=_init_ingest_worker,
+                                    initargs=(self.processor,)) as analyze_pool:
+            writer = asyncio.create_task(self._write(decode_pool, result_queue))
+            analyzers = [asyncio.create_task(self._analyze(analyze_pool, analyze_queue, result_queue))
+                         for _ in range(self.analyze_workers)]
+            decoders = [asyncio.create_task(self._decode(decode_pool, decode_queue, analyze_queue, result_queue))
+                        for _ in range(self.decode_workers)]
+
+            # Graceful drain: each stage finishes its queue before the next is told to stop
+            await self._discover(decode_queue, result_queue, once)
+            for stage, queue in ((decoders, decode_queue), (analyzers, analyze_queue), ([writer], result_queue)):
+                for _ in stage:
+                    await queue.put(None)
+                await asyncio.gather(*stage)
+
+        self.sink.close()
+        if self._ledger is not None:
+            self._ledger.close()
+            self._ledger = None
+        return self.stats()
+
+    def stats(self) -> Dict:
+        """
+        Pipeline counters and sustained throughput.
+
+        Returns:
+            Dictionary of the counters ('discovered', 'shed', 'requeued',
+            'decoded', 'analyzed', 'failed', 'written', 'unwritten') plus
+            'elapsed' (seconds from the first file taken to the last row
+            written) and 'files_per_second' (analyzed files over that span)
+        """
+        elapsed = 0.0
+        if self._first_taken is not None and self._last_written is not None:
+            elapsed = self._last_written - self._first_taken
+        return {**self.counts, 'elapsed': elapsed,
+                'files_per_second': self.counts['analyzed'] / elapsed if elapsed > 0 else 0.0}
+
+    def scan(self) -> List[str]:
+        """
+        List the files in upload_dir that are complete and not yet taken.
+
+        A file is complete when its size and modification time match the
+        previous scan. Files in the ledger with the same size and
+        modification time were ingested before and are skipped.
+
+        Returns:
+            Paths, oldest first
+        """
+        current = {}
+        with os.scandir(self.upload_dir) as entries:
+            for entry in entries:
+                if (entry.name.startswith('.') or not entry.name.lower().endswith(INGEST_EXTENSIONS)
+                        or entry.path in self._seen or not entry.is_file()):
+                    continue
+                info = entry.stat()
+                state = (info.st_size, info.st_mtime_ns)
+                if self._ingested.get(entry.path) != state:
+                    current[entry.path] = state
+
+        stable = [path for path, state in current.items() if self._candidates.get(path) == state]
+        self._candidates = {path: state for path, state in current.items() if path not in stable}
+        self._last_scan = current
+        return sorted(stable, key=lambda path: current[path][1])
+
+    async def _discover(self, decode_queue: asyncio.Queue, result_queue: asyncio.Queue, once: bool):
+        while not self._stopping.is_set():
+            shed = False
+            for path in self.scan():
+                self._seen[path] = self._last_scan[path]
+                if path in self._shed:
+                    self.counts['requeued'] += 1
+                else:
+                    self.counts['discovered'] += 1
+                if self._first_taken is None:
+                    self._first_taken = time.perf_counter()
+                if self.overflow == 'shed' and decode_queue.full():
+                    # Not kept as seen: a later scan finds it again and retries
+                    del self._seen[path]
+                    shed = True
+                    if path not in self._shed:
+                        self._shed.add(path)
+                        self.counts['shed'] += 1
+                        await result_queue.put({'file_path': path, 'status': 'shed', 'error': 'decode queue full'})
+                else:
+                    self._shed.discard(path)
+                    await decode_queue.put(path)
+                if self._stopping.is_set():
+                    return
+
+            if once and not self._candidates and not shed:
+                return
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _decode(self, pool: ThreadPoolExecutor, decode_queue: asyncio.Queue,
+                      analyze_queue: asyncio.Queue, result_queue: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        while (path := await decode_queue.get()) is not None:
+            try:
+                audio, sr = await loop.run_in_executor(
+                    pool, partial(self.processor.load_audio, path, verbose=False))
+            except Exception as e:
+                self.counts['failed'] += 1
+                await result_queue.put({'file_path': path, 'status': 'failed', 'error': f"{type(e).__name__}: {e}"})
+                continue
+            self.counts['decoded'] += 1
+            await analyze_queue.put((path, audio, sr))
+
+    async def _analyze(self, pool: ProcessPoolExecutor, analyze_queue: asyncio.Queue,
+                       result_queue: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        while (item := await analyze_queue.get()) is not None:
+            try:
+                row = await loop.run_in_executor(pool, _analyze_decoded, *item)
+            except Exception as e:
+                # E.g. a worker process died; keep draining instead of stalling the pipeline
+                row = {'file_path': item[0], 'status': 'failed', 'error': f"{type(e).__name__}: {e}"}
+            self.counts['analyzed' if row['status'] == 'analyzed' else 'failed'] += 1
+            await result_queue.put(row)
+
+    async def _write(self, pool: ThreadPoolExecutor, result_queue: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        while (row := await result_queue.get()) is not None:
+            path = row['file_path']
+            state = self._seen.get(path)
+            if row['status'] == 'analyzed' and self.archive_dir:
+                try:
+                    row['archive_path'] = await loop.run_in_executor(pool, _archive, path, self.archive_dir)
+                    self._seen.pop(path, None)
+                except Exception as e:
+                    # The file stays in upload_dir (and taken) so it is not re-analyzed
+                    logger.warning("Could not archive %s: %s", path, e)
+                    row['error'] = f"Archive failed: {type(e).__name__}: {e}"
+
+            try:
+                self.sink.write(row)
+            except Exception as e:
+                logger.error("Could not write the result of %s: %s: %s", path, type(e).__name__, e)
+                self.counts['unwritten'] += 1
+                continue
+            self.counts['written'] += 1
+            if row['status'] == 'analyzed':
+                self._last_written = time.perf_counter()
+            if row['status'] != 'shed' and 'archive_path' not in row and state is not None:
+                self._record(path, state)
+
+    def _record(self, path: str, state: tuple):
+        # Only files still in upload_dir need a ledger entry; flushed per file like the sink
+        self._ingested[path] = state
+        if self._ledger is not None:
+            self._ledger.write(json.dumps({'file_path': path, 'size': state[0], 'mtime_ns': state[1]}) + '\n')
+            self._ledger.flush()
+
+
+def load_ledger(path: str) -> Dict[str, tuple]:
+    """
+    Read an ingestion ledger written by IngestService.
+
+    Args:
+        path: Ledger file (a missing file is an empty ledger)
+
+    Returns:
+        Dictionary of file path -> (size, mtime_ns); the last entry wins
+    """
+    ingested = {}
+    if not os.path.exists(path):
+        return ingested
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Blank, or torn by a crash mid-write
+            ingested[entry['file_path']] = (entry['size'], entry['mtime_ns'])
+    return ingested
+
+
+def _archive(file_path: str, archive_dir: str) -> str:
+    """Move a file into archive_dir without replacing an existing file; returns the new path."""
+    stem, extension = os.path.splitext(os.path.basename(file_path))
+    destination = os.path.join(archive_dir, stem + extension)
+    suffix = 1
+    while os.path.exists(destination):
+        destination = os.path.join(archive_dir, f"{stem}-{suffix}{extension}")
+        suffix += 1
+    shutil.move(file_path, destination)
+    return destination
+
+
+# Per-process state for IngestService analyzer workers
+_ingest_processor = None
+
+
+def _init_ingest_worker(processor: AudioProcessor):
+    global _ingest_processor
+    _ingest_processor = processor
+
+
+def _analyze_decoded(file_path: str, audio: np.ndarray, sample_rate: int) -> Dict:
+    """Analyze one decoded file in an analyzer worker and keep only scalar results."""
+    try:
+        results = _ingest_processor.analyze_audio(audio, sample_rate, file_path, arrays=False)
+    except Exception as e:
+        return {'file_path': file_path, 'status': 'failed', 'error': f"{type(e).__name__}: {e}"}
+    return {**results.to_row(), 'status': 'analyzed', 'error': None}
+
+
+def flood_test(n_files: int = 200, seconds: float = 10.0, processor: Optional[AudioProcessor] = None,
+               **service_options) -> Dict:
+    """
+    Drop a burst of synthetic recordings into a temporary directory and ingest them.
+
+    Args:
+        n_files: Files written before the service starts
+        seconds: Duration of each file
+        processor: AudioProcessor to analyze with
+        **service_options: Further IngestService arguments (e.g.
+            analyze_workers, overflow='shed', decode_queue_size)
+
+    Returns:
+        IngestService.stats(), plus 'n_files' and 'audio_seconds_per_second'
+        (recorded audio analyzed per wall-clock second)
+    """
+    import soundfile as sf
+
+    processor = processor or AudioProcessor()
+    rng = np.random.default_rng(0)
+    n_samples = int(seconds * processor.sample_rate)
+    t = np.arange(n_samples) / processor.sample_rate
+    tone = 0.2 * np.sin(2 * np.pi * 440 * t)
+
+    with tempfile.TemporaryDirectory() as upload_dir:
+        for i in range(n_files):
+            signal_ = tone * rng.uniform(0.1, 1.0) + 0.05 * rng.standard_normal(n_samples)
+            sf.write(os.path.join(upload_dir, f'flood_{i:05d}.wav'),
+                     signal_.astype(np.float32), processor.sample_rate, subtype='PCM_16')
+
+        service_options.setdefault('poll_interval', 0.05)
+        service = IngestService(upload_dir, MemoryResultSink(), processor, **service_options)
+        stats = asyncio.run(service.run(once=True))
+
+    stats['n_files'] = n_files
+    stats['audio_seconds_per_second'] = stats['files_per_second'] * seconds
+    return stats
+
+
+async def _watch(service: IngestService):
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, service.stop)
+    return await service.run()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Analyze recordings dropped into an upload directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    watch = commands.add_parser('watch', help="Watch a directory until interrupted (Ctrl+C drains)")
+    watch.add_argument('upload_dir')
+    watch.add_argument('--results', default='ingest_results.jsonl', help="JSON Lines results file")
+    watch.add_argument('--archive', default=None, help="Move analyzed files to this directory")
+    watch.add_argument('--ledger', default=None,
+                       help="Record of ingested files, skipped after a restart (default: <results>.ingested)")
+
+    flood = commands.add_parser('flood', help="Synthetic flood test: sustained files/sec")
+    flood.add_argument('n_files', type=int, nargs='?', default=200)
+    flood.add_argument('--seconds', type=float, default=10.0, help="Duration of each file")
+
+    for command in (watch, flood):
+        command.add_argument('--decode-workers', type=int, default=2)
+        command.add_argument('--analyze-workers', type=int, default=None)
+        command.add_argument('--queue-size', type=int, default=DECODE_QUEUE_SIZE, help="Decode queue size")
+        command.add_argument('--overflow', choices=OVERFLOW_POLICIES, default='block')
+    args = parser.parse_args(argv)
+
+    options = dict(decode_workers=args.decode_workers, analyze_workers=args.analyze_workers,
+                   decode_queue_size=args.queue_size, overflow=args.overflow)
+    if args.command == 'watch':
+        service = IngestService(args.upload_dir, JsonLinesResultSink(args.results),
+                                archive_dir=args.archive,
+                                ledger_path=args.ledger or args.results + '.ingested', **options)
+        print(f"Watching {args.upload_dir} -> {args.results} (Ctrl+C to drain and exit)")
+        stats = asyncio.run(_watch(service))
+    else:
+        print(f"Flood test: {args.n_files} files x {args.seconds:.0f} s...")
+        stats = flood_test(args.n_files, args.seconds, **options)
+
+    print(f"  Discovered: {stats['discovered']}, analyzed: {stats['analyzed']}, "
+          f"failed: {stats['failed']}, shed: {stats['shed']} (requeued {stats['requeued']} times)")
+    print(f"  Sustained: {stats['files_per_second']:.1f} files/s over {stats['elapsed']:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Per-Stage Instrumentation for Noise Environment Monitor
+
+Opt-in timing and counters for the processing and training pipeline. Each
+execution of a stage (load, db, filter, fft, features, classify, fit,
+predict) produces one record with its wall time, CPU time and counters
+(decoded sample bytes, samples processed, frames analyzed), which is passed
+to every configured sink:
+
+- MemorySink: per-stage totals in this process (summary(), print_summary())
+- JsonLinesSink: one JSON object per record, appended to a file; safe to
+  share between worker processes
+- PrometheusSink: per-stage totals in the Prometheus text exposition format,
+  e.g. for the node_exporter textfile collector
+
+Instrumentation is disabled by default. Components call
+timed_stage(instrumentation, name), which returns a shared no-op stage when
+instrumentation is None, so disabled stages cost one function call.
+
+Usage:
+    memory = MemorySink()
+    instrumentation = Instrumentation(memory, JsonLinesSink("stages.jsonl"))
+    processor = AudioProcessor(instrumentation=instrumentation)
+    processor.process_audio_file("sample.wav")
+    memory.print_summary()
+
+Author: Group 4 (GMU)
+Date: 2026-10-16
+"""
+
+import json
+import os
+import time
+from typing import Dict, Optional
+
+STAGES = ('load', 'db', 'filter', 'fft', 'features', 'classify', 'fit', 'predict')
+COUNTERS = ('bytes', 'samples', 'frames')
+
+
+class Stage:
+    """
+    One timed execution of a pipeline stage; use as a context manager.
+    """
+
+    __slots__ = ('name', 'counters', '_instrumentation', '_wall_start', '_cpu_start')
+
+    def __init__(self, instrumentation: 'Instrumentation', name: str):
+        self.name = name
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self._instrumentation = instrumentation
+
+    def add(self, bytes: int = 0, samples: int = 0, frames: int = 0):
+        """
+        Add to the stage's counters.
+
+        Args:
+            bytes: Decoded sample bytes
+            samples: Audio samples (or training/prediction rows) processed
+            frames: Analysis frames (windows, spectra) produced
+        """
+        self.counters['bytes'] += int(bytes)
+        self.counters['samples'] += int(samples)
+        self.counters['frames'] += int(frames)
+
+    def __enter__(self):
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._instrumentation.emit({
+            'stage': self.name,
+            'wall_time': time.perf_counter() - self._wall_start,
+            'cpu_time': time.process_time() - self._cpu_start,
+            **self.counters,
+            'pid': os.getpid(),
+            'timestamp': time.time(),
+        })
+        return False
+
+
+class _NullStage:
+    """Stage returned while instrumentation is disabled; does nothing."""
+
+    __slots__ = ()
+
+    def add(self, bytes: int = 0, samples: int = 0, frames: int = 0):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_STAGE = _NullStage()
+
+
+class Instrumentation:
+    """
+    Fan-out of stage records to sinks.
+    """
+
+    def __init__(self, *sinks):
+        """
+        Initialize instrumentation.
+
+        Args:
+            sinks: Objects with record(record), flush() and close()
+                (defaults to a single MemorySink)
+        """
+        self.sinks = list(sinks) or [MemorySink()]
+
+    def stage(self, name: str) -> Stage:
+        """
+        Start recording a stage.
+
+        Args:
+            name: Stage name (see STAGES)
+
+        Returns:
+            Stage context manager
+        """
+        return Stage(self, name)
+
+    def emit(self, record: Dict):
+        """Pass a finished stage record to every sink."""
+        for sink in self.sinks:
+            sink.record(record)
+
+    def flush(self):
+        """Flush every sink."""
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self):
+        """Flush and close every sink."""
+        for sink in self.sinks:
+            sink.close()
+
+
+def timed_stage(instrumentation: Optional[Instrumentation], name: str):
+    """
+    Stage context manager, or the no-op stage if instrumentation is None.
+
+    Args:
+        instrumentation: Instrumentation or None
+        name: Stage name
+
+    Returns:
+        Object with add() usable in a with statement
+    """
+    if instrumentation is None:
+        return NULL_STAGE
+    return instrumentation.stage(name)
+
+
+class MemorySink:
+    """
+    Per-stage totals of the records seen by this process.
+    """
+
+    def __init__(self):
+        self.totals = {}
+
+    def record(self, record: Dict):
+        totals = self.totals.get(record['stage'])
+        if totals is None:
+            totals = self.totals[record['stage']] = dict.fromkeys(
+                ('calls', 'wall_time', 'cpu_time') + COUNTERS, 0)
+        totals['calls'] += 1
+        for key in ('wall_time', 'cpu_time') + COUNTERS:
+            totals[key] += record[key]
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return the totals per stage.
+
+        Returns:
+            Dictionary of stage -> {'calls', 'wall_time', 'cpu_time',
+            'bytes', 'samples', 'frames'}
+        """
+        return {stage: dict(totals) for stage, totals in self.totals.items()}
+
+    def print_summary(self):
+        """Print the totals as a table, slowest stage first."""
+        total_wall = sum(totals['wall_time'] for totals in self.totals.values()) or 1.0
+        print(f"\n{'Stage':<10s} {'Calls':>7s} {'Wall (s)':>10s} {'CPU (s)':>10s} {'Share':>7s} "
+              f"{'Samples':>12s} {'Frames':>10s} {'MB':>8s}")
+        for stage, totals in sorted(self.totals.items(), key=lambda item: -item[1]['wall_time']):
+            print(f"{stage:<10s} {totals['calls']:>7d} {totals['wall_time']:>10.3f} "
+                  f"{totals['cpu_time']:>10.3f} {totals['wall_time'] / total_wall:>7.1%} "
+                  f"{totals['samples']:>12d} {totals['frames']:>10d} {totals['bytes'] / 1e6:>8.1f}")
+
+
+class JsonLinesSink:
+    """
+    Appends every stage record to a JSON lines file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the sink; the file is opened (in append mode) on first use.
+
+        Args:
+            path: Output file
+        """
+        self.path = str(path)
+        self._file = None
+
+    def record(self, record: Dict):
+        if self._file is None:
+            # Line buffered: each record is written in one append, so
+            # worker processes can share the file
+            self._file = open(self.path, 'a', buffering=1)
+        self._file.write(json.dumps(record) + '\n')
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __getstate__(self):
+        # Worker processes reopen the file themselves
+        return {'path': self.path, '_file': None}
+
+
+class PrometheusSink(MemorySink):
+    """
+    Per-stage totals rendered in the Prometheus text exposition format.
+    """
+
+    METRICS = (
+        ('calls', 'calls_total', 'Completed executions of the stage'),
+        ('wall_time', 'wall_seconds_total', 'Wall-clock time spent in the stage'),
+        ('cpu_time', 'cpu_seconds_total', 'Process CPU time spent in the stage'),
+        ('bytes', 'bytes_total', 'Decoded sample bytes'),
+        ('samples', 'samples_total', 'Samples (or rows) processed'),
+        ('frames', 'frames_total', 'Analysis frames produced'),
+    )
+
+    def __init__(self, path: Optional[str] = None, prefix: str = 'noise_monitor_stage'):
+        """
+        Initialize the sink.
+
+        Args:
+            path: File rewritten by flush() (e.g. a textfile collector
+                directory entry); None to only use render()
+            prefix: Metric name prefix
+        """
+        super().__init__()
+        self.path = str(path) if path is not None else None
+        self.prefix = prefix
+
+    def render(self) -> str:
+        """
+        Format the current totals.
+
+        Returns:
+            Prometheus text exposition
+        """
+        lines = []
+        for key, suffix, help_text in self.METRICS:
+            name = f"{self.prefix}_{suffix}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for stage in sorted(self.totals):
+                lines.append(f'{name}{{stage="{stage}"}} {self.totals[stage][key]}')
+        return '\n'.join(lines) + '\n'
+
+    def flush(self):
+        if self.path is None:
+            return
+        # Write then rename, so scrapers never read a partial file
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(self.render())
+        os.replace(temp_path, self.path)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Time-Weighted Sound Level Meter for Noise Environment Monitor
+
+Sound-level-meter style time weighting (IEC 61672): the squared signal is
+smoothed by a first-order exponential (IIR) filter and read out in dB at a
+decimated rate.
+
+- Fast: 125 ms time constant
+- Slow: 1 s time constant
+- Impulse: 35 ms time constant while rising, followed by a peak detector
+  that decays with a 1.5 s time constant (about 2.9 dB/s)
+
+Fast and Slow levels are evaluated exactly at the output rate: over one
+hop the filter output is a fixed weighted sum of the hop's squared samples
+plus the decayed previous output, so each hop costs one dot product and the
+recursion runs in scipy.signal.lfilter at the hop rate. Impulse filters
+every sample (its peak detector needs the per-sample level), then holds the
+decayed maximum of each hop. The filter state is carried between calls, so
+a recording can be fed block by block (or a live stream chunk by chunk)
+with the same levels as one call over the whole signal.
+
+Usage:
+    meter = TimeWeightedLevelMeter(processor, weighting='fast', hop_size=4410)
+    for block in blocks:
+        levels = meter.process(block)   # one dB value per 4410 samples
+
+Author: Group 4 (GMU)
+Date: 2026-10-16
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+from audio_processor import AudioProcessor, CALIBRATION_OFFSET_DB
+from filters import ExponentialFilter
+
+# Time constants (s) of the exponential mean-square filter per weighting
+TIME_WEIGHTINGS = {
+    'fast': 0.125,
+    'slow': 1.0,
+    'impulse': 0.035,
+}
+
+# Decay time constant (s) of the Impulse peak detector
+IMPULSE_DECAY_TIME = 1.5
+
+
+class TimeWeightedLevelMeter:
+    """
+    Exponentially time-weighted sound level with carried filter state.
+    """
+
+    def __init__(self, processor: Optional[AudioProcessor] = None, weighting: str = 'fast',
+                 hop_size: Optional[int] = None):
+        """
+        Initialize the level meter.
+
+        Args:
+            processor: AudioProcessor providing sample rate and dtype
+            weighting: 'fast', 'slow' or 'impulse'
+            hop_size: Samples between output levels (defaults to
+                processor.db_window_size // 2, the hop of
+                calculate_decibels(); 1 gives a level per sample)
+        """
+        if weighting not in TIME_WEIGHTINGS:
+            raise ValueError(f"weighting must be one of {tuple(TIME_WEIGHTINGS)}, got '{weighting}'")
+        self.processor = processor or AudioProcessor()
+        self.sample_rate = self.processor.sample_rate
+        self.weighting = weighting
+        self.time_constant = TIME_WEIGHTINGS[weighting]
+        self.hop_size = hop_size or self.processor.db_window_size // 2
+        if self.hop_size < 1:
+            raise ValueError(f"hop_size must be positive, got {self.hop_size}")
+
+        # Per-sample smoothing factor of the mean-square filter
+        alpha = 1 - np.exp(-1 / (self.time_constant * self.sample_rate))
+        # Decay of each sample of a hop by the hop's end, oldest first
+        hop_decay = np.arange(self.hop_size - 1, -1, -1)
+        if weighting == 'impulse':
+            self._filter_alpha = alpha
+            # Peak detector: power decay to the hop's end and dB lost per hop
+            self._hop_weights = np.exp(-hop_decay / (IMPULSE_DECAY_TIME * self.sample_rate))
+            self._hop_decay_db = 10 * np.log10(np.e) * self.hop_size / (IMPULSE_DECAY_TIME * self.sample_rate)
+        else:
+            # Weight of each sample of a hop in the output at the hop's end,
+            # and the factor the previous output decays by over one hop
+            self._hop_weights = alpha * (1 - alpha) ** hop_decay
+            self._filter_alpha = 1 - (1 - alpha) ** self.hop_size
+
+        self.reset()
+
+    def reset(self):
+        """Clear the filter state (the meter restarts from silence)."""
+        self.samples_seen = 0
+        self._mean_square = ExponentialFilter(alpha=self._filter_alpha, initial_state=0.0)
+        self._held_db = -np.inf
+        # Values of the hop currently being filled
+        self._pending = np.empty(0, dtype=self.processor.dtype or np.float32)
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """
+        Feed the next block of samples.
+
+        Args:
+            block: Audio samples (any length)
+
+        Returns:
+            Levels (dB) at every sample index n (counted from the start of
+            the stream) with (n + 1) % hop_size == 0 that falls in this block
+        """
+        block = self.processor.as_processing_dtype(np.asarray(block))
+        self.samples_seen += len(block)
+
+        if self.weighting == 'impulse':
+            # Hold the larger of each hop's decayed peak and the previous level
+            mean_square = self._mean_square.process(np.square(block, dtype=np.float64))
+            first_hop, hops = self._split_hops(mean_square)
+            peaks = np.concatenate([np.max(h * self._hop_weights, axis=1, initial=0.0)
+                                    for h in (first_hop, hops)])
+            return self._hold_peaks(self._to_decibels(peaks))
+
+        # y[k] = (1 - filter_alpha) * y[k - 1] + weighted sum of hop k
+        first_hop, hops = self._split_hops(block)
+        hop_sums = np.concatenate([np.einsum('ij,ij,j->i', h, h, self._hop_weights.astype(h.dtype))
+                                   for h in (first_hop, hops)])
+        mean_square = self._mean_square.process(hop_sums / self._filter_alpha)
+        return self._to_decibels(mean_square)
+
+    def filter(self, audio: np.ndarray) -> np.ndarray:
+        """
+        Compute the levels of a complete signal (resets the state first).
+
+        Args:
+            audio: Audio samples
+
+        Returns:
+            Levels (dB), one per hop_size samples
+        """
+        self.reset()
+        levels = self.process(audio)
+        self.reset()
+        return levels
+
+    def _split_hops(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # Complete the pending hop, frame the rest of the block in place and
+        # keep the unfinished last hop for the next call. Returns (0 or 1,
+        # hop_size) and (n, hop_size) arrays of complete hops, in order.
+        fill = min(self.hop_size - len(self._pending), len(values))
+        first_hop = np.concatenate((self._pending, values[:fill]))
+        values = values[fill:]
+        n_hops = len(values) // self.hop_size
+        hops = values[:n_hops * self.hop_size].reshape(n_hops, self.hop_size)
+
+        if len(first_hop) < self.hop_size:
+            self._pending = first_hop
+            return np.empty((0, self.hop_size), dtype=first_hop.dtype), hops
+        self._pending = values[n_hops * self.hop_size:].copy()
+        return first_hop[np.newaxis], hops
+
+    def _to_decibels(self, mean_square: np.ndarray) -> np.ndarray:
+        return 10 * np.log10(mean_square + 1e-20) + CALIBRATION_OFFSET_DB
+
+    def _hold_peaks(self, db_values: np.ndarray) -> np.ndarray:
+        # held[k] = max(db[k], held[k-1] - decay), unrolled as a running
+        # maximum of db[k] + k * decay shifted back by k * decay
+        if len(db_values) == 0:
+            return db_values
+        ramp = np.arange(1, len(db_values) + 1) * self._hop_decay_db
+        held = np.maximum(np.maximum.accumulate(db_values + ramp), self._held_db) - ramp
+        self._held_db = held[-1]
+        return held
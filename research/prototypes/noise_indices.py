@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Statistical Noise Indices for Noise Environment Monitor
+
+Environmental noise is reported as:
+
+- Leq: equivalent continuous level, the energetic mean 10*log10(mean(10^(L/10)))
+- L10 / L50 / L90: level exceeded 10% / 50% / 90% of the time
+  (L90 is the background level, L10 the intrusive noise)
+- Lmax: highest level
+
+LevelHistogram computes them in constant memory from a fixed-resolution
+histogram of dB values. Leq and Lmax are tracked exactly; percentile levels
+are interpolated within a bin, so they are accurate to the resolution
+(0.1 dB by default). Histograms with the same binning merge by adding
+counts, so levels from chunks, files, worker processes or days combine
+into one aggregate without keeping any per-window values.
+
+Usage:
+    histogram = LevelHistogram()
+    for block_db in db_blocks:
+        histogram.update(block_db)
+    total.merge(histogram)
+    print(total.indices())
+
+Author: Group 4 (GMU)
+Date: 2026-10-16
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+LEVEL_RESOLUTION_DB = 0.1            # Histogram bin width
+LEVEL_RANGE_DB = (-20.0, 140.0)      # Values outside are counted in the end bins
+PERCENTILE_LEVELS = (10, 50, 90)     # N of the reported L_N indices
+
+
+class LevelHistogram:
+    """
+    Mergeable fixed-resolution histogram of dB levels.
+    """
+
+    def __init__(self, resolution: float = LEVEL_RESOLUTION_DB,
+                 level_range: Tuple[float, float] = LEVEL_RANGE_DB):
+        """
+        Initialize an empty histogram.
+
+        Args:
+            resolution: Bin width (dB)
+            level_range: (lowest, highest) level resolved (dB)
+        """
+        if resolution <= 0 or level_range[1] <= level_range[0]:
+            raise ValueError(f"Invalid histogram binning: resolution={resolution}, range={level_range}")
+        self.resolution = float(resolution)
+        self.level_range = (float(level_range[0]), float(level_range[1]))
+        n_bins = int(np.ceil((self.level_range[1] - self.level_range[0]) / self.resolution))
+
+        self.counts = np.zeros(n_bins, dtype=np.int64)
+        self.count = 0
+        self.energy_sum = 0.0   # Sum of 10^(L/10), for Leq
+        self.max_level = -np.inf
+        self.min_level = np.inf
+
+    def update(self, db_values: np.ndarray):
+        """
+        Add dB values.
+
+        Args:
+            db_values: Levels (dB), any shape
+        """
+        db_values = np.asarray(db_values, dtype=np.float64).ravel()
+        if len(db_values) == 0:
+            return
+        bins = np.floor((db_values - self.level_range[0]) / self.resolution).astype(np.int64)
+        np.clip(bins, 0, len(self.counts) - 1, out=bins)
+        self.counts += np.bincount(bins, minlength=len(self.counts))
+
+        self.count += len(db_values)
+        self.energy_sum += float(np.sum(10 ** (db_values / 10)))
+        self.max_level = max(self.max_level, float(db_values.max()))
+        self.min_level = min(self.min_level, float(db_values.min()))
+
+    def merge(self, other: 'LevelHistogram') -> 'LevelHistogram':
+        """
+        Add another histogram's values to this one (in place).
+
+        Args:
+            other: Histogram with the same resolution and range
+
+        Returns:
+            self
+        """
+        if other.resolution != self.resolution or other.level_range != self.level_range:
+            raise ValueError("Cannot merge histograms with different binning")
+        self.counts += other.counts
+        self.count += other.count
+        self.energy_sum += other.energy_sum
+        self.max_level = max(self.max_level, other.max_level)
+        self.min_level = min(self.min_level, other.min_level)
+        return self
+
+    @property
+    def leq(self) -> float:
+        """Equivalent continuous level (dB), NaN if empty."""
+        if self.count == 0:
+            return np.nan
+        return 10 * np.log10(self.energy_sum / self.count)
+
+    def percentile_level(self, exceeded_percent: float) -> float:
+        """
+        Level exceeded exceeded_percent of the time (L_N).
+
+        Args:
+            exceeded_percent: N in L_N, between 0 and 100
+
+        Returns:
+            Level (dB), interpolated within its bin; NaN if empty
+        """
+        if self.count == 0:
+            return np.nan
+        # Rank of the level from the bottom, as in np.percentile(..., 100 - N)
+        rank = (1 - exceeded_percent / 100) * self.count
+        cumulative = np.cumsum(self.counts)
+        index = min(int(np.searchsorted(cumulative, rank, side='left')), len(self.counts) - 1)
+        below = cumulative[index] - self.counts[index]
+        fraction = (rank - below) / self.counts[index] if self.counts[index] else 0.0
+
+        level = self.level_range[0] + (index + fraction) * self.resolution
+        # Bins are coarser than the extremes, which are known exactly
+        return float(np.clip(level, self.min_level, self.max_level))
+
+    def indices(self) -> Dict[str, float]:
+        """
+        Standard noise indices.
+
+        Returns:
+            Dictionary with 'leq', 'l10', 'l50', 'l90' and 'lmax' (dB)
+        """
+        indices = {'leq': self.leq}
+        for n in PERCENTILE_LEVELS:
+            indices[f'l{n}'] = self.percentile_level(n)
+        indices['lmax'] = self.max_level if self.count else np.nan
+        return indices
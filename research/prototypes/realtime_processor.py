@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Real-Time Audio Processor for Noise Environment Monitor
+
+Processes a live PCM stream (as produced by the mobile AudioService) in
+arbitrary-sized chunks. Every hop it emits the window dB level, a smoothed
+level and a classification, using O(1) state updates:
+
+- RMS: per-hop energies are summed as samples arrive; the window energy is
+  a running sum over the last window_size / hop_size hop energies.
+- Smoothing: causal filters.MovingAverageFilter over the last
+  smoothing_window dB values (same semantics as the mobile
+  MovingAverageFilter: the mean of the available values during warm-up).
+
+The window dB values are identical to AudioProcessor.calculate_decibels()
+on the concatenated stream. With a processor that has an analysis_rate,
+chunks arrive at the device rate (processor.input_rate) and are decimated
+with a StreamingDecimator first. The decimator adds a delay of under 1 ms,
+and all times and sizes are then in analysis-rate samples.
+
+Usage:
+    python realtime_processor.py [n_streams] [seconds]   # latency simulation
+
+Author: Group 4 (GMU)
+Date: 2026-10-16
+"""
+
+import sys
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from audio_processor import (
+    AudioProcessor, CALIBRATION_OFFSET_DB, SMOOTHING_WINDOW_SIZE, StreamingDecimator
+)
+from filters import MovingAverageFilter
+
+LATENCY_HISTORY = 10000  # Chunk latencies kept for latency_report()
+
+
+class RealtimeAudioProcessor:
+    """
+    Incremental per-hop noise levels for a live audio stream.
+    """
+
+    def __init__(self, processor: Optional[AudioProcessor] = None,
+                 window_size: Optional[int] = None, hop_size: Optional[int] = None,
+                 smoothing_window: int = SMOOTHING_WINDOW_SIZE, buffer_seconds: float = 1.0,
+                 input_rate: Optional[int] = None):
+        """
+        Initialize the real-time processor.
+
+        Args:
+            processor: AudioProcessor providing sample rate, dtype and classification
+            window_size: Size of window for RMS calculation (samples);
+                defaults to processor.db_window_size
+            hop_size: Samples between emitted levels (defaults to window_size // 2);
+                must divide window_size
+            smoothing_window: dB values per moving average window
+            buffer_seconds: Length of the ring buffer of recent samples
+            input_rate: Sample rate of the incoming chunks (defaults to
+                processor.input_rate); may differ from the processor's
+                sample rate only if it has an analysis_rate
+        """
+        self.processor = processor or AudioProcessor()
+        self.sample_rate = self.processor.sample_rate
+        self.input_rate = input_rate or self.processor.input_rate
+        if self.input_rate != self.sample_rate and not self.processor.analysis_rate:
+            raise ValueError(f"Chunks at {self.input_rate} Hz need a processor with an analysis_rate "
+                             f"(processor runs at {self.sample_rate} Hz)")
+        window_size = window_size or self.processor.db_window_size
+        self.window_size = window_size
+        self.hop_size = hop_size or max(window_size // 2, 1)
+        if window_size % self.hop_size:
+            raise ValueError(f"hop_size ({self.hop_size}) must divide window_size ({window_size})")
+        self.smoothing_window = smoothing_window
+
+        # Ring buffer of the most recent samples (see recent_audio())
+        self._ring = np.zeros(max(int(buffer_seconds * self.sample_rate), window_size),
+                              dtype=self.processor.dtype or np.float32)
+        self._ring_pos = 0
+
+        self.reset()
+
+    def reset(self):
+        """Clear all stream state."""
+        self.samples_seen = 0
+        self.hops_emitted = 0
+        self._ring[:] = 0
+        self._ring_pos = 0
+        self._decimator = (StreamingDecimator(self.input_rate, self.sample_rate)
+                           if self.input_rate != self.sample_rate else None)
+
+        # Energy of the hop currently being filled
+        self._partial_energy = 0.0
+        self._partial_count = 0
+
+        # Last window_size / hop_size hop energies and their running sum
+        self._hop_energies = np.zeros(self.window_size // self.hop_size)
+        self._hop_index = 0
+        self._window_energy = 0.0
+
+        self._smoother = MovingAverageFilter(self.smoothing_window, mode='causal')
+
+        self.latencies = deque(maxlen=LATENCY_HISTORY)
+
+    def process_chunk(self, chunk: np.ndarray) -> List[Dict]:
+        """
+        Feed the next chunk of mono PCM samples.
+
+        Args:
+            chunk: Audio samples in [-1, 1] at input_rate (any length)
+
+        Returns:
+            One dictionary per completed hop with 'time' (end of window, s),
+            'decibels', 'smoothed_decibels' and 'classification'
+        """
+        start_time = time.perf_counter()
+        if self._decimator is not None:
+            chunk = self._decimator.process(chunk)
+        chunk = self.processor.as_processing_dtype(np.asarray(chunk))
+        self._write_ring(chunk)
+
+        levels = []
+        pos = 0
+        while pos < len(chunk):
+            take = min(self.hop_size - self._partial_count, len(chunk) - pos)
+            segment = chunk[pos:pos + take]
+            self._partial_energy += float(np.dot(segment, segment))
+            self._partial_count += take
+            pos += take
+
+            if self._partial_count == self.hop_size:
+                level = self._complete_hop(self.samples_seen + pos)
+                if level is not None:
+                    levels.append(level)
+
+        self.samples_seen += len(chunk)
+        self.latencies.append(time.perf_counter() - start_time)
+        return levels
+
+    def recent_audio(self, n_samples: Optional[int] = None) -> np.ndarray:
+        """
+        Return the most recent samples from the ring buffer, oldest first.
+
+        Args:
+            n_samples: Number of samples (defaults to window_size)
+
+        Returns:
+            1D array (copy)
+        """
+        n_samples = min(n_samples or self.window_size, len(self._ring), self.samples_seen)
+        indices = (self._ring_pos - n_samples + np.arange(n_samples)) % len(self._ring)
+        return self._ring[indices]
+
+    def latency_report(self) -> Dict[str, float]:
+        """
+        Summarize per-chunk processing latency.
+
+        Returns:
+            Dictionary with p50/p99/max latency and hop duration (ms)
+        """
+        latencies_ms = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        return {
+            'chunks': len(self.latencies),
+            'p50_ms': float(np.percentile(latencies_ms, 50)),
+            'p99_ms': float(np.percentile(latencies_ms, 99)),
+            'max_ms': float(latencies_ms.max()),
+            'hop_ms': self.hop_size / self.sample_rate * 1000,
+        }
+
+    def _complete_hop(self, end_sample: int) -> Optional[Dict]:
+        # Replace the oldest hop energy in the window
+        hop_energy = self._partial_energy
+        self._partial_energy = 0.0
+        self._partial_count = 0
+
+        self._window_energy += hop_energy - self._hop_energies[self._hop_index]
+        self._hop_energies[self._hop_index] = hop_energy
+        self._hop_index = (self._hop_index + 1) % len(self._hop_energies)
+        if self._hop_index == 0:
+            # Resynchronize once per window so rounding errors cannot accumulate
+            self._window_energy = float(self._hop_energies.sum())
+
+        self.hops_emitted += 1
+        if self.hops_emitted < len(self._hop_energies):
+            return None  # First window not complete yet
+
+        rms = np.sqrt(max(self._window_energy, 0.0) / self.window_size)
+        db = 20 * np.log10(rms + 1e-10) + CALIBRATION_OFFSET_DB
+
+        smoothed_db = self._smoother.update(db)
+
+        return {
+            'time': end_sample / self.sample_rate,
+            'decibels': db,
+            'smoothed_decibels': smoothed_db,
+            'classification': self.processor.classify_noise_simple(smoothed_db),
+        }
+
+    def _write_ring(self, chunk: np.ndarray):
+        chunk = chunk[-len(self._ring):]
+        end = self._ring_pos + len(chunk)
+        if end <= len(self._ring):
+            self._ring[self._ring_pos:end] = chunk
+        else:
+            split = len(self._ring) - self._ring_pos
+            self._ring[self._ring_pos:] = chunk[:split]
+            self._ring[:end - len(self._ring)] = chunk[split:]
+        self._ring_pos = end % len(self._ring)
+
+
+def simulate_live_streams(n_streams: int = 100, seconds: float = 10.0,
+                          chunk_size: int = 1024) -> Dict[str, float]:
+    """
+    Drive many simulated live streams through one process, round-robin.
+
+    Args:
+        n_streams: Concurrent streams
+        seconds: Audio duration per stream
+        chunk_size: Samples per chunk (1024 matches the mobile buffer size)
+
+    Returns:
+        Latency report over all chunks, plus the real-time factor
+        (audio seconds processed per wall-clock second)
+    """
+    processor = AudioProcessor()
+    streams = [RealtimeAudioProcessor(processor) for _ in range(n_streams)]
+    rng = np.random.default_rng(0)
+    chunks = (0.1 * rng.standard_normal((64, chunk_size))).astype(np.float32)
+
+    n_chunks = int(seconds * processor.sample_rate / chunk_size)
+    start = time.perf_counter()
+    for i in range(n_chunks):
+        for stream in streams:
+            stream.process_chunk(chunks[i % len(chunks)])
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.concatenate([np.array(s.latencies) for s in streams]) * 1000
+    return {
+        'streams': n_streams,
+        'chunks': len(latencies_ms),
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p99_ms': float(np.percentile(latencies_ms, 99)),
+        'hop_ms': streams[0].hop_size / processor.sample_rate * 1000,
+        'realtime_factor': n_streams * n_chunks * chunk_size / processor.sample_rate / elapsed,
+    }
+
+
+if __name__ == "__main__":
+    n_streams = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+
+    print(f"Simulating {n_streams} live streams x {seconds:.0f} s (1024-sample chunks)...")
+    report = simulate_live_streams(n_streams, seconds)
+    print(f"  Chunks processed: {report['chunks']}")
+    print(f"  Latency p50: {report['p50_ms']:.3f} ms, p99: {report['p99_ms']:.3f} ms "
+          f"(hop: {report['hop_ms']:.1f} ms)")
+    print(f"  Real-time factor: {report['realtime_factor']:.0f}x "
+          f"(streams sustainable per core: ~{report['realtime_factor']:.0f})")
@@ -28,7 +28,7 @@ import argparse
 sys.path.insert(0, str(Path(__file__).parent))
 
 try:
-    from audio_processor import AudioProcessor
+    from audio_processor import AudioProcessor, SpectralPlan
     import joblib
     import pandas as pd
 except ImportError as e:
@@ -336,6 +336,1132 @@ def test_end_to_end_prediction(runner):
     return runner.run_test("End-to-End Prediction", test)
 
 
+def test_vectorized_decibels(runner):
+    """Test 9: Vectorized dB engine matches the per-window reference loop"""
+    def test():
+        processor = AudioProcessor()
+        rng = np.random.default_rng(0)
+        audio = (0.1 * rng.standard_normal(3 * 44100)).astype(np.float32)
+
+        def reference(audio, window_size, hop_size):
+            db_values = []
+            for start in range(0, len(audio) - window_size + 1, hop_size):
+                rms = processor.calculate_rms(audio[start:start + window_size])
+                db_values.append(20 * np.log10(rms + 1e-10) + 94)
+            return np.array(db_values)
+
+        for window_size, hop_size in [(4096, 2048), (4096, 1024), (1000, 333)]:
+            expected = reference(audio, window_size, hop_size)
+            actual = processor.calculate_decibels(audio, window_size, hop_size=hop_size)
+            assert actual.shape == expected.shape, \
+                f"Window count mismatch for ({window_size}, {hop_size}): {actual.shape} vs {expected.shape}"
+            max_err = np.max(np.abs(actual - expected))
+            assert max_err < 1e-3, f"Max dB error {max_err:.2e} for ({window_size}, {hop_size})"
+            runner.log(f"  ✓ window={window_size}, hop={hop_size}: {len(actual)} windows, max error {max_err:.1e} dB")
+
+        # Default hop keeps the original 50% overlap window count
+        db_values = processor.calculate_decibels(audio)
+        assert len(db_values) == len(audio) // 2048 - 1, f"Unexpected window count: {len(db_values)}"
+        runner.log(f"  ✓ Default 50% overlap: {len(db_values)} windows")
+
+    return runner.run_test("Vectorized Decibels", test)
+
+
+def test_streaming_matches_batch(runner):
+    """Test 10: Streaming analysis reproduces the batch summary"""
+    def test():
+        import tempfile
+        import soundfile as sf
+
+        processor = AudioProcessor()
+        rng = np.random.default_rng(1)
+        audio = 0.2 * rng.standard_normal(5 * 44100)
+        audio[:44100] *= 0.05  # Quiet lead-in so the statistics vary
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            wav_path = str(Path(tmp_dir) / "stream.wav")
+            sf.write(wav_path, audio, 44100)
+
+            batch = processor.process_audio_file(wav_path, verbose=False)
+            for block_size in [1000, 65536]:
+                streamed = processor.analyze_stream(wav_path, block_size=block_size)
+                for key, expected in batch.items():
+                    if key in ('file_path', 'db_values', 'level_histogram'):
+                        continue
+                    if key == 'classification':
+                        assert streamed[key] == expected, f"Classification mismatch: {streamed[key]}"
+                        continue
+                    assert np.allclose(streamed[key], expected, rtol=1e-5, atol=1e-4), \
+                        f"{key} mismatch at block_size={block_size}: {streamed[key]} vs {expected}"
+                runner.log(f"  ✓ block_size={block_size}: summary matches batch")
+
+            # Generator yields every window exactly once
+            stream = processor.process_stream(wav_path, block_size=4000)
+            n_windows = sum(len(db_block) for db_block in stream)
+            assert n_windows == len(batch['db_values']), \
+                f"Expected {len(batch['db_values'])} windows, streamed {n_windows}"
+            runner.log(f"  ✓ Streamed {n_windows} windows")
+
+    return runner.run_test("Streaming Matches Batch", test)
+
+
+def test_averaged_spectrum(runner):
+    """Test 11: Averaged spectrum covers the whole signal (Welch's method)"""
+    def test():
+        from scipy import signal
+
+        processor = AudioProcessor()
+        rng = np.random.default_rng(2)
+        audio = rng.standard_normal(5 * 44100)
+
+        # Power spectrum proportional to scipy's Welch estimate
+        _, magnitudes = processor.perform_fft(audio, mode='averaged')
+        _, welch_power = signal.welch(audio, fs=44100, window=np.hamming(2048), nperseg=2048,
+                                      noverlap=1024, detrend=False, scaling='spectrum')
+        ratio = magnitudes[1:-1] ** 2 / welch_power[1:-1]  # DC/Nyquist are not doubled by welch
+        assert np.allclose(ratio, ratio[0], rtol=1e-6), "Averaged spectrum is not Welch-shaped"
+        runner.log(f"  ✓ Matches scipy.signal.welch up to a constant scale")
+
+        # A tone that starts after the first 2048 samples is only seen by the averaged mode
+        t = np.arange(2 * 44100) / 44100
+        tone = np.where(t > 0.5, np.sin(2 * np.pi * 1000 * t), 0.0)
+        single = processor.extract_spectral_features(*processor.perform_fft(tone, mode='single'))
+        averaged = processor.extract_spectral_features(*processor.perform_fft(tone, mode='averaged'))
+        assert abs(averaged['dominant_frequency'] - 1000) < 25, \
+            f"Averaged dominant frequency {averaged['dominant_frequency']:.1f} Hz"
+        runner.log(f"  ✓ Dominant frequency: single={single['dominant_frequency']:.1f} Hz, "
+                   f"averaged={averaged['dominant_frequency']:.1f} Hz")
+
+        # Single mode keeps the Phase 0 output without a full-length window
+        _, single_mags = processor.perform_fft(audio, mode='single')
+        legacy = np.abs(np.fft.rfft(audio * np.hamming(len(audio)), n=2048))
+        assert np.allclose(single_mags, legacy), "Single mode differs from the Phase 0 spectrum"
+        runner.log(f"  ✓ Single mode unchanged")
+
+    return runner.run_test("Averaged Spectrum", test)
+
+
+def test_spectral_plan(runner):
+    """Test 12: Cached spectral plan reproduces the band-mask energies"""
+    def test():
+        processor = AudioProcessor()
+        rng = np.random.default_rng(3)
+        frequencies, magnitudes = processor.perform_fft(rng.standard_normal(44100))
+
+        plan = processor.get_spectral_plan(2048)
+        assert plan is processor.get_spectral_plan(2048), "Plan was rebuilt instead of cached"
+        assert frequencies is plan.frequencies, "perform_fft did not reuse the plan's bins"
+        runner.log(f"  ✓ Plan cached for key {plan.key}")
+
+        expected = [
+            np.sum(magnitudes[frequencies < 250]),
+            np.sum(magnitudes[(frequencies >= 250) & (frequencies < 4000)]),
+            np.sum(magnitudes[frequencies >= 4000]),
+        ]
+        actual = processor.calculate_band_energies(frequencies, magnitudes)
+        assert np.allclose(actual, expected), f"Band energies {actual} != {expected}"
+        # Equal bins in another array (e.g. unpickled in a worker) find the same plan
+        n_plans = len(processor._spectral_plans)
+        assert processor._plan_for_frequencies(frequencies.copy()) is plan
+        assert processor.calculate_band_energies(frequencies.copy(), magnitudes) == actual
+        assert processor._plan_for_frequencies(frequencies[:-1]) is None
+        assert len(processor._spectral_plans) == n_plans, "Lookup built extra plans"
+        runner.log(f"  ✓ reduceat band energies match boolean masks")
+
+        # Stacked spectra reduce in one call; bands above Nyquist stay empty
+        wide_plan = SpectralPlan(8000, 256, band_edges=(250, 4000, 6000))
+        stacked = rng.random((5, 129))
+        energies = wide_plan.band_energies(stacked)
+        assert energies.shape == (5, 4), f"Unexpected shape {energies.shape}"
+        assert np.all(energies[:, 3] == 0), "Band above Nyquist should be empty"
+        assert np.allclose(energies.sum(axis=1), stacked.sum(axis=1)), "Band energies do not sum to total"
+        runner.log(f"  ✓ Batched band energies: {energies.shape}")
+
+    return runner.run_test("Spectral Plan", test)
+
+
+def test_fast_loader(runner):
+    """Test 13: soundfile loader matches librosa.load"""
+    def test():
+        import tempfile
+        import librosa
+        import soundfile as sf
+
+        processor = AudioProcessor()
+        rng = np.random.default_rng(4)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for subtype, channels, sample_rate in [('PCM_16', 1, 44100), ('PCM_16', 2, 44100),
+                                                   ('FLOAT', 2, 44100), ('PCM_16', 1, 22050)]:
+                wav_path = str(Path(tmp_dir) / f"{subtype}_{channels}_{sample_rate}.wav")
+                sf.write(wav_path, 0.3 * rng.standard_normal((sample_rate, channels)),
+                         sample_rate, subtype=subtype)
+
+                audio, sr = processor.load_audio(wav_path, verbose=False)
+                expected, _ = librosa.load(wav_path, sr=processor.sample_rate, mono=True)
+
+                assert sr == processor.sample_rate, f"Unexpected sample rate {sr}"
+                assert audio.dtype == np.float32, f"Expected float32, got {audio.dtype}"
+                assert audio.shape == expected.shape, f"Shape {audio.shape} != {expected.shape}"
+                assert np.allclose(audio, expected, atol=1e-6), f"Samples differ for {wav_path}"
+                runner.log(f"  ✓ {subtype}, {channels} ch, {sample_rate} Hz")
+
+    return runner.run_test("Fast Loader", test)
+
+
+# Import-time budget for analyzing one WAV file (see README "Cold Start")
+COLD_START_IMPORT_BUDGET_S = 1.0
+
+
+def test_cold_start(runner):
+    """Test 14: Analyzing one WAV file does not import heavy dependencies"""
+    def test():
+        import subprocess
+        import tempfile
+        import soundfile as sf
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            wav_path = str(Path(tmp_dir) / "cold_start.wav")
+            sf.write(wav_path, 0.1 * np.random.default_rng(5).standard_normal(44100), 44100)
+
+            script = Path(__file__).parent / "audio_processor.py"
+            proc = subprocess.run([sys.executable, "-X", "importtime", str(script), wav_path],
+                                  capture_output=True, text=True, timeout=120)
+            assert proc.returncode == 0, f"audio_processor.py failed: {proc.stderr[-500:]}"
+
+        # "import time: self [us] | cumulative | package" lines
+        imported = {}
+        top_level_us = 0
+        for line in proc.stderr.splitlines():
+            if line.startswith("import time:") and "cumulative" not in line:
+                _, cumulative, name = line.split("|")
+                imported[name.strip()] = int(cumulative)
+                if not name.startswith("  "):  # Nested imports are indented
+                    top_level_us += int(cumulative)
+
+        heavy = [name for name in imported
+                 if name.split('.')[0] in ('librosa', 'scipy', 'sklearn', 'matplotlib', 'seaborn', 'pandas')]
+        assert not heavy, f"Heavy modules imported at cold start: {sorted(heavy)[:5]}"
+        runner.log(f"  ✓ {len(imported)} modules imported, none of librosa/scipy/sklearn/matplotlib/pandas")
+
+        assert top_level_us / 1e6 < COLD_START_IMPORT_BUDGET_S, \
+            f"Import time {top_level_us / 1e6:.2f} s exceeds {COLD_START_IMPORT_BUDGET_S} s budget"
+        runner.log(f"  ✓ Total import time: {top_level_us / 1e6:.3f} s (budget {COLD_START_IMPORT_BUDGET_S} s)")
+
+    return runner.run_test("Cold Start", test)
+
+
+def test_wav_memmap(runner):
+    """Test 15: Memory-mapped WAV reader matches soundfile decoding"""
+    def test():
+        import tempfile
+        import soundfile as sf
+        from wav_reader import WavMemmap, open_wav_memmap
+
+        rng = np.random.default_rng(6)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for subtype in ['PCM_U8', 'PCM_16', 'PCM_32', 'FLOAT', 'DOUBLE']:
+                for channels in [1, 2]:
+                    wav_path = str(Path(tmp_dir) / f"{subtype}_{channels}.wav")
+                    sf.write(wav_path, 0.3 * rng.standard_normal((10001, channels)), 44100, subtype=subtype)
+
+                    wav = WavMemmap(wav_path)
+                    decoded, _ = sf.read(wav_path, dtype='float32', always_2d=True)
+                    expected = decoded.mean(axis=1, dtype=np.float32)
+
+                    assert wav.frames == len(expected), f"Frame count {wav.frames} != {len(expected)}"
+                    assert np.array_equal(wav.read(), expected), f"{subtype}/{channels}ch samples differ"
+                    streamed = np.concatenate(list(wav.blocks(999)))
+                    assert np.array_equal(streamed, expected), f"{subtype}/{channels}ch blocks differ"
+                    runner.log(f"  ✓ {subtype}, {channels} ch: {wav.frames} frames")
+
+            # Mono float32 is served straight from the page cache
+            wav_path = str(Path(tmp_dir) / "zero_copy.wav")
+            sf.write(wav_path, rng.standard_normal(4096).astype(np.float32) * 0.1, 44100, subtype='FLOAT')
+            audio, _ = AudioProcessor().load_audio(wav_path, verbose=False, mmap=True)
+            assert isinstance(audio.base, np.memmap) or isinstance(audio, np.memmap), "Expected a memmap view"
+            runner.log(f"  ✓ Mono float32 loaded as a memmap view")
+
+            # Formats the reader cannot map fall back to soundfile
+            wav_path = str(Path(tmp_dir) / "pcm24.wav")
+            sf.write(wav_path, rng.standard_normal(100) * 0.1, 44100, subtype='PCM_24')
+            assert open_wav_memmap(wav_path) is None, "24-bit PCM should not be memory-mapped"
+
+            # Corrupt header: block_align 0 is rejected, loading falls back to soundfile
+            wav_path = str(Path(tmp_dir) / "bad_align.wav")
+            sf.write(wav_path, rng.standard_normal(100) * 0.1, 44100, subtype='PCM_16')
+            with open(wav_path, 'r+b') as f:
+                data = f.read()
+                f.seek(data.index(b'fmt ') + 8 + 12)
+                f.write(b'\x00\x00')
+            assert open_wav_memmap(wav_path) is None, "block_align 0 should not be memory-mapped"
+            try:
+                AudioProcessor().load_audio(wav_path, verbose=False, mmap=True)
+            except ValueError:
+                pass  # libsndfile may reject the header too; it must not be a ZeroDivisionError
+            runner.log(f"  ✓ Unsupported formats and corrupt headers are rejected")
+
+    return runner.run_test("WAV Memmap", test)
+
+
+def test_float32_pipeline(runner):
+    """Test 16: float32 pipeline stays within tolerance of float64"""
+    def test():
+        import tempfile
+        import soundfile as sf
+        from audio_processor import FLOAT32_TOLERANCE
+
+        rng = np.random.default_rng(7)
+        audio = np.concatenate([1e-3 * rng.standard_normal(44100), 0.3 * rng.standard_normal(2 * 44100)])
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            wav_path = str(Path(tmp_dir) / "dtype.wav")
+            sf.write(wav_path, audio, 44100, subtype='FLOAT')
+
+            for mode in ['single', 'averaged']:
+                reference = AudioProcessor(dtype='float64', spectrum_mode=mode).process_audio_file(
+                    wav_path, verbose=False)
+                results = AudioProcessor(dtype='float32', spectrum_mode=mode).process_audio_file(
+                    wav_path, verbose=False)
+
+                for key in ['db_values', 'magnitudes']:
+                    assert results[key].dtype == np.float32, f"{key} promoted to {results[key].dtype}"
+
+                db_error = max(np.max(np.abs(results[key] - reference[key]))
+                               for key in ['db_values', 'avg_decibels', 'max_decibels',
+                                           'min_decibels', 'std_decibels'])
+                assert db_error < FLOAT32_TOLERANCE['decibels'], f"dB error {db_error:.2e}"
+
+                spectral_keys = ['spectral_centroid', 'spectral_spread', 'spectral_flatness',
+                                 'spectral_entropy', 'low_freq_ratio', 'mid_freq_ratio', 'high_freq_ratio']
+                spectral_error = max(abs(results[key] - reference[key]) / abs(reference[key])
+                                     for key in spectral_keys)
+                assert spectral_error < FLOAT32_TOLERANCE['spectral'], \
+                    f"Spectral relative error {spectral_error:.2e}"
+                runner.log(f"  ✓ {mode}: max dB error {db_error:.1e}, "
+                           f"max spectral relative error {spectral_error:.1e}")
+
+    return runner.run_test("Float32 Pipeline", test)
+
+
+def test_process_batch(runner):
+    """Test 17: Parallel batch extraction keeps input order and records errors"""
+    def test():
+        import tempfile
+        import soundfile as sf
+
+        processor = AudioProcessor()
+        rng = np.random.default_rng(8)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_paths = []
+            for i in range(6):
+                wav_path = str(Path(tmp_dir) / f"batch_{i}.wav")
+                sf.write(wav_path, 0.05 * (i + 1) * rng.standard_normal(44100), 44100)
+                file_paths.append(wav_path)
+            file_paths.insert(2, str(Path(tmp_dir) / "missing.wav"))
+
+            sequential = processor.process_batch(file_paths, n_workers=1)
+            parallel = processor.process_batch(file_paths, n_workers=2, chunksize=2)
+
+            assert list(parallel['file_path']) == file_paths, "Rows are not in input order"
+            runner.log(f"  ✓ {len(parallel)} rows in input order")
+
+            errors = parallel['error'].tolist()
+            assert errors[2] is not None and all(e is None for i, e in enumerate(errors) if i != 2), \
+                f"Unexpected error column: {errors}"
+            runner.log(f"  ✓ Missing file recorded as: {errors[2][:40]}...")
+
+            ok = parallel['error'].isna()
+            assert np.allclose(parallel.loc[ok, 'avg_decibels'], sequential.loc[ok, 'avg_decibels']), \
+                "Parallel results differ from sequential"
+            assert np.all(np.diff(parallel.loc[ok, 'avg_decibels']) > 0), "Louder files should have higher dB"
+            runner.log(f"  ✓ Parallel results match sequential")
+
+    return runner.run_test("Process Batch", test)
+
+
+def test_feature_cache(runner):
+    """Test 18: Feature cache skips unchanged files and invalidates on change"""
+    def test():
+        import tempfile
+        import soundfile as sf
+        from feature_cache import FeatureCache
+
+        processor = AudioProcessor()
+        rng = np.random.default_rng(9)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_paths = []
+            for i in range(4):
+                wav_path = str(Path(tmp_dir) / f"cache_{i}.wav")
+                sf.write(wav_path, 0.1 * rng.standard_normal(44100), 44100)
+                file_paths.append(wav_path)
+            db_path = Path(tmp_dir) / "features.sqlite"
+
+            with FeatureCache(db_path) as cache:
+                first = processor.process_batch(file_paths, n_workers=1, cache=cache)
+                assert (cache.hits, cache.misses) == (0, 4), f"First run: {cache.hits} hits, {cache.misses} misses"
+
+            with FeatureCache(db_path) as cache:
+                second = processor.process_batch(file_paths, n_workers=1, cache=cache)
+                assert (cache.hits, cache.misses) == (4, 0), f"Re-run: {cache.hits} hits, {cache.misses} misses"
+            assert second.equals(first), "Cached features differ from computed features"
+            runner.log(f"  ✓ Re-run served all {len(file_paths)} files from cache")
+
+            # New content for one file
+            sf.write(file_paths[0], 0.5 * rng.standard_normal(44100), 44100)
+            with FeatureCache(db_path) as cache:
+                processor.process_batch(file_paths, n_workers=1, cache=cache)
+                assert (cache.hits, cache.misses) == (3, 1), f"After edit: {cache.hits} hits, {cache.misses} misses"
+            runner.log(f"  ✓ Modified file re-analyzed")
+
+            # Different processor configuration
+            with FeatureCache(db_path) as cache:
+                AudioProcessor(band_edges=(300, 3000)).process_batch(file_paths, n_workers=1, cache=cache)
+                assert cache.hits == 0, f"Config change should invalidate, got {cache.hits} hits"
+            with FeatureCache(db_path) as cache:
+                processor.process_batch(file_paths, n_workers=1, streaming=True, cache=cache)
+                assert cache.hits == 0, f"Streaming should not reuse batch features, got {cache.hits} hits"
+            runner.log(f"  ✓ Configuration or pipeline change invalidates entries")
+
+    return runner.run_test("Feature Cache", test)
+
+
+def test_realtime_processor(runner):
+    """Test 19: Real-time processor matches batch dB for arbitrary chunking"""
+    def test():
+        from realtime_processor import RealtimeAudioProcessor
+
+        processor = AudioProcessor()
+        rng = np.random.default_rng(10)
+        audio = (0.1 * rng.standard_normal(4 * 44100)).astype(np.float32)
+        audio[44100:2 * 44100] *= 0.01
+
+        realtime = RealtimeAudioProcessor(processor)
+        levels = []
+        pos = 0
+        while pos < len(audio):
+            chunk_size = int(rng.integers(1, 5000))
+            levels += realtime.process_chunk(audio[pos:pos + chunk_size])
+            pos += chunk_size
+
+        expected = processor.calculate_decibels(audio)
+        db_values = np.array([level['decibels'] for level in levels])
+        assert len(db_values) == len(expected), f"Emitted {len(db_values)} levels, expected {len(expected)}"
+        assert np.allclose(db_values, expected, atol=1e-3), "Window dB differs from calculate_decibels"
+        runner.log(f"  ✓ {len(levels)} hops match calculate_decibels")
+
+        # Causal moving average over the available values
+        causal = np.array([expected[max(0, i - 9):i + 1].mean() for i in range(len(expected))])
+        smoothed = np.array([level['smoothed_decibels'] for level in levels])
+        assert np.allclose(smoothed, causal, atol=1e-3), "Smoothed dB differs from causal moving average"
+        runner.log(f"  ✓ Smoothed levels match causal moving average")
+
+        # Device-rate chunks are decimated to the processor's analysis rate
+        reduced = AudioProcessor(analysis_rate=16000)
+        decimating = RealtimeAudioProcessor(reduced)
+        assert decimating.input_rate == 44100 and decimating.sample_rate == 16000
+        reduced_levels = []
+        for start in range(0, len(audio), 1024):
+            reduced_levels += decimating.process_chunk(audio[start:start + 1024])
+        expected = reduced.calculate_decibels(reduced.decimate(audio, 44100))
+        db_values = np.array([level['decibels'] for level in reduced_levels])
+        assert len(expected) - 1 <= len(db_values) <= len(expected), f"{len(db_values)} vs {len(expected)} hops"
+        assert np.allclose(db_values, expected[:len(db_values)], atol=1e-3), "Decimated dB differs"
+        assert abs(reduced_levels[-1]['time'] - len(audio) / 44100) < 0.05, "Hop times not in seconds"
+        assert decimating.latency_report()['hop_ms'] == 743 / 16000 * 1000
+        runner.log(f"  ✓ 44.1 kHz chunks analyzed at 16 kHz ({len(db_values)} hops)")
+
+        report = realtime.latency_report()
+        assert report['p99_ms'] < report['hop_ms'] / 10, f"p99 latency {report['p99_ms']:.2f} ms too high"
+        runner.log(f"  ✓ Latency p99 {report['p99_ms']:.3f} ms (hop {report['hop_ms']:.1f} ms)")
+
+    return runner.run_test("Realtime Processor", test)
+
+
+def test_moving_average_filter(runner):
+    """Test 20: Stateful filters give the same output chunked as in one call"""
+    def test():
+        from filters import MovingAverageFilter, ExponentialFilter
+
+        rng = np.random.default_rng(11)
+        values = 60 + 10 * rng.standard_normal(1000)
+
+        for window in (1, 2, 10, 11):
+            expected = np.convolve(values, np.ones(window) / window, mode='same')
+            centered = MovingAverageFilter(window, mode='centered')
+            chunks = [centered.process(values[i:i + 7]) for i in range(0, len(values), 7)]
+            chunked = np.concatenate(chunks + [centered.flush()])
+            assert np.allclose(chunked, expected), f"Centered window {window} differs from np.convolve"
+        runner.log(f"  ✓ Chunked centered filter matches np.convolve(mode='same')")
+
+        causal = MovingAverageFilter(10, mode='causal')
+        chunked = np.concatenate([causal.process(values[i:i + 3]) for i in range(0, len(values), 3)])
+        expected = np.array([values[max(0, i - 9):i + 1].mean() for i in range(len(values))])
+        assert np.allclose(chunked, expected), "Causal filter differs from warm-up mean"
+        runner.log(f"  ✓ Chunked causal filter matches warm-up mean")
+
+        # Single-value updates (O(1)) match chunked processing
+        for mode in ('causal', 'centered'):
+            for window in (1, 10):
+                single = MovingAverageFilter(window, mode=mode)
+                updated = [single.update(value) for value in values]
+                updated = np.array([value for value in updated if value is not None] + list(single.flush()))
+                assert np.allclose(updated, MovingAverageFilter(window, mode=mode).filter(values)), \
+                    f"update() differs from process() ({mode}, window {window})"
+        runner.log(f"  ✓ Single-value update() matches process()")
+
+        processor = AudioProcessor()
+        assert np.allclose(processor.moving_average_filter(values, 10),
+                           np.convolve(values, np.ones(10) / 10, mode='same'))
+        runner.log(f"  ✓ moving_average_filter unchanged")
+
+        exponential = ExponentialFilter(alpha=0.2)
+        chunked = np.concatenate([exponential.process(values[:123]), exponential.process(values[123:])])
+        assert np.allclose(chunked, ExponentialFilter(alpha=0.2).filter(values))
+        runner.log(f"  ✓ Chunked exponential filter matches one call")
+
+    return runner.run_test("Moving Average Filter", test)
+
+
+def test_batch_api(runner):
+    """Test 21: Batched 2-D API matches the per-signal methods"""
+    def test():
+        rng = np.random.default_rng(12)
+        gains = rng.uniform(0.001, 1.0, (50, 1))
+        signals = (gains * rng.standard_normal((50, 8820))).astype(np.float32)
+
+        for mode in ('single', 'averaged'):
+            processor = AudioProcessor(spectrum_mode=mode)
+            db_matrix = processor.calculate_decibels_batch(signals)
+            frequencies, magnitudes = processor.perform_fft_batch(signals)
+            features = processor.extract_spectral_features_batch(frequencies, magnitudes)
+            labels = processor.classify_noise_batch(db_matrix.mean(axis=1))
+
+            for i in (0, 17, 49):
+                assert np.allclose(db_matrix[i], processor.calculate_decibels(signals[i]))
+                _, expected_magnitudes = processor.perform_fft(signals[i])
+                assert np.allclose(magnitudes[i], expected_magnitudes), f"{mode} spectrum differs"
+                expected = processor.extract_spectral_features(frequencies, expected_magnitudes)
+                for name, value in expected.items():
+                    assert np.isclose(features[name][i], value), f"{mode} {name} differs"
+                assert labels[i] == processor.classify_noise_simple(db_matrix[i].mean())
+            runner.log(f"  ✓ {mode}: {db_matrix.shape} dB matrix, {magnitudes.shape} spectra match")
+
+        # Multi-channel audio as (channels, samples)
+        stereo = signals[:2].T
+        channel_db = processor.calculate_decibels_batch(stereo.T)
+        assert np.allclose(channel_db[1], processor.calculate_decibels(stereo[:, 1]))
+        runner.log(f"  ✓ Per-channel dB of stereo audio")
+
+    return runner.run_test("Batch API", test)
+
+
+def test_time_weighting(runner):
+    """Test 22: Fast/Slow/Impulse levels follow IEC time constants, chunked or not"""
+    def test():
+        from level_meter import TimeWeightedLevelMeter, IMPULSE_DECAY_TIME
+
+        processor = AudioProcessor()
+        sr = processor.sample_rate
+        t = np.arange(3 * sr) / sr
+        burst = np.where(t < 2, 0.1 * np.sin(2 * np.pi * 1000 * t), 0).astype(np.float32)
+        steady_db = 20 * np.log10(0.1 / np.sqrt(2)) + 94
+
+        for weighting in ('fast', 'slow', 'impulse'):
+            meter = TimeWeightedLevelMeter(processor, weighting, hop_size=1)
+            levels = meter.filter(burst)
+
+            # Rising from silence, one time constant reaches 1 - 1/e of the power
+            at_tau = levels[int(meter.time_constant * sr) - 1] - steady_db
+            assert abs(at_tau - 10 * np.log10(1 - np.exp(-1))) < 0.05, f"{weighting}: {at_tau:.2f} dB at tau"
+
+            decay_rate = (levels[int(2.2 * sr)] - levels[int(2.7 * sr)]) / 0.5
+            tau = IMPULSE_DECAY_TIME if weighting == 'impulse' else meter.time_constant
+            assert abs(decay_rate - 10 * np.log10(np.e) / tau) < 0.1, f"{weighting}: decays {decay_rate:.1f} dB/s"
+
+            chunked_meter = TimeWeightedLevelMeter(processor, weighting, hop_size=441)
+            chunks = [chunked_meter.process(burst[i:i + 3000]) for i in range(0, len(burst), 3000)]
+            assert np.allclose(np.concatenate(chunks), levels[440::441], atol=1e-3), f"{weighting}: chunked differs"
+            runner.log(f"  ✓ {weighting}: {at_tau:.2f} dB at tau, decays {decay_rate:.1f} dB/s, chunked matches")
+
+    return runner.run_test("Time Weighting", test)
+
+
+def test_band_levels(runner):
+    """Test 23: A/C/Z weighted octave band levels from cached band matrices"""
+    def test():
+        processor = AudioProcessor()
+        sr = processor.sample_rate
+        t = np.arange(2 * sr) / sr
+        expected_db = 20 * np.log10(0.1 / np.sqrt(2)) + 94
+
+        # IEC 61672-1 A-weighting: -19.1 dB at 100 Hz, 0 at 1 kHz, +1.0 at 4 kHz
+        for frequency, a_gain in ((100, -19.1), (1000, 0.0), (4000, 1.0)):
+            tone = (0.1 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+            centers, band_levels, z_levels = processor.calculate_band_levels(tone, 3, 'Z', n_fft=8192)
+            _, _, a_levels = processor.calculate_band_levels(tone, 3, 'A', n_fft=8192)
+
+            assert abs(np.mean(z_levels) - expected_db) < 0.05, f"{frequency} Hz: {np.mean(z_levels):.2f} dBZ"
+            assert abs(np.mean(a_levels - z_levels) - a_gain) < 0.1, f"{frequency} Hz: wrong A-weighting"
+            loudest = centers[np.argmax(band_levels.mean(axis=0))]
+            assert abs(np.log2(loudest / frequency)) < 1 / 6, f"{frequency} Hz tone in {loudest:.0f} Hz band"
+            runner.log(f"  ✓ {frequency} Hz: {np.mean(z_levels):.2f} dBZ, "
+                       f"{np.mean(a_levels):.2f} dBA, band {loudest:.0f} Hz")
+
+        # Bands split the whole spectrum; Z levels agree with block RMS
+        noise = np.random.default_rng(13).normal(0, 0.1, 5 * sr).astype(np.float32)
+        _, band_levels, levels = processor.calculate_band_levels(noise, 1, 'Z')
+        band_total = 10 * np.log10(np.sum(10 ** (band_levels / 10), axis=-1))
+        assert np.allclose(band_total, levels, atol=0.1), "Octave bands do not add up to the total"
+        assert abs(np.mean(levels) - np.mean(processor.calculate_decibels(noise, 2048))) < 0.05
+        runner.log(f"  ✓ {band_levels.shape[1]} octave bands add up to the overall level")
+
+        plan = processor.get_spectral_plan()
+        assert plan.band_matrix(3, 'A')[1] is plan.band_matrix(3, 'A')[1], "Band matrix was rebuilt"
+        runner.log(f"  ✓ Band matrix cached on the spectral plan")
+
+    return runner.run_test("Band Levels", test)
+
+
+def test_noise_indices(runner):
+    """Test 24: Mergeable histogram gives Leq and L10/L50/L90 in constant memory"""
+    def test():
+        import tempfile
+        import soundfile as sf
+        from noise_indices import LevelHistogram, LEVEL_RESOLUTION_DB
+
+        rng = np.random.default_rng(14)
+        levels = np.concatenate([rng.normal(45, 3, 20000), rng.normal(75, 5, 5000)])
+
+        # Chunks updated separately and merged equal one histogram of everything
+        total = LevelHistogram()
+        for chunk in np.array_split(levels, 7):
+            part = LevelHistogram()
+            part.update(chunk)
+            total.merge(part)
+
+        assert total.count == len(levels)
+        assert np.isclose(total.leq, 10 * np.log10(np.mean(10 ** (levels / 10)))), "Leq is not energetic"
+        for n in (10, 50, 90):
+            expected = np.percentile(levels, 100 - n)
+            assert abs(total.percentile_level(n) - expected) <= LEVEL_RESOLUTION_DB, f"L{n} off"
+        assert total.indices()['lmax'] == levels.max()
+        runner.log(f"  ✓ Merged chunks: Leq {total.leq:.1f}, L10 {total.percentile_level(10):.1f}, "
+                   f"L90 {total.percentile_level(90):.1f} dB")
+
+        processor = AudioProcessor()
+        audio = 0.1 * rng.standard_normal(4 * 44100)
+        audio[44100:2 * 44100] *= 0.01
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            wav_path = str(Path(tmp_dir) / "indices.wav")
+            sf.write(wav_path, audio, 44100)
+            batch = processor.process_audio_file(wav_path, verbose=False)
+            streamed = processor.analyze_stream(wav_path, block_size=3000)
+
+        db_values = processor.calculate_decibels(audio)
+        assert np.isclose(batch['leq'], 10 * np.log10(np.mean(10 ** (db_values / 10))), atol=1e-3)
+        for key in ('leq', 'l10', 'l50', 'l90', 'lmax'):
+            assert np.isclose(streamed[key], batch[key], atol=1e-4), f"Streaming {key} differs"
+        assert batch['l90'] < batch['l50'] < batch['l10'] <= batch['lmax']
+        runner.log(f"  ✓ File indices match between batch and streaming")
+
+    return runner.run_test("Noise Indices", test)
+
+
+def test_instrumentation(runner):
+    """Test 25: Opt-in per-stage timing reaches every sink"""
+    def test():
+        import json
+        import tempfile
+        import soundfile as sf
+        from instrumentation import Instrumentation, MemorySink, JsonLinesSink, PrometheusSink
+
+        audio = 0.1 * np.random.default_rng(15).standard_normal(2 * 44100)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            wav_path = str(Path(tmp_dir) / "stages.wav")
+            sf.write(wav_path, audio, 44100)
+
+            memory = MemorySink()
+            prometheus = PrometheusSink(str(Path(tmp_dir) / "stages.prom"))
+            jsonl_path = Path(tmp_dir) / "stages.jsonl"
+            instrumentation = Instrumentation(memory, prometheus, JsonLinesSink(str(jsonl_path)))
+
+            results = AudioProcessor(instrumentation=instrumentation).process_audio_file(wav_path, verbose=False)
+            instrumentation.close()
+            reference = AudioProcessor().process_audio_file(wav_path, verbose=False)
+            assert results['avg_decibels'] == reference['avg_decibels'], "Instrumentation changed results"
+
+            summary = memory.summary()
+            for stage in ('load', 'db', 'filter', 'fft', 'features', 'classify'):
+                assert summary.get(stage, {}).get('calls') == 1, f"Stage '{stage}' not recorded once"
+            assert summary['load']['samples'] == len(audio)
+            assert summary['load']['bytes'] == len(audio) * 4
+            assert summary['db']['frames'] == len(results['db_values'])
+            runner.log(f"  ✓ {len(summary)} stages recorded with counters")
+
+            records = [json.loads(line) for line in jsonl_path.read_text().splitlines()]
+            assert [record['stage'] for record in records].count('fft') == 1
+            exposition = (Path(tmp_dir) / "stages.prom").read_text()
+            assert 'noise_monitor_stage_wall_seconds_total{stage="load"}' in exposition
+            runner.log(f"  ✓ {len(records)} JSON lines, Prometheus file written")
+
+    return runner.run_test("Instrumentation", test)
+
+
+def test_benchmark_suite(runner):
+    """Test 26: Benchmark history is recorded and regressions are flagged"""
+    def test():
+        import tempfile
+        from benchmark import run_benchmarks, append_run, load_history, find_run, compare_runs
+
+        results = run_benchmarks(durations=(1,), sample_rates=(16000,), dtypes=(None,),
+                                 repeats=2, min_time=0.01, verbose=False)
+        assert len(results) == 6, f"Expected 6 results, got {len(results)}"
+        assert all(result['seconds'] > 0 for result in results)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            history_path = Path(tmp_dir) / "history.jsonl"
+            append_run(results, history_path, label='base')
+            slower = [dict(result, seconds=result['seconds'] * 1.5) if result['benchmark'] == 'perform_fft'
+                      else result for result in results]
+            append_run(slower, history_path, label='head')
+
+            history = load_history(history_path)
+            assert len(history) == 2 and history[-1]['label'] == 'head'
+            comparison = compare_runs(find_run(history, 'previous'), find_run(history, 'latest'), threshold=0.10)
+            flagged = [row['key'][0] for row in comparison if row['regression']]
+            assert flagged == ['perform_fft'], f"Unexpected regressions: {flagged}"
+            runner.log(f"  ✓ {len(comparison)} benchmarks compared, regression flagged")
+
+    return runner.run_test("Benchmark Suite", test)
+
+
+def test_analysis_result(runner):
+    """Test 27: Compact results keep arrays optional and load them lazily"""
+    def test():
+        import tempfile
+        import soundfile as sf
+        from analysis_result import AnalysisResult, SCALAR_FIELDS, results_to_frame
+
+        audio = 0.1 * np.random.default_rng(16).standard_normal(3 * 44100)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            wav_path = str(Path(tmp_dir) / "result.wav")
+            sf.write(wav_path, audio, 44100)
+            processor = AudioProcessor()
+            full = processor.process_audio_file(wav_path, verbose=False)
+            compact = processor.process_audio_file(wav_path, verbose=False, arrays=False)
+
+            assert isinstance(compact, AnalysisResult) and not hasattr(compact, '__dict__')
+            assert full.has_arrays and not compact.has_arrays, "arrays=False kept the arrays"
+            assert compact.to_row() == full.to_row(), "Scalar features differ"
+            assert list(compact.to_row()) == list(SCALAR_FIELDS)
+            assert 'db_values' in compact and not compact.has_arrays, "Membership test loaded arrays"
+            runner.log(f"  ✓ Scalars match, {len(SCALAR_FIELDS)} slots, no arrays held")
+
+            assert np.array_equal(compact['db_values'], full['db_values']), "Lazy db_values differ"
+            assert compact.has_arrays and compact['level_histogram'].count == full['level_histogram'].count
+            compact.release_arrays()
+            assert not compact.has_arrays and np.array_equal(compact['magnitudes'], full['magnitudes'])
+            runner.log("  ✓ Arrays loaded on access and releasable")
+
+        table = results_to_frame([full, compact])
+        assert table.shape == (2, len(SCALAR_FIELDS)) and table['leq'].iloc[1] == full.leq
+        assert sorted(full.to_dict()) == sorted(full), "to_dict() and mapping keys differ"
+        runner.log("  ✓ DataFrame rows built from slots")
+
+    return runner.run_test("Analysis Result", test)
+
+
+def test_analysis_rate(runner):
+    """Test 28: Reduced-rate analysis decimates and scales window sizes"""
+    def test():
+        import tempfile
+        import soundfile as sf
+
+        reduced = AudioProcessor(analysis_rate=16000)
+        assert reduced.sample_rate == 16000 and reduced.n_fft == 1024
+        assert reduced.db_window_size == 1486, f"dB window not scaled: {reduced.db_window_size}"
+        try:
+            AudioProcessor(analysis_rate=8000)
+            raise AssertionError("analysis_rate below twice the band edge was accepted")
+        except ValueError:
+            pass
+
+        # Tone and low-passed noise: nothing above 8 kHz is lost by decimation
+        t = np.arange(4 * 44100) / 44100
+        noise = np.convolve(np.random.default_rng(17).standard_normal(len(t)), np.ones(8) / 8, mode='same')
+        audio = (0.1 * np.sin(2 * np.pi * 1000 * t) + 0.02 * noise).astype(np.float32)
+        decimated = reduced.decimate(audio, 44100)
+        assert len(decimated) == 4 * 16000 and decimated.dtype == np.float32
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            wav_path = str(Path(tmp_dir) / "rate.wav")
+            sf.write(wav_path, audio, 44100)
+            full = AudioProcessor().process_audio_file(wav_path, verbose=False, arrays=False)
+            results = reduced.process_audio_file(wav_path, verbose=False, arrays=False)
+
+            # Streaming decimates block by block with the same filter
+            streamed = reduced.analyze_stream(wav_path, block_size=10000)
+            for name, value in results.to_row().items():
+                if isinstance(value, float):
+                    assert np.isclose(streamed[name], value, rtol=1e-4, atol=1e-6), \
+                        f"Streamed {name} {streamed[name]} != {value}"
+                else:
+                    assert streamed[name] == value, f"Streamed {name} differs"
+            table = reduced.process_batch([wav_path], n_workers=1, streaming=True)
+            assert table['error'][0] is None, table['error'][0]
+            runner.log(f"  ✓ Streaming at 16 kHz matches the batch analysis")
+
+        # Equal rates pass blocks through unchanged
+        from audio_processor import StreamingDecimator
+        same_rate = StreamingDecimator(44100, 44100)
+        assert np.array_equal(np.concatenate((same_rate.process(audio[:1000]), same_rate.process(audio[1000:]),
+                                              same_rate.flush())), audio)
+
+        assert abs(results['avg_decibels'] - full['avg_decibels']) < 0.1, "dB level changed"
+        assert abs(results['leq'] - full['leq']) < 0.1, "Leq changed"
+        assert abs(results['dominant_frequency'] - 1000) <= 16000 / 1024, "Tone not found"
+        runner.log(f"  ✓ 16 kHz: {results['avg_decibels']:.2f} dB vs {full['avg_decibels']:.2f} dB at 44.1 kHz")
+
+    return runner.run_test("Analysis Rate", test)
+
+
+def test_frame_features(runner):
+    """Test 29: Frame-level features share one STFT and match per-frame spectra"""
+    def test():
+        from frame_features import FrameFeatureExtractor
+        from audio_processor import SPECTRUM_BATCH_FRAMES, frame_signal
+
+        processor = AudioProcessor()
+        t = np.arange(15 * 44100) / 44100
+        noise = np.random.default_rng(18).standard_normal(len(t))
+        audio = (0.1 * np.sin(2 * np.pi * 1000 * t) + 0.01 * noise * (t > 7)).astype(np.float32)
+
+        extractor = FrameFeatureExtractor(processor, features=('spectral', 'level', 'flux', 'mfcc'))
+        columns = extractor.frame_features(audio)
+        frames = frame_signal(audio, 2048, 1024)
+        assert len(frames) > SPECTRUM_BATCH_FRAMES, "Signal should span several batches"
+        assert all(len(values) == len(frames) for values in columns.values())
+
+        # Spot-check frames against the whole-spectrum definitions
+        plan = processor.get_spectral_plan(2048)
+        for index in (0, SPECTRUM_BATCH_FRAMES, len(frames) - 1):
+            magnitudes = np.abs(np.fft.rfft(frames[index] * plan.window))
+            expected = processor.extract_spectral_features(plan.frequencies, magnitudes)
+            for name, value in expected.items():
+                assert np.isclose(columns[name][index], value, rtol=1e-6), f"{name} differs at frame {index}"
+
+        # Flux continues across the batch boundary
+        all_magnitudes = np.abs(np.fft.rfft(frames * plan.window, axis=-1))
+        normalized = all_magnitudes / (all_magnitudes.sum(axis=-1, keepdims=True) + 1e-10)
+        flux = np.r_[0, np.linalg.norm(np.diff(normalized, axis=0), axis=-1)]
+        assert np.allclose(columns['spectral_flux'], flux, atol=1e-9), "Spectral flux differs"
+        assert abs(columns['frame_db'][0] - (20 * np.log10(0.1 / np.sqrt(2)) + 94)) < 0.1, "Frame level off"
+        runner.log(f"  ✓ {len(columns)} columns x {len(frames)} frames, batches consistent")
+
+        summary = extractor.summarize(columns)
+        assert len(summary) == len(columns) * 5
+        assert np.isclose(summary['frame_dba_p90'], np.percentile(columns['frame_dba'], 90))
+        assert np.isclose(summary['mfcc_0_std'], np.std(columns['mfcc_0']))
+        runner.log(f"  ✓ {len(summary)} summary features")
+
+    return runner.run_test("Frame Features", test)
+
+
+def test_event_gate(runner):
+    """Test 30: Event gating skips background spectra with bounded feature bias"""
+    def test():
+        from event_gate import EventGate, hysteresis_mask
+
+        levels = np.array([50, 58, 55, 52, 51, 57, 60, 50, 50])
+        expected = [False, False, False, False, False, False, True, False, False]
+        assert hysteresis_mask(levels, 59, 53).tolist() == expected
+        assert hysteresis_mask(np.array([50, 60, 55, 54, 52, 60]), 59, 53).tolist() == \
+            [False, True, True, True, False, True], "Hysteresis did not hold between thresholds"
+
+        sample_rate = 44100
+        rng = np.random.default_rng(19)
+        t = np.arange(120 * sample_rate) / sample_rate
+        audio = 0.01 * rng.standard_normal(len(t))
+        event_starts = (20, 55, 90)
+        for start in event_starts:
+            segment = slice(start * sample_rate, (start + 2) * sample_rate)
+            audio[segment] += 0.1 * np.sin(2 * np.pi * 1500 * t[segment])
+        audio = audio.astype(np.float32)
+
+        gate = EventGate(AudioProcessor())
+        results = gate.analyze(audio)
+        assert results['n_events'] == len(event_starts), f"Found {results['n_events']} events"
+        for (start, end), expected_start in zip(results['events'], event_starts):
+            assert start <= expected_start < end and end - start < 3, f"Event {start:.2f}-{end:.2f} s"
+        assert results['skipped_fraction'] > 0.8, f"Skipped only {results['skipped_fraction']:.1%}"
+        runner.log(f"  ✓ {results['n_events']} events, {results['skipped_fraction']:.1%} of frames skipped")
+
+        bias = gate.gating_bias(audio)
+        worst = max(abs(value) for name, value in bias.items() if name != 'skipped_fraction')
+        assert worst < 0.02, f"Gating bias {worst:.2%} above 2%"
+        exact = EventGate(AudioProcessor(), background_stride=1).gating_bias(audio)
+        assert exact['skipped_fraction'] == 0 and all(abs(value) < 1e-9 for value in exact.values())
+        runner.log(f"  ✓ Worst relative feature bias {worst:.3%}; stride 1 is exact")
+
+    return runner.run_test("Event Gate", test)
+
+
+def test_segment_parallel(runner):
+    """Test 31: Segment-parallel analysis of one file equals the sequential result"""
+    def test():
+        import tempfile
+        import soundfile as sf
+
+        sample_rate = 44100
+        rng = np.random.default_rng(20)
+        n_samples = int(47.3 * sample_rate)
+        envelope = np.repeat(rng.uniform(0.05, 1.0, 48), sample_rate)[:n_samples]
+        audio = (0.05 * rng.standard_normal(n_samples) * envelope).astype(np.float32)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            wav_path = str(Path(tmp_dir) / "long.wav")
+            sf.write(wav_path, np.column_stack((audio, 0.5 * audio)), sample_rate, subtype='PCM_16')
+
+            for mode in ('single', 'averaged'):
+                processor = AudioProcessor(spectrum_mode=mode)
+                sequential = processor.process_audio_file(wav_path, verbose=False)
+                segmented = processor.process_segments(wav_path, n_workers=2, segment_seconds=12)
+                assert segmented is not None, "File was not split"
+                assert segmented.to_row() == sequential.to_row(), f"Scalars differ ({mode})"
+                for name in ('db_values', 'magnitudes'):
+                    assert np.array_equal(segmented[name], sequential[name]), f"{name} differs ({mode})"
+                assert np.array_equal(segmented['level_histogram'].counts, sequential['level_histogram'].counts)
+                runner.log(f"  ✓ '{mode}': 4 segments, 2 workers, identical to sequential")
+
+            # One worker runs in this process without touching the worker globals
+            import audio_processor
+            audio_processor._batch_processor = None
+            single = AudioProcessor().process_segments(wav_path, n_workers=1, segment_seconds=12)
+            assert single is not None and audio_processor._batch_processor is None
+            via_file = AudioProcessor().process_audio_file(wav_path, verbose=False, n_workers=2, segment_seconds=12)
+            assert via_file.to_row() == single.to_row()
+
+            # Too short to split: process_audio_file falls back to the sequential path
+            assert AudioProcessor().process_segments(wav_path, n_workers=2) is None
+            fallback = AudioProcessor().process_audio_file(wav_path, verbose=False, n_workers=2)
+            assert fallback.to_row() == AudioProcessor().process_audio_file(wav_path, verbose=False).to_row()
+
+    return runner.run_test("Segment-Parallel Analysis", test)
+
+
+def test_ingest_service(runner):
+    """Test 32: Drop-folder ingestion drains every file into the sink"""
+    def test():
+        import asyncio
+        import json
+        import tempfile
+        import soundfile as sf
+        from ingest_service import IngestService, JsonLinesResultSink, MemoryResultSink, flood_test
+
+        sample_rate = 44100
+        rng = np.random.default_rng(21)
+        audio = (0.1 * rng.standard_normal(2 * sample_rate)).astype(np.float32)
+
+        # analyze_audio() is process_audio_file() without the load
+        processor = AudioProcessor()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            upload_dir, archive_dir = Path(tmp_dir) / "uploads", Path(tmp_dir) / "archive"
+            upload_dir.mkdir()
+            archive_dir.mkdir()
+            (archive_dir / "clip_0.wav").write_bytes(b"archived earlier")
+            for i in range(5):
+                sf.write(str(upload_dir / f"clip_{i}.wav"), audio * (i + 1), sample_rate, subtype='PCM_16')
+            (upload_dir / "broken.wav").write_bytes(b"not audio")
+            (upload_dir / "notes.txt").write_text("ignored")
+
+            loaded, sr = processor.load_audio(str(upload_dir / "clip_0.wav"), verbose=False)
+            direct = processor.analyze_audio(loaded, sr, str(upload_dir / "clip_0.wav"))
+            assert direct.to_row() == processor.process_audio_file(
+                str(upload_dir / "clip_0.wav"), verbose=False).to_row()
+
+            results_path = str(Path(tmp_dir) / "results.jsonl")
+            service = IngestService(str(upload_dir), JsonLinesResultSink(results_path), processor,
+                                    analyze_workers=1, decode_queue_size=2, analyze_queue_size=1,
+                                    poll_interval=0.05, archive_dir=str(archive_dir))
+            stats = asyncio.run(service.run(once=True))
+
+            with open(results_path) as f:
+                rows = {Path(row['file_path']).name: row for row in map(json.loads, f)}
+            assert set(rows) == {f"clip_{i}.wav" for i in range(5)} | {"broken.wav"}, sorted(rows)
+            assert rows['broken.wav']['status'] == 'failed' and rows['broken.wav']['error']
+            assert rows['clip_0.wav']['status'] == 'analyzed'
+            assert abs(rows['clip_0.wav']['leq'] - direct.leq) < 1e-9
+            assert stats['analyzed'] == 5 and stats['failed'] == 1 and stats['written'] == 6
+            # Analyzed files are archived without replacing an earlier file; the failed and ignored ones stay
+            assert sorted(p.name for p in archive_dir.iterdir()) == ["clip_0-1.wav"] + [f"clip_{i}.wav" for i in range(5)]
+            assert (archive_dir / "clip_0.wav").read_bytes() == b"archived earlier"
+            assert rows['clip_0.wav']['archive_path'] == str(archive_dir / "clip_0-1.wav")
+            assert sorted(p.name for p in upload_dir.iterdir()) == ["broken.wav", "notes.txt"]
+            runner.log(f"  ✓ 6 files ingested through bounded queues (5 analyzed, 1 failed)")
+
+            # A sink error loses that row only; the writer keeps draining
+            class FlakySink(MemoryResultSink):
+                def write(self, row):
+                    if row['file_path'].endswith("broken.wav"):
+                        raise OSError("disk full")
+                    super().write(row)
+
+            for i in range(3):
+                sf.write(str(upload_dir / f"clip_{i}.wav"), audio, sample_rate, subtype='PCM_16')
+            sink = FlakySink()
+            stats = asyncio.run(IngestService(str(upload_dir), sink, processor, analyze_workers=1,
+                                              poll_interval=0.05).run(once=True))
+            assert stats['written'] == 3 and stats['unwritten'] == 1, stats
+            assert sorted(Path(row['file_path']).name for row in sink.rows) == [f"clip_{i}.wav" for i in range(3)]
+
+            # The ledger keeps a restarted service from ingesting the same files again
+            ledger_path = str(Path(tmp_dir) / "results.jsonl.ingested")
+            def ingest():
+                service = IngestService(str(upload_dir), MemoryResultSink(), processor, analyze_workers=1,
+                                        poll_interval=0.05, ledger_path=ledger_path)
+                return asyncio.run(service.run(once=True))
+            first = ingest()
+            assert first['analyzed'] == 3 and first['failed'] == 1, first
+            assert ingest()['discovered'] == 0
+            sf.write(str(upload_dir / "clip_1.wav"), audio[:sample_rate], sample_rate, subtype='PCM_16')
+            changed = ingest()
+            assert changed['discovered'] == 1 and changed['analyzed'] == 1, changed
+            runner.log(f"  ✓ Restart skips files in the ledger, retakes a changed one")
+
+        # Burst larger than the decode queue: blocking loses nothing, shedding records and retries the overflow
+        blocked = flood_test(12, seconds=1.0, analyze_workers=1, decode_queue_size=2)
+        assert blocked['analyzed'] == 12 and blocked['shed'] == 0, blocked
+        shed = flood_test(12, seconds=1.0, analyze_workers=1, decode_queue_size=2, overflow='shed')
+        assert shed['shed'] > 0 and shed['analyzed'] == 12 == shed['discovered'], shed
+        assert shed['requeued'] >= shed['shed'], shed
+        assert shed['written'] == 12 + shed['shed'] and shed['unwritten'] == 0, shed
+        runner.log(f"  ✓ Flood: {blocked['files_per_second']:.0f} files/s (block), "
+                   f"12 analyzed after {shed['shed']} sheds (shed)")
+
+    return runner.run_test("Ingestion Service", test)
+
+
+def test_inference_server(runner):
+    """Test 33: Inference server micro-batches predictions over HTTP"""
+    def test():
+        import http.client
+        import io
+        import json
+        import threading
+        import urllib.error
+        import urllib.request
+        import soundfile as sf
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.preprocessing import LabelEncoder
+        from inference_server import MAX_BODY_BYTES, InferenceServer, MicroBatcher, benchmark, feature_vector
+
+        # Small package with the layout train_classifier.save_model() writes
+        feature_columns = ['avg_db', 'max_db', 'min_db', 'std_db',
+                           'spectral_centroid', 'spectral_spread', 'spectral_rolloff',
+                           'spectral_flatness', 'spectral_entropy', 'dominant_frequency',
+                           'low_freq_ratio', 'mid_freq_ratio', 'high_freq_ratio']
+        rng = np.random.default_rng(22)
+        labels = np.repeat(['quiet', 'normal', 'noisy'], 20)
+        X = rng.uniform(0, 1, (60, 13))
+        X[:, 0] = np.select([labels == 'quiet', labels == 'normal'], [40, 55], 70) + rng.normal(0, 2, 60)
+        label_encoder = LabelEncoder()
+        model = RandomForestClassifier(n_estimators=10, random_state=42).fit(X, label_encoder.fit_transform(labels))
+        package = {'model': model, 'label_encoder': label_encoder, 'feature_columns': feature_columns}
+
+        # Concurrent submissions share one predict_proba call and match unbatched results
+        batcher = MicroBatcher(model, max_batch_size=8, window_ms=200)
+        batcher.start()
+        futures = [batcher.submit(row) for row in X[:5]]
+        batched = np.array([future.result()[0] for future in futures])
+        batcher.stop()
+        assert batcher.batch_sizes[0] == 5, list(batcher.batch_sizes)
+        assert np.allclose(batched, model.predict_proba(X[:5]))
+        try:
+            batcher.submit(X[0])
+            raise AssertionError("Stopped batcher accepted a request")
+        except RuntimeError:
+            pass
+        runner.log(f"  ✓ 5 queued requests -> 1 predict_proba call")
+
+        server = InferenceServer(('127.0.0.1', 0), package, window_ms=1)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            def post(body, content_type):
+                request = urllib.request.Request(server.url + '/predict', body, {'Content-Type': content_type})
+                with urllib.request.urlopen(request) as response:
+                    return json.loads(response.read())
+
+            features = dict(zip(feature_columns, X[0]))
+            reply = post(json.dumps({'features': features}).encode(), 'application/json')
+            assert reply['label'] == labels[0], reply
+            assert abs(reply['probabilities']['quiet'] - model.predict_proba(X[:1])[0, 2]) < 1e-12
+            assert post(json.dumps({'features': list(X[40])}).encode(), 'application/json')['label'] == 'noisy'
+
+            # Audio is analyzed with the same features as process_audio_file()
+            audio = (0.1 * rng.standard_normal(44100)).astype(np.float32)
+            buffer = io.BytesIO()
+            sf.write(buffer, audio, 44100, format='WAV', subtype='FLOAT')
+            reply = post(buffer.getvalue(), 'audio/wav')
+            results = AudioProcessor().analyze_audio(audio)
+            expected = model.predict_proba(feature_vector(results, feature_columns)[np.newaxis])[0]
+            assert np.allclose([reply['probabilities'][c] for c in server.classes], expected)
+
+            try:
+                post(json.dumps({'features': [1.0, 2.0]}).encode(), 'application/json')
+                raise AssertionError("Short feature vector was accepted")
+            except urllib.error.HTTPError as e:
+                assert e.code == 400
+
+            # Unparsable or oversized Content-Length is refused before reading the body
+            for length, status in (('abc', 400), (str(MAX_BODY_BYTES + 1), 413)):
+                connection = http.client.HTTPConnection(server.server_address[0], server.server_address[1])
+                connection.putrequest('POST', '/predict')
+                connection.putheader('Content-Type', 'audio/wav')
+                connection.putheader('Content-Length', length)
+                connection.endheaders()
+                assert connection.getresponse().status == status
+                connection.close()
+
+            # A model failure is a server error, and the server keeps answering
+            class BrokenModel:
+                def predict_proba(self, X):
+                    raise RuntimeError("model unavailable")
+
+            server.batcher.model = BrokenModel()
+            try:
+                post(json.dumps({'features': features}).encode(), 'application/json')
+                raise AssertionError("Model failure was answered with 200")
+            except urllib.error.HTTPError as e:
+                assert e.code == 500 and 'model unavailable' in json.loads(e.read())['error']
+            server.batcher.model = model
+            assert post(json.dumps({'features': features}).encode(), 'application/json')['label'] == labels[0]
+
+            # Once the batcher has stopped (shutdown), requests are refused instead of hanging
+            server.batcher.stop()
+            try:
+                post(json.dumps({'features': features}).encode(), 'application/json')
+                raise AssertionError("Stopped batcher was answered with 200")
+            except urllib.error.HTTPError as e:
+                assert e.code == 503
+            runner.log(f"  ✓ JSON features, audio upload and bad input over HTTP")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        report = benchmark(package, n_clients=8, n_requests=200)
+        assert report['requests'] == 200 and report['errors'] == 0, report
+        assert report['batches'] < 200, report
+        runner.log(f"  ✓ Load test: p50 {report['p50_ms']:.1f} ms, p99 {report['p99_ms']:.1f} ms, "
+                   f"{report['requests_per_second']:.0f} req/s, mean batch {report['mean_batch_size']:.1f}")
+
+    return runner.run_test("Inference Server", test)
+
+
 def run_quick_tests():
     """Run only quick tests (no heavy processing)"""
     print("\n" + "="*60)
@@ -371,6 +1497,31 @@ def run_all_tests():
     test_model_loading(runner)
     test_features_csv(runner)
     test_end_to_end_prediction(runner)
+    test_vectorized_decibels(runner)
+    test_streaming_matches_batch(runner)
+    test_averaged_spectrum(runner)
+    test_spectral_plan(runner)
+    test_fast_loader(runner)
+    test_cold_start(runner)
+    test_wav_memmap(runner)
+    test_float32_pipeline(runner)
+    test_process_batch(runner)
+    test_feature_cache(runner)
+    test_realtime_processor(runner)
+    test_moving_average_filter(runner)
+    test_batch_api(runner)
+    test_time_weighting(runner)
+    test_band_levels(runner)
+    test_noise_indices(runner)
+    test_instrumentation(runner)
+    test_benchmark_suite(runner)
+    test_analysis_result(runner)
+    test_analysis_rate(runner)
+    test_frame_features(runner)
+    test_event_gate(runner)
+    test_segment_parallel(runner)
+    test_ingest_service(runner)
+    test_inference_server(runner)
 
     return runner.print_summary()
 
@@ -15,17 +15,17 @@ Date: 2025-10-15
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import cross_val_score, cross_validate, train_test_split
-from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
-from sklearn.preprocessing import LabelEncoder
-import joblib
 import sys
 import warnings
 
+# scikit-learn and joblib are imported inside train_classifier()/save_model():
+# the feature extraction stage does not need them and they dominate import time.
+
 # Add audio_processor to path
 sys.path.insert(0, str(Path(__file__).parent))
 from audio_processor import AudioProcessor
+from feature_cache import FeatureCache
+from instrumentation import Instrumentation, JsonLinesSink, MemorySink, timed_stage
 
 warnings.filterwarnings('ignore')
 
@@ -35,6 +35,9 @@ AUDIO_SAMPLES_DIR = Path("../audio-samples")
 MODELS_DIR = Path("../../ml-models/models")
 MODEL_FILENAME = "baseline_classifier.pkl"
 RANDOM_STATE = 42
+N_WORKERS = None  # Feature extraction processes (None = all CPU cores)
+FEATURE_CACHE_PATH = AUDIO_SAMPLES_DIR / "feature_cache.sqlite"  # Git-ignored; None disables caching
+STAGE_METRICS_PATH = None  # JSON lines file of per-stage timings, e.g. "stages.jsonl" (None disables)
 
 
 def load_metadata():
@@ -46,57 +49,68 @@ def load_metadata():
     return df
 
 
-def extract_features_from_all_samples(metadata_df):
+def extract_features_from_all_samples(metadata_df, instrumentation=None):
     """
     Process all audio samples and extract features.
 
+    Files are analyzed in parallel with AudioProcessor.process_batch().
+    Files already in the feature cache with the same content and processor
+    configuration are not re-analyzed.
+
+    Args:
+        metadata_df: Sample metadata
+        instrumentation: Optional Instrumentation for per-stage timings
+
     Returns:
         DataFrame with features and labels
     """
-    processor = AudioProcessor()
+    processor = AudioProcessor(instrumentation=instrumentation)
     features_list = []
 
     print("\nExtracting features from audio samples...")
     print("-" * 60)
 
-    for idx, row in metadata_df.iterrows():
+    file_paths = [AUDIO_SAMPLES_DIR / filename for filename in metadata_df['filename']]
+    if FEATURE_CACHE_PATH is None:
+        batch_results = processor.process_batch(file_paths, n_workers=N_WORKERS)
+    else:
+        with FeatureCache(FEATURE_CACHE_PATH) as cache:
+            batch_results = processor.process_batch(file_paths, n_workers=N_WORKERS, cache=cache)
+        print(f"  Feature cache: {cache.hits} cached, {cache.misses} analyzed")
+
+    for idx, ((_, row), (_, results)) in enumerate(zip(metadata_df.iterrows(), batch_results.iterrows())):
         filename = row['filename']
         category = row['category']
-        filepath = AUDIO_SAMPLES_DIR / filename
-
-        try:
-            # Process audio file (verbose=False for clean output)
-            results = processor.process_audio_file(str(filepath), verbose=False)
-
-            # Extract relevant features for ML
-            features = {
-                'filename': filename,
-                'category': category,
-                'avg_db': results['avg_decibels'],
-                'max_db': results['max_decibels'],
-                'min_db': results['min_decibels'],
-                'std_db': results['std_decibels'],
-                'spectral_centroid': results['spectral_centroid'],
-                'spectral_spread': results['spectral_spread'],
-                'spectral_rolloff': results['spectral_rolloff'],
-                'spectral_flatness': results['spectral_flatness'],
-                'spectral_entropy': results['spectral_entropy'],
-                'dominant_frequency': results['dominant_frequency'],
-                'low_freq_ratio': results['low_freq_ratio'],
-                'mid_freq_ratio': results['mid_freq_ratio'],
-                'high_freq_ratio': results['high_freq_ratio'],
-            }
-
-            features_list.append(features)
-
-            # Progress indicator
-            print(f"  [{idx+1:2d}/{len(metadata_df)}] {filename:20s} -> {category:8s} "
-                  f"(avg_db={results['avg_decibels']:.1f})")
-
-        except Exception as e:
-            print(f"  [ERROR] Failed to process {filename}: {e}")
+
+        if results['error'] is not None:
+            print(f"  [ERROR] Failed to process {filename}: {results['error']}")
             continue
 
+        # Extract relevant features for ML
+        features = {
+            'filename': filename,
+            'category': category,
+            'avg_db': results['avg_decibels'],
+            'max_db': results['max_decibels'],
+            'min_db': results['min_decibels'],
+            'std_db': results['std_decibels'],
+            'spectral_centroid': results['spectral_centroid'],
+            'spectral_spread': results['spectral_spread'],
+            'spectral_rolloff': results['spectral_rolloff'],
+            'spectral_flatness': results['spectral_flatness'],
+            'spectral_entropy': results['spectral_entropy'],
+            'dominant_frequency': results['dominant_frequency'],
+            'low_freq_ratio': results['low_freq_ratio'],
+            'mid_freq_ratio': results['mid_freq_ratio'],
+            'high_freq_ratio': results['high_freq_ratio'],
+        }
+
+        features_list.append(features)
+
+        # Progress indicator
+        print(f"  [{idx+1:2d}/{len(metadata_df)}] {filename:20s} -> {category:8s} "
+              f"(avg_db={results['avg_decibels']:.1f})")
+
     print("-" * 60)
     print(f"[OK] Extracted features from {len(features_list)} samples")
 
@@ -105,13 +119,23 @@ def extract_features_from_all_samples(metadata_df):
     return features_df
 
 
-def train_classifier(features_df):
+def train_classifier(features_df, instrumentation=None):
     """
     Train Random Forest classifier with extracted features.
 
+    Args:
+        features_df: Output of extract_features_from_all_samples()
+        instrumentation: Optional Instrumentation; records the 'fit' and
+            'predict' stages
+
     Returns:
         Trained model, label encoder, and evaluation metrics
     """
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.model_selection import cross_val_score, train_test_split
+    from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
+    from sklearn.preprocessing import LabelEncoder
+
     print("\nPreparing data for training...")
     print("-" * 60)
 
@@ -160,11 +184,15 @@ def train_classifier(features_df):
         n_jobs=-1
     )
 
-    rf_classifier.fit(X_train, y_train)
+    with timed_stage(instrumentation, 'fit') as stage:
+        rf_classifier.fit(X_train, y_train)
+        stage.add(samples=len(X_train))
     print("[OK] Model training completed")
 
     # Evaluate on test set
-    y_pred = rf_classifier.predict(X_test)
+    with timed_stage(instrumentation, 'predict') as stage:
+        y_pred = rf_classifier.predict(X_test)
+        stage.add(samples=len(X_test))
     test_accuracy = accuracy_score(y_test, y_pred)
 
     print(f"\n{'='*60}")
@@ -240,6 +268,8 @@ def train_classifier(features_df):
 
 def save_model(results):
     """Save trained model and metadata."""
+    import joblib
+
     MODELS_DIR.mkdir(parents=True, exist_ok=True)
     model_path = MODELS_DIR / MODEL_FILENAME
 
@@ -302,11 +332,17 @@ def main():
     print(f"Model Filename: {MODEL_FILENAME}")
     print("=" * 60)
 
+    # Per-stage timings (opt-in)
+    instrumentation = None
+    if STAGE_METRICS_PATH is not None:
+        stage_totals = MemorySink()
+        instrumentation = Instrumentation(stage_totals, JsonLinesSink(STAGE_METRICS_PATH))
+
     # Step 1: Load metadata
     metadata_df = load_metadata()
 
     # Step 2: Extract features from all samples
-    features_df = extract_features_from_all_samples(metadata_df)
+    features_df = extract_features_from_all_samples(metadata_df, instrumentation)
 
     # Save features to CSV for reference
     features_path = AUDIO_SAMPLES_DIR / "extracted_features.csv"
@@ -314,7 +350,7 @@ def main():
     print(f"\n[OK] Features saved to: {features_path.absolute()}")
 
     # Step 3: Train classifier
-    results = train_classifier(features_df)
+    results = train_classifier(features_df, instrumentation)
 
     # Step 4: Save model
     model_path = save_model(results)
@@ -335,6 +371,12 @@ def main():
     print(f"Phase 0 criteria met: {'YES' if criteria_met else 'NO'}")
     print(f"{'='*60}")
 
+    if instrumentation is not None:
+        instrumentation.close()
+        # Stages run in batch worker processes are only in the JSON lines file
+        print(f"\nStage timings (this process; all processes in {STAGE_METRICS_PATH}):")
+        stage_totals.print_summary()
+
     print("\nNext steps:")
     if criteria_met:
         print("  1. Update DEVELOPMENT_LOG.md with Phase 0 completion")
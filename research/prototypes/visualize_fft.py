@@ -10,14 +10,24 @@ Date: 2025-10-14
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from audio_processor import AudioProcessor
 import sys
 
-# Set style
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (14, 10)
+
+def _import_pyplot():
+    """
+    Import matplotlib/seaborn on first use and apply the plot style.
+
+    Plotting libraries take longer to import than the audio analysis itself,
+    so they are only loaded once a figure is actually drawn.
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # Set style
+    sns.set_style("whitegrid")
+    plt.rcParams['figure.figsize'] = (14, 10)
+    return plt
 
 
 def visualize_audio_analysis(file_path: str, save_plot: bool = False):
@@ -31,6 +41,7 @@ def visualize_audio_analysis(file_path: str, save_plot: bool = False):
     # Process audio
     processor = AudioProcessor()
     results = processor.process_audio_file(file_path, verbose=True)
+    plt = _import_pyplot()
 
     # Create figure with subplots
     fig, axes = plt.subplots(2, 2, figsize=(16, 12))
@@ -172,6 +183,7 @@ def compare_audio_files(file_paths: list, save_plot: bool = False):
         print(f"  ✓ {fp}: {results['avg_decibels']:.1f} dB - {results['classification']}")
 
     # Create comparison figure
+    plt = _import_pyplot()
     fig, axes = plt.subplots(2, 1, figsize=(14, 10))
     fig.suptitle('Audio Files Comparison', fontsize=16, fontweight='bold')
 
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Memory-Mapped WAV Reader for Noise Environment Monitor
+
+Parses the RIFF/WAVE header of uncompressed PCM or IEEE-float WAV files and
+exposes the sample data as a np.memmap view. Slices are read straight from
+the OS page cache without decoding or copying the whole file, so several
+worker processes analyzing the same recording share one cached copy.
+
+Supported sample formats: 8-bit unsigned, 16/32-bit signed PCM and 32/64-bit
+float (including WAVE_FORMAT_EXTENSIBLE headers). Other files (24-bit PCM,
+compressed formats) raise ValueError; callers fall back to soundfile.
+
+Author: Group 4 (GMU)
+Date: 2026-10-16
+"""
+
+import struct
+from typing import Iterator, Optional
+
+import numpy as np
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# (format, bits per sample) -> (numpy dtype, scale to [-1, 1), offset)
+# Scales match libsndfile's float conversion, so samples equal sf.read(..., dtype='float32')
+SAMPLE_FORMATS = {
+    (WAVE_FORMAT_PCM, 8): ('u1', 1 / 128, -128),
+    (WAVE_FORMAT_PCM, 16): ('<i2', 1 / 32768, 0),
+    (WAVE_FORMAT_PCM, 32): ('<i4', 1 / 2147483648, 0),
+    (WAVE_FORMAT_IEEE_FLOAT, 32): ('<f4', 1.0, 0),
+    (WAVE_FORMAT_IEEE_FLOAT, 64): ('<f8', 1.0, 0),
+}
+
+
+class WavMemmap:
+    """
+    Zero-copy view of the samples in an uncompressed WAV file.
+
+    Attributes:
+        file_path: Path of the mapped file
+        sample_rate: Sample rate (Hz)
+        channels: Number of interleaved channels
+        frames: Number of sample frames
+        samples: Read-only np.memmap of shape (frames, channels)
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Parse the WAV header and map the data chunk.
+
+        Args:
+            file_path: Path to WAV file
+
+        Raises:
+            ValueError: If the file is not an uncompressed WAV this reader supports
+        """
+        self.file_path = str(file_path)
+
+        with open(self.file_path, 'rb') as f:
+            riff = f.read(12)
+            if len(riff) < 12 or riff[:4] != b'RIFF' or riff[8:12] != b'WAVE':
+                raise ValueError(f"Not a RIFF/WAVE file: {self.file_path}")
+
+            fmt = None
+            data_offset = data_size = None
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    break
+                chunk_id, chunk_size = struct.unpack('<4sI', header)
+                if chunk_id == b'fmt ':
+                    fmt = f.read(chunk_size)
+                    f.seek(chunk_size % 2, 1)
+                elif chunk_id == b'data':
+                    data_offset = f.tell()
+                    data_size = chunk_size
+                    break
+                else:
+                    # Skip other chunks (LIST, fact, ...), padded to even size
+                    f.seek(chunk_size + chunk_size % 2, 1)
+
+            f.seek(0, 2)
+            file_size = f.tell()
+
+        if fmt is None or data_offset is None:
+            raise ValueError(f"WAV file has no fmt/data chunk: {self.file_path}")
+
+        if len(fmt) < 16:
+            raise ValueError(f"WAV fmt chunk too short ({len(fmt)} bytes): {self.file_path}")
+        format_tag, channels, sample_rate, _, block_align, bits = struct.unpack('<HHIIHH', fmt[:16])
+        if format_tag == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+            # First two bytes of the SubFormat GUID hold the actual format
+            format_tag = struct.unpack('<H', fmt[24:26])[0]
+
+        if (format_tag, bits) not in SAMPLE_FORMATS:
+            raise ValueError(f"Unsupported WAV sample format (tag={format_tag:#06x}, "
+                             f"{bits} bits): {self.file_path}")
+
+        # A corrupt header must not reach the frame arithmetic below
+        if channels == 0 or sample_rate == 0 or block_align != channels * bits // 8:
+            raise ValueError(f"Inconsistent WAV header ({channels} channels, {sample_rate} Hz, "
+                             f"block_align={block_align}, {bits} bits): {self.file_path}")
+
+        dtype, self._scale, self._offset = SAMPLE_FORMATS[(format_tag, bits)]
+        self.sample_rate = sample_rate
+        self.channels = channels
+
+        # Writers that stream to disk may leave the data size unset; trust the file size
+        data_size = min(data_size, file_size - data_offset)
+        self.frames = data_size // block_align
+
+        if self.frames:
+            self.samples = np.memmap(self.file_path, dtype=dtype, mode='r', offset=data_offset,
+                                     shape=(self.frames, channels))
+        else:
+            self.samples = np.empty((0, channels), dtype=dtype)
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds."""
+        return self.frames / self.sample_rate
+
+    @property
+    def is_zero_copy(self) -> bool:
+        """True if read() can return the mapped samples without conversion."""
+        return self.channels == 1 and self.samples.dtype == np.dtype('<f4')
+
+    def read(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """
+        Return frames [start, stop) as mono float32 samples in [-1, 1).
+
+        Mono float32 files are returned as a view of the memmap; other
+        formats convert only the requested slice.
+
+        Args:
+            start: First frame
+            stop: End frame (exclusive), defaults to the end of the file
+
+        Returns:
+            1D float32 array
+        """
+        block = self.samples[start:stop]
+        if self.is_zero_copy:
+            return block[:, 0]
+
+        audio = block.astype(np.float32)
+        if self._offset:
+            audio += self._offset
+        if self._scale != 1.0:
+            audio *= np.float32(self._scale)
+        if self.channels == 1:
+            return audio[:, 0]
+        return audio.mean(axis=1, dtype=np.float32)
+
+    def blocks(self, block_size: int) -> Iterator[np.ndarray]:
+        """
+        Iterate over the file in mono float32 blocks.
+
+        Args:
+            block_size: Frames per block
+
+        Yields:
+            1D float32 arrays of at most block_size samples
+        """
+        for start in range(0, self.frames, block_size):
+            yield self.read(start, start + block_size)
+
+
+def open_wav_memmap(file_path: str) -> Optional[WavMemmap]:
+    """
+    Map a WAV file if this reader supports it.
+
+    Args:
+        file_path: Path to audio file
+
+    Returns:
+        WavMemmap, or None if the file must be decoded another way
+    """
+    try:
+        return WavMemmap(file_path)
+    except (ValueError, OSError):
+        return None